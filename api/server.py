@@ -0,0 +1,380 @@
+"""
+HTTP API Server
+Queue health checks on a bounded worker pool over plain HTTP: python -m api.server
+"""
+import argparse
+import io
+import json
+import os
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from config.constants import (
+    API_HOST, API_PORT, API_MAX_WORKERS, API_QUEUE_SIZE, API_MAX_CONNECTIONS, API_MAX_UPLOAD_MB,
+    API_WAIT_S, API_JOB_HISTORY, DEFAULT_AI_CONTAMINATION, ANALYSIS_MAX_WORKERS
+)
+from core.pipeline import (
+    run_health_check, summarize_results, results_to_json, DataSourceError, IMPUTATION_METHODS,
+    STREAMING_CHOICES
+)
+from utils.jobs import JobExecutor, JobQueueFull, wait_for_job, JOB_DONE, JOB_FAILED
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+class RequestError(Exception):
+    """A request that cannot be served, with the HTTP status to answer"""
+    
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+# =================================================================
+# SERVICE (no HTTP)
+# =================================================================
+
+class HealthCheckService:
+    """
+    Accepts analysis requests and runs them on a bounded JobExecutor
+    
+    At most max_workers analyses run at once and queue_size more may wait;
+    beyond that submissions are refused so callers back off instead of
+    piling up memory. Paths are only accepted below data_root.
+    """
+    
+    def __init__(self, max_workers=API_MAX_WORKERS, queue_size=API_QUEUE_SIZE, data_root=None):
+        self.executor = JobExecutor(
+            max_workers=max_workers, history=API_JOB_HISTORY, max_pending=max_workers + queue_size
+        )
+        self.data_root = os.path.realpath(data_root) if data_root else None
+        # Concurrent analyses share the cores
+        self.analysis_workers = max(1, ANALYSIS_MAX_WORKERS // max(1, max_workers))
+    
+    def parse_options(self, params):
+        """
+        Validate analysis options from query or JSON parameters
+        
+        Args:
+            params: Dict of option name -> value (strings or JSON values)
+        
+        Returns:
+            Keyword arguments for core.pipeline.run_health_check()
+        """
+        try:
+            contamination = float(params.get('sensitivity', DEFAULT_AI_CONTAMINATION))
+        except (TypeError, ValueError):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "'sensitivity' must be a number")
+        if not 0 < contamination <= 0.5:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "'sensitivity' must be in (0, 0.5]")
+        
+        imputation = params.get('imputation', 'drop')
+        if imputation not in IMPUTATION_METHODS:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"'imputation' must be one of {list(IMPUTATION_METHODS)}")
+        
+        streaming = params.get('streaming', 'auto')
+        if streaming not in STREAMING_CHOICES:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"'streaming' must be one of {list(STREAMING_CHOICES)}")
+        
+        sample = params.get('sample', True)
+        if isinstance(sample, str):
+            sample = sample.lower() not in ('0', 'false', 'no')
+        
+        return {
+            'contamination': contamination,
+            'imputation_method': imputation,
+            'streaming': STREAMING_CHOICES[streaming],
+            'sample': bool(sample),
+            'max_workers': self.analysis_workers
+        }
+    
+    def resolve_path(self, path):
+        """Absolute path of a requested file, which must lie below data_root"""
+        if self.data_root is None:
+            raise RequestError(HTTPStatus.FORBIDDEN, "Path requests are disabled (start the server with --data-root)")
+        resolved = os.path.realpath(os.path.join(self.data_root, path))
+        if os.path.commonpath([resolved, self.data_root]) != self.data_root:
+            raise RequestError(HTTPStatus.FORBIDDEN, "Path is outside the data root")
+        if not os.path.isfile(resolved):
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No such file: {path}")
+        return resolved
+    
+    def submit(self, source, filename, options):
+        """
+        Queue an analysis
+        
+        Args:
+            source: Path or file-like object
+            filename: Name used to detect the format
+            options: Output of parse_options()
+        
+        Returns:
+            The Job; its result is {'summary', 'results', 'notices'}
+        """
+        def analysis(job):
+            df, types, results, notices = run_health_check(
+                source, filename=filename,
+                progress_callback=lambda p: job.report({key: p[key] for key in ('stage', 'completed', 'total')}),
+                **options
+            )
+            # Converted here so the job keeps plain values, not models and figures
+            return {
+                'summary': summarize_results(df, types, results),
+                'results': results_to_json(results),
+                'notices': notices
+            }
+        
+        try:
+            return self.executor.submit('analysis', analysis, key=filename)
+        except JobQueueFull:
+            raise self._queue_full()
+    
+    def check_capacity(self):
+        """
+        Refuse early when submit() would be refused
+        
+        Lets callers turn a request away before reading its body; submit()
+        still re-checks, since a slot may be taken in between.
+        """
+        if self.executor.is_full():
+            raise self._queue_full()
+    
+    def _queue_full(self):
+        return RequestError(
+            HTTPStatus.TOO_MANY_REQUESTS, "Analysis queue is full, retry later", {'Retry-After': '5'}
+        )
+    
+    def job_payload(self, job):
+        """JSON-safe description of a job (with its result once done)"""
+        payload = {
+            'job_id': job.id,
+            'status': job.status,
+            'file': job.key,
+            'elapsed_s': round(job.elapsed(), 3),
+            'progress': job.progress
+        }
+        if job.status == JOB_DONE:
+            payload.update(job.result)
+        elif job.status == JOB_FAILED:
+            payload['error'] = f"{type(job.error).__name__}: {job.error}"
+        return payload
+    
+    def job_status_code(self, job):
+        """HTTP status matching a job's state"""
+        if job.status == JOB_DONE:
+            return HTTPStatus.OK
+        if job.status == JOB_FAILED:
+            if isinstance(job.error, DataSourceError):
+                return HTTPStatus.UNPROCESSABLE_ENTITY
+            return HTTPStatus.INTERNAL_SERVER_ERROR
+        return HTTPStatus.ACCEPTED
+
+
+# =================================================================
+# HTTP
+# =================================================================
+
+class HealthCheckHandler(BaseHTTPRequestHandler):
+    """
+    Routes:
+        GET    /health          Service status and job counts
+        POST   /analyze         Upload a file (raw body, ?filename=) or send
+                                {"path": ...} as JSON; waits up to ?wait= seconds
+        GET    /jobs/<id>       Job status, progress and result
+        DELETE /jobs/<id>       Cancel a job
+    """
+    
+    server_version = 'CSVHealthChecker/1.0'
+    protocol_version = 'HTTP/1.1'
+    # Idle keep-alive connections release their slot
+    timeout = 60
+    
+    @property
+    def service(self):
+        return self.server.service
+    
+    def log_message(self, format, *args):
+        logger.info(f"API {self.address_string()} - {format % args}")
+    
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.close_connection:
+            # Tell the client not to reuse the connection (e.g. an unread body)
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def handle_route(self, method):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            if method == 'GET' and url.path == '/health':
+                self.send_json(HTTPStatus.OK, {
+                    'status': 'ok',
+                    'jobs': self.service.executor.counts(),
+                    'max_workers': self.service.executor.max_workers,
+                    'max_pending': self.service.executor.max_pending
+                })
+            elif method == 'POST' and url.path == '/analyze':
+                self.analyze(query)
+            elif url.path.startswith('/jobs/') and method in ('GET', 'DELETE'):
+                job = self.service.executor.get(url.path[len('/jobs/'):])
+                if job is None:
+                    raise RequestError(HTTPStatus.NOT_FOUND, "Unknown job")
+                if method == 'DELETE':
+                    self.service.executor.cancel(job.id)
+                self.send_json(self.service.job_status_code(job), self.service.job_payload(job))
+            else:
+                raise RequestError(HTTPStatus.NOT_FOUND, f"No route for {method} {url.path}")
+        except RequestError as e:
+            self.send_json(e.status, {'error': str(e)}, e.headers)
+        except Exception as e:
+            logger.log_error_with_context(e, f"API {method} {url.path}")
+            self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'Internal server error'})
+    
+    def read_body(self):
+        length = self.headers.get('Content-Length')
+        if length is None:
+            # Any body that was sent would be parsed as the next request
+            self.close_connection = True
+            raise RequestError(HTTPStatus.LENGTH_REQUIRED, "Content-Length is required")
+        try:
+            length = int(length)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Content-Length must be a non-negative integer")
+        if length > API_MAX_UPLOAD_MB * 1024 * 1024:
+            # The unread body would be parsed as the next request
+            self.close_connection = True
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Body exceeds {API_MAX_UPLOAD_MB} MB")
+        return self.rfile.read(length)
+    
+    def analyze(self, query):
+        try:
+            # Before reading, so a full queue does not cost the upload
+            self.service.check_capacity()
+        except RequestError:
+            # The unread body would be parsed as the next request
+            self.close_connection = True
+            raise
+        body = self.read_body()
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip()
+        
+        if content_type == 'application/json':
+            try:
+                params = json.loads(body or b'{}')
+            except ValueError:
+                raise RequestError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON")
+            if not isinstance(params, dict) or not params.get('path'):
+                raise RequestError(HTTPStatus.BAD_REQUEST, "JSON body needs a 'path'")
+            params = {**query, **params}
+            source = self.service.resolve_path(str(params['path']))
+            filename = os.path.basename(source)
+        else:
+            params = query
+            filename = params.get('filename') or self.headers.get('X-Filename')
+            if not filename:
+                raise RequestError(HTTPStatus.BAD_REQUEST, "Uploads need ?filename= (or an X-Filename header)")
+            if not body:
+                raise RequestError(HTTPStatus.BAD_REQUEST, "Empty upload")
+            source = io.BytesIO(body)
+        
+        try:
+            wait = float(params.get('wait', API_WAIT_S))
+        except (TypeError, ValueError):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "'wait' must be a number of seconds")
+        
+        job = self.service.submit(source, filename, self.service.parse_options(params))
+        wait_for_job(job, poll_interval=0.05, timeout=max(0.0, wait))
+        self.send_json(
+            self.service.job_status_code(job), self.service.job_payload(job),
+            {'Location': f"/jobs/{job.id}"}
+        )
+    
+    def do_GET(self):
+        self.handle_route('GET')
+    
+    def do_POST(self):
+        self.handle_route('POST')
+    
+    def do_DELETE(self):
+        self.handle_route('DELETE')
+
+
+class HealthCheckServer(ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer with a cap on concurrent connections
+    
+    A connection beyond max_connections is answered 503 right away instead
+    of getting its own thread.
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self, address, service, max_connections=API_MAX_CONNECTIONS):
+        super().__init__(address, HealthCheckHandler)
+        self.service = service
+        self._slots = threading.BoundedSemaphore(max_connections)
+    
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            body = b'{"error": "Server busy, retry later"}'
+            try:
+                request.sendall(
+                    b"HTTP/1.1 503 Service Unavailable\r\nContent-Type: application/json\r\n"
+                    b"Retry-After: 1\r\nConnection: close\r\nContent-Length: "
+                    + str(len(body)).encode() + b"\r\n\r\n" + body
+                )
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        try:
+            super().process_request(request, client_address)
+        except BaseException:
+            # No handler thread started (e.g. the thread limit was hit), so none will release the slot
+            self._slots.release()
+            raise
+    
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self._slots.release()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m api.server', description='Health checker HTTP API')
+    parser.add_argument('--host', default=API_HOST)
+    parser.add_argument('--port', type=int, default=API_PORT)
+    parser.add_argument('--workers', type=int, default=API_MAX_WORKERS, help='Analyses running at once')
+    parser.add_argument('--queue-size', type=int, default=API_QUEUE_SIZE, help='Analyses waiting beyond that')
+    parser.add_argument('--max-connections', type=int, default=API_MAX_CONNECTIONS,
+                        help='Requests handled at once')
+    parser.add_argument('--data-root', help='Directory whose files may be analyzed by path')
+    args = parser.parse_args(argv)
+    
+    service = HealthCheckService(args.workers, args.queue_size, args.data_root)
+    server = HealthCheckServer((args.host, args.port), service, args.max_connections)
+    logger.info(f"Health checker API listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
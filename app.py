@@ -41,9 +41,13 @@ from ui.sidebar import render_sidebar
 # ... rest of your imports and code stays the same
 
 # Import core functionality
-from core.data_loader import handle_file_upload, generate_test_dataset
-from core.type_detection import detect_column_types
-from core.analysis import analyze_csv_with_ai
+from core.data_loader import load_dataset, select_columns_to_load, generate_test_dataset
+from core.readers import SUPPORTED_EXTENSIONS
+from core.analysis import analyze_csv_with_ai, quick_analysis
+from utils.cache import cached_analysis, get_cache_stats, compute_dataframe_hash
+from utils.jobs import (
+    start_session_job, cancel_session_job, track_job, JOB_DONE, JOB_CANCELLED, JOB_FAILED
+)
 
 # Import tab renderers
 from tabs.tab_overview import render_overview_tab
@@ -60,13 +64,17 @@ from tabs.tab_dashboard import render_dashboard_tab  # ✅ NEW: Dashboard tab
 
 # Import export utilities
 from export.pdf_generator import generate_pdf
-from visualization.charts import render_overview_metrics, render_dataset_overview_cards
+from visualization.charts import render_overview_metrics, render_dataset_overview_cards, render_preliminary_score
+from config.constants import QUICK_ANALYSIS_ROWS
 
 # Import database functions (NEW)
 from database.db_functions import save_analysis
 
 import time
 
+# Reruns with unchanged data and settings reuse the previous results
+run_analysis = cached_analysis(analyze_csv_with_ai)
+
 
 def main():
     """Main application flow"""
@@ -87,47 +95,101 @@ def main():
     
     # 6. File upload
     uploaded_file = st.file_uploader(
-        "📂 Drop your CSV file here or click to browse",
-        type=['csv']
+        "📂 Drop your CSV, Parquet or Feather file here or click to browse",
+        type=SUPPORTED_EXTENSIONS,
+        help="CSV may be gzip, zstd or bz2 compressed (.csv.gz, .csv.zst, .csv.bz2)"
     )
     
     # 7. Handle file upload or show landing page
     if uploaded_file:
-        # Load and validate data
-        df = handle_file_upload(uploaded_file)
+        # Load and validate data (only the selected columns are decoded)
+        columns = select_columns_to_load(uploaded_file)
+        
+        # Parsed + type-detected frames are cached on the upload's bytes
+        df, col_types = load_dataset(uploaded_file, settings, columns)
         
         if df is None:
             st.stop()
         
-        # Detect column types
-        col_types, df = detect_column_types(df)
+        # Exact full-file counts when the data was streamed or sampled
+        source_profile = st.session_state.get('source_profile')
         
         # Show dataset overview cards
-        render_dataset_overview_cards(df)
+        render_dataset_overview_cards(df, source_profile)
         
-        # Run AI analysis with progress tracking
-        progress_bar = st.progress(0, text="🚀 Starting analysis...")
+        # Run AI analysis as a background job; reruns poll it instead of restarting it
         start_time = time.time()
-        
-        progress_bar.progress(0.3, text="🔍 Analyzing data quality...")
-        results = analyze_csv_with_ai(
-            df,
-            col_types,
-            settings['ai_sensitivity'],
-            settings['imputation_method']
-        )
-        
-        progress_bar.progress(1.0, text="✅ Complete!")
+        analysis_args = (col_types, settings['ai_sensitivity'], settings['imputation_method'])
+        # Hashed once here; the result cache and every analysis stage key reuse it
+        dataset_key = st.session_state['dataset_key'] = compute_dataframe_hash(df)
+        analysis_key = run_analysis.cache_key(dataset_key, *analysis_args,
+                                              source_profile=source_profile)
+        results = run_analysis.lookup(analysis_key)
         elapsed = time.time() - start_time
-        time.sleep(0.3)
-        progress_bar.empty()
+        
+        if results is None:
+            progressive = settings['progressive'] and len(df) > QUICK_ANALYSIS_ROWS
+            
+            def analysis_job(job):
+                # Budgeted first pass: cheap checks on a sample, shown immediately
+                if progressive:
+                    job.report({'stage': 'preliminary', 'completed': 0, 'total': None,
+                                'results': quick_analysis(df, col_types, source_profile)})
+                return run_analysis(df, *analysis_args, source_profile=source_profile,
+                                    progress_callback=job.report, df_hash=dataset_key, session=job.session)
+            
+            job = start_session_job('analysis', analysis_key, analysis_job)
+            
+            if not job.done:
+                if st.button("⏹️ Cancel Analysis"):
+                    cancel_session_job('analysis')
+                
+                def show_progress(job):
+                    progress = job.progress
+                    if progress is None or progress['total'] is None:
+                        status = "Running quick checks" if progressive else "Starting analysis"
+                        st.progress(0, text=f"🚀 {status}... ({job.elapsed():.0f}s)")
+                    else:
+                        stage = progress['stage'].replace('_', ' ')
+                        st.progress(
+                            progress['completed'] / progress['total'],
+                            text=(f"🔍 Finished {stage} ({progress['completed']}/{progress['total']} stages, "
+                                  f"{job.elapsed():.0f}s)")
+                        )
+                    if settings['progressive'] and progress is not None:
+                        if progress['total'] is None:
+                            caption = (f"⏱️ Quick checks on {progress['results']['sample_rows']:,} sampled rows • "
+                                       f"refining on the full data...")
+                        else:
+                            caption = f"🔄 Refining: {progress['completed']} of {progress['total']} stages complete"
+                        render_preliminary_score(progress['results'], caption)
+                
+                # Polled without blocking this run, so the sidebar and Cancel stay responsive;
+                # the page reruns on its own once the job finishes
+                track_job(job, "🚀 Starting analysis...", render=show_progress)
+                st.stop()
+            
+            if job.status == JOB_CANCELLED:
+                st.warning("⏹️ Analysis cancelled.")
+                if st.button("🔄 Restart Analysis"):
+                    start_session_job('analysis', analysis_key, analysis_job, restart=True)
+                    st.rerun()
+                st.stop()
+            if job.status == JOB_FAILED:
+                st.error(f"❌ Analysis failed: {job.error}")
+                st.stop()
+            
+            results = job.result
+            elapsed = job.elapsed()
         
         # Success message
         from features.statistics import get_health_grade
+        cache_stats = get_cache_stats()
         st.success(
-            f"✅ Analysis complete in {elapsed:.2f}s • "
+            f"✅ Analysis complete in {elapsed:.2f}s{' (cached)' if cache_stats['last_hit'] else ''} • "
             f"Health Grade: **{get_health_grade(results['health_score'])}**"
         )
+        st.caption(f"🗄️ Analysis cache: {cache_stats['hits']} hits • {cache_stats['misses']} misses")
         
         # ==================== AUTO-SAVE TO DATABASE (NEW) ====================
         # Save analysis to database automatically
@@ -138,7 +200,7 @@ def main():
             save_result = save_analysis(
                 filename=uploaded_file.name,
                 health_score=health_score,
-                total_rows=len(df),
+                total_rows=results['total_rows'],
                 total_columns=len(df.columns),
                 issues_high=issues_summary.get('High', 0),
                 issues_medium=issues_summary.get('Medium', 0),
@@ -208,13 +270,21 @@ def main():
         col_pdf, col_csv = st.columns(2)
         
         with col_pdf:
-            st.download_button(
-                "📄 Download PDF Report",
-                generate_pdf(df, results),
-                "ai_health_report.pdf",
-                "application/pdf",
-                use_container_width=True
-            )
+            # Rendered in the background once per analysis instead of on every rerun
+            pdf_job = start_session_job('pdf_report', analysis_key, lambda job: generate_pdf(df, results))
+            if not pdf_job.done:
+                track_job(pdf_job, "📄 Preparing PDF report...")
+            
+            if pdf_job.status == JOB_FAILED:
+                st.error(f"❌ PDF report failed: {pdf_job.error}")
+            elif pdf_job.status == JOB_DONE:
+                st.download_button(
+                    "📄 Download PDF Report",
+                    pdf_job.result,
+                    "ai_health_report.pdf",
+                    "application/pdf",
+                    use_container_width=True
+                )
         
         with col_csv:
             summary_data = (
@@ -237,7 +307,7 @@ def main():
 
 def render_landing_page():
     """Render landing page when no file is uploaded"""
-    st.info("👆 Upload a CSV file to begin AI-powered analysis")
+    st.info("👆 Upload a CSV, Parquet or Feather file to begin AI-powered analysis")
     st.write("")
     
     # Feature highlights
@@ -295,7 +365,7 @@ def render_landing_page():
     with st.expander("💡 Quick Tips", expanded=False):
         st.markdown("""
         **Upload Requirements:**
-        - CSV files only
+        - CSV (optionally .gz / .zst / .bz2 compressed), Parquet, Feather/Arrow
         - Any size (optimized for files < 100MB)
         - Handles missing values automatically
         
@@ -1,6 +1,14 @@
 """
 Configuration constants for Smart CSV Health Checker
 """
+import os
+
+# Per-user cache location (never a shared temp directory: the disk tier unpickles its files)
+CACHE_ROOT = os.environ.get(
+    'CSV_HEALTH_CACHE_DIR',
+    os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                 'smart_csv_health')
+)
 
 # =================================================================
 # ANALYSIS THRESHOLDS
@@ -14,11 +22,41 @@ DEFAULT_AI_CONTAMINATION = 0.05
 MIN_ROWS_FOR_AI = 10
 MIN_NUMERIC_COLS_FOR_AI = 2
 
+# Isolation Forest
+ISOLATION_N_ESTIMATORS = 100
+ISOLATION_MAX_SAMPLES = 256          # Rows drawn per tree
+ISOLATION_FIT_MAX_ROWS = 200000      # Rows handed to fit (random subset beyond)
+ISOLATION_SCORE_CHUNK_ROWS = 100000  # Rows scored per batch
+
+# PCA
+PCA_MAX_COMPONENTS = 10
+PCA_RANDOMIZED_MIN_FEATURES = 50     # Randomized SVD from this many columns
+PCA_INCREMENTAL_MIN_ROWS = 200000    # IncrementalPCA over chunks from this many rows
+PCA_BATCH_ROWS = 50000               # Rows per chunk for incremental fit and transform
+PCA_PLOT_MAX_ROWS = 20000            # Points kept for scatter plots (all anomalies + sample)
+
 # Missing Value Thresholds
 HIGH_MISSING_THRESHOLD = 0.5       # 50% - suggest dropping column
 MEDIUM_MISSING_THRESHOLD = 0.3     # 30% - high severity issue
 LOW_MISSING_THRESHOLD = 0.1        # 10% - medium severity issue
 
+# Fast MICE imputation
+MICE_MAX_ITER = 10
+MICE_TOL = 1e-3                    # Stop when changes < tol x largest observed value
+MICE_FIT_ROWS = 20000              # Rows sampled to fit each column's model
+MICE_N_JOBS = min(8, os.cpu_count() or 1)
+MICE_START_METHODS = ('forkserver', 'spawn')  # Process pool start methods, first available wins
+MICE_PREDICT_CHUNK_ROWS = 100000   # Rows per parallel prediction chunk
+MICE_N_IMPUTATIONS = 5             # Posterior draws pooled by 'mice_multiple'
+
+# Near-Duplicate Detection (MinHash LSH)
+NEAR_DUP_THRESHOLD = 0.7           # Min. Jaccard similarity of normalized row tokens
+NEAR_DUP_NUM_PERM = 64             # MinHash permutations per row
+NEAR_DUP_MAX_ROWS = 200000         # Rows scanned at most (sampled beyond)
+NEAR_DUP_SIGNIFICANT_DIGITS = 6    # Numeric rounding before comparing
+NEAR_DUP_BUCKET_WINDOW = 20        # Rows each row is verified against inside an LSH bucket
+DUPLICATE_INDEX_CACHE_ENTRIES = 4  # Duplicate indexes kept (by content hash)
+
 # Column Detection
 ID_COLUMN_UNIQUENESS = 0.9         # 90% unique = likely ID column
 MIN_ROWS_FOR_ID_DETECTION = 50
@@ -32,9 +70,63 @@ MAX_COLUMNS_PROFILE = 50
 LARGE_DATASET_THRESHOLD = 100000
 SAMPLE_FRACTION = 0.1
 
+# Streaming Ingestion
+STREAMING_THRESHOLD_MB = 50        # Files above this are read in chunks
+STREAM_MEMORY_BUDGET_MB = 512      # Max memory for retained rows + one chunk
+STREAM_CHUNK_BUDGET_FRACTION = 0.1 # Share of the budget reserved for one chunk
+STREAM_PROBE_ROWS = 1000           # Rows read first to estimate bytes per row
+STREAM_SAMPLE_ROWS = 100000        # Reservoir size for streamed files
+
+# Streaming sketches (utils/sketches.py)
+SKETCH_KLL_K = 200                 # KLL compactor size (~1% rank error)
+SKETCH_HLL_PRECISION = 12          # HyperLogLog registers = 2^12 (~1.6% error)
+SKETCH_TOPK_CAPACITY = 100         # Values tracked by the Space-Saving top-k summary
+
+# Correlation
+CORR_CHUNK_ROWS = 100000           # Rows reduced per co-moment chunk
+CORR_SPEARMAN_MAX_ROWS = 100000    # Rows sampled for Spearman rank correlation
+
+# Analysis execution
+ANALYSIS_MAX_WORKERS = min(8, os.cpu_count() or 1)  # Threads running independent checks
+QUICK_ANALYSIS_BUDGET_S = 2.0      # Target latency of the preliminary score
+QUICK_ANALYSIS_ROWS = 50000        # Rows sampled for the preliminary score
+QUICK_ANALYSIS_MAX_CELLS = 5000000  # Fewer rows for wide files (rows x columns sampled)
+QUICK_CORRELATION_MAX_WORK = 500000000  # Skip quick correlation above rows x numeric columns^2
+
+# Background jobs (analysis, AI repair, synthetic data, PDF reports)
+JOB_MAX_WORKERS = 4                # Jobs running at once across all sessions
+JOB_HISTORY_MAX = 32               # Finished jobs kept for result retrieval
+JOB_POLL_INTERVAL_S = 0.25         # Seconds between status polls in the UI
+
+# HTTP API (python -m api.server)
+API_HOST = '127.0.0.1'
+API_PORT = 8502
+API_MAX_WORKERS = 2                # Analyses running at once
+API_QUEUE_SIZE = 8                 # Analyses waiting beyond that (then 429)
+API_MAX_CONNECTIONS = 32           # Requests handled at once (then 503)
+API_MAX_UPLOAD_MB = 200            # Largest request body
+API_WAIT_S = 30                    # Default seconds POST /analyze waits before answering 202
+API_JOB_HISTORY = 64               # Finished jobs kept for GET /jobs/<id>
+
+# Parsing
+DEFAULT_CSV_ENGINE = 'pyarrow'     # 'pyarrow' (multi-threaded) or 'c' (pandas)
+CSV_SNIFF_BYTES = 1024 * 1024      # Head of the file used to pin column types
+
 # Cache TTL (seconds)
 CACHE_TTL = 3600
 
+# In-memory analysis result cache (shared by all sessions of the process)
+ANALYSIS_CACHE_SESSION_MAX_MB = 256  # Per browser session
+ANALYSIS_CACHE_GLOBAL_MAX_MB = 1024  # Whole server process
+ANALYSIS_STAGE_CACHE_MAX_MB = 1024   # Per-stage outputs (incl. fitted forests and PCA) reused across settings changes
+ANALYSIS_DISK_CACHE_DIR = os.path.join(CACHE_ROOT, 'analysis')
+ANALYSIS_DISK_CACHE_MAX_MB = 2048
+ANALYSIS_SINGLEFLIGHT_WAIT_S = 600   # Longest wait for another session's computation of a key
+
+# Parsed dataset cache (Parquet files keyed on upload bytes + load options)
+DATASET_CACHE_DIR = os.path.join(CACHE_ROOT, 'datasets')
+DATASET_CACHE_MAX_MB = 2048
+
 # =================================================================
 # UI COLORS (for metric cards)
 # =================================================================
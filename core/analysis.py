@@ -2,26 +2,45 @@
 Main AI Analysis Engine
 Performs comprehensive data quality analysis with AI anomaly detection
 """
+import copy
+import time
+
 import pandas as pd
 import numpy as np
-from sklearn.decomposition import PCA
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import IsolationForest
 
 # Enable experimental IterativeImputer (MICE)
 from sklearn.experimental import enable_iterative_imputer  # noqa
 from sklearn.impute import IterativeImputer
 
 from config.constants import (
-    CORR_THRESHOLD, OUTLIER_IQR_MULTIPLIER, HIGH_SKEW_THRESHOLD,
+    CORR_THRESHOLD, HIGH_SKEW_THRESHOLD,
     MEDIUM_SKEW_THRESHOLD, DEFAULT_AI_CONTAMINATION, MIN_ROWS_FOR_AI,
     MIN_NUMERIC_COLS_FOR_AI, HIGH_MISSING_THRESHOLD, MEDIUM_MISSING_THRESHOLD,
-    LOW_MISSING_THRESHOLD, QUALITY_WEIGHTS, DISPLAY_ROW_LIMIT
+    LOW_MISSING_THRESHOLD, QUALITY_WEIGHTS, DISPLAY_ROW_LIMIT, ANALYSIS_MAX_WORKERS,
+    ANALYSIS_STAGE_CACHE_MAX_MB, QUICK_ANALYSIS_BUDGET_S, QUICK_ANALYSIS_ROWS,
+    QUICK_ANALYSIS_MAX_CELLS, QUICK_CORRELATION_MAX_WORK, MICE_N_IMPUTATIONS
+)
+from core.anomaly import (
+    fit_anomaly_model, threshold_anomalies, compute_feature_importance, compute_path_attributions
 )
+from core.column_stats import compute_numeric_stats
+from core.correlation import compute_correlation, high_correlation_pairs
+from core.pca import fit_pca, plot_sample_positions
+from core.task_graph import run_task_graph
+from features.duplicates import count_duplicates
+from features.imputation import fast_mice_imputation, advanced_mice_imputation
+from features.near_duplicates import find_near_duplicates
+from utils.cache import MemoryBoundedCache, compute_dataframe_hash, compute_params_hash
 from utils.logger import get_logger
 
 logger = get_logger()
 
+# Outputs of individual analysis stages, keyed by their inputs (see _stage_keys)
+_stage_cache = MemoryBoundedCache(
+    session_max_bytes=ANALYSIS_STAGE_CACHE_MAX_MB * 1024**2,
+    global_max_bytes=ANALYSIS_STAGE_CACHE_MAX_MB * 1024**2
+)
+
 
 def deduct_health_score(results, amount):
     """Safely deduct from health score (never goes below 0)"""
@@ -37,346 +56,687 @@ def deduct_quality_dimension(results, dimension, amount):
         )
 
 
-def analyze_csv_with_ai(df, types, contamination=DEFAULT_AI_CONTAMINATION, imputation_method='drop'):
-    """
-    Advanced analysis with AI-powered anomaly detection
-    
-    Args:
-        df: DataFrame to analyze
-        types: Dictionary of column types from detect_column_types()
-        contamination: Proportion of outliers in dataset (for AI)
-        imputation_method: How to handle missing values ('drop', 'mean', 'mice')
-    
-    Returns:
-        Dictionary containing health score, quality dimensions, issues, 
-        recommendations, stats, visualizations, model
-    """
-    logger.log_analysis_start(len(df), len(df.columns))
-    
-    results = {
-        'health_score': 100,
-        'quality_dimensions': {
-            'completeness': 100,
-            'consistency': 100,
-            'accuracy': 100,
-            'validity': 100,
-            'uniqueness': 100
-        },
+# =====================================================================
+# FINDINGS
+# =====================================================================
+# Checks run concurrently, so none of them touches `results` directly.
+# Each returns a finding; the scoring step replays the findings in a fixed
+# order, which keeps issues, recommendations and score clamping identical
+# no matter which check finished first.
+
+def _new_finding():
+    return {
+        'deductions': [],
         'issues': [],
         'recommendations': [],
-        'stats': {
-            'missing_info': pd.DataFrame(),
-            'skew_info': pd.DataFrame(),
-            'outlier_info': pd.DataFrame(),
-            'high_corr': pd.DataFrame(),
-            'pca': None,
-            'ai_anomalies': None,
-            'feature_importance': None
-        },
-        'visualizations': {},
-        'model': None
+        'stats': {},
+        'visualizations': {}
     }
+
+
+def _deduct(finding, target, amount):
+    """Record a deduction from the health score (target='health') or a quality dimension"""
+    finding['deductions'].append((target, amount))
+
+
+def _merge_finding(results, finding, isolate=True):
+    """
+    Apply one finding to the results dictionary
     
-    total_rows = len(df)
-    
-    if total_rows == 0:
-        results['health_score'] = 0
-        results['issues'].append({
-            'type': 'Empty Dataset',
-            'severity': 'High',
-            'message': 'Dataset contains no rows'
-        })
-        return results
-    
-    # =====================================================================
-    # 1. MISSING VALUES ANALYSIS (Completeness)
-    # =====================================================================
+    Findings live in the shared stage cache, so with `isolate` the results
+    get their own copies of its issues, tables and figures (the fitted model
+    is shared and must not be modified).
+    """
+    if finding is None:
+        return
+    for target, amount in finding['deductions']:
+        if target == 'health':
+            deduct_health_score(results, amount)
+        else:
+            deduct_quality_dimension(results, target, amount)
+    take = copy.deepcopy if isolate else (lambda value: value)
+    results['issues'].extend(take(finding['issues']))
+    results['recommendations'].extend(finding['recommendations'])
+    results['stats'].update(take(finding['stats']))
+    results['visualizations'].update(take(finding['visualizations']))
+    if 'model' in finding:
+        results['model'] = finding['model']
+
+
+# =====================================================================
+# 1. MISSING VALUES ANALYSIS (Completeness)
+# =====================================================================
+
+def _check_missing(ctx):
+    finding = _new_finding()
+    df, source_profile = ctx['df'], ctx['source_profile']
     try:
         missing_info = []
         
+        if source_profile is not None:
+            # Exact counts over every row of the source file
+            profile_cols = source_profile['columns']
+            missing_counts = {
+                col: profile_cols[col]['nulls'] if col in profile_cols else df[col].isna().sum()
+                for col in df.columns
+            }
+            missing_base = source_profile['total_rows']
+        else:
+            missing_counts = df.isna().sum().to_dict()
+            missing_base = ctx['total_rows']
+        
         for col in df.columns:
-            missing_count = df[col].isna().sum()
+            missing_count = missing_counts[col]
             if missing_count > 0:
-                pct = (missing_count / total_rows) * 100
+                pct = (missing_count / missing_base) * 100
                 missing_info.append({
                     'Column': col, 
                     'Missing': missing_count,
                     'Percentage': pct
                 })
                 
-                deduct_quality_dimension(results, 'completeness', min(10, pct/10))
+                _deduct(finding, 'completeness', min(10, pct/10))
                 
                 if pct > HIGH_MISSING_THRESHOLD * 100:
                     sev = 'High'
-                    deduct_health_score(results, min(10, pct/10))
+                    _deduct(finding, 'health', min(10, pct/10))
                 elif pct > MEDIUM_MISSING_THRESHOLD * 100:
                     sev = 'Medium'
-                    deduct_health_score(results, min(5, pct/20))
+                    _deduct(finding, 'health', min(5, pct/20))
                 else:
                     sev = 'Low'
-                    deduct_health_score(results, min(2, pct/50))
+                    _deduct(finding, 'health', min(2, pct/50))
                 
-                results['issues'].append({
+                finding['issues'].append({
                     'type': 'Missing Data',
                     'severity': sev,
                     'message': f"'{col}': {pct:.1f}% missing ({missing_count:,} values)"
                 })
                 
                 if pct > HIGH_MISSING_THRESHOLD * 100:
-                    results['recommendations'].append(f"❌ Consider dropping '{col}' (>{HIGH_MISSING_THRESHOLD*100:.0f}% missing)")
+                    finding['recommendations'].append(f"❌ Consider dropping '{col}' (>{HIGH_MISSING_THRESHOLD*100:.0f}% missing)")
                 elif pct > LOW_MISSING_THRESHOLD * 100:
-                    results['recommendations'].append(f"🔧 Impute missing values in '{col}' using MICE")
+                    finding['recommendations'].append(f"🔧 Impute missing values in '{col}' using MICE")
         
         if missing_info:
-            results['stats']['missing_info'] = pd.DataFrame(missing_info)
+            finding['stats']['missing_info'] = pd.DataFrame(missing_info)
             
     except Exception as e:
         logger.log_error_with_context(e, "Missing values analysis")
-    
-    # =====================================================================
-    # 2. DUPLICATES ANALYSIS (Uniqueness)
-    # =====================================================================
+    return finding
+
+
+# =====================================================================
+# 2. DUPLICATES ANALYSIS (Uniqueness)
+# =====================================================================
+
+def _check_duplicates(ctx):
+    finding = _new_finding()
     try:
-        dups = df.duplicated().sum()
+        dups = count_duplicates(ctx['df'], ctx['df_hash'])
         if dups > 0:
-            pct = (dups / total_rows) * 100
+            pct = (dups / ctx['total_rows']) * 100
             
-            deduct_quality_dimension(results, 'uniqueness', min(30, pct * 2))
-            deduct_health_score(results, min(15, pct))
+            _deduct(finding, 'uniqueness', min(30, pct * 2))
+            _deduct(finding, 'health', min(15, pct))
             
-            results['issues'].append({
+            finding['issues'].append({
                 'type': 'Duplicates',
                 'severity': 'Medium' if pct < 10 else 'High',
                 'message': f"{dups:,} duplicate rows ({pct:.1f}%)"
             })
-            results['recommendations'].append(f"🗑️ Remove {dups:,} duplicate rows")
+            finding['recommendations'].append(f"🗑️ Remove {dups:,} duplicate rows")
             
     except Exception as e:
         logger.log_error_with_context(e, "Duplicates analysis")
-    
-    # =====================================================================
-    # 3. OUTLIERS ANALYSIS (Accuracy) - IQR Method
-    # =====================================================================
-    outlier_info = []
-    iqr_outlier_indices = set()
-    
-    for col in types['numeric']:
-        try:
-            col_data = df[col].dropna()
-            if len(col_data) < 4:
-                continue
-                
-            Q1, Q3 = col_data.quantile(0.25), col_data.quantile(0.75)
-            IQR = Q3 - Q1
+    return finding
+
+
+def _check_near_duplicates(ctx):
+    """Near-duplicates: rows equal up to case, whitespace, rounding or a few fields"""
+    finding = _new_finding()
+    try:
+        near_dups = find_near_duplicates(ctx['df'], exclude_columns=ctx['types'].get('ids', []),
+                                         df_hash=ctx['df_hash'])
+        finding['stats']['near_duplicates'] = near_dups
+        
+        if near_dups['duplicate_rows'] > 0:
+            pct = (near_dups['duplicate_rows'] / near_dups['rows_scanned']) * 100
             
-            if IQR == 0:
-                continue
+            _deduct(finding, 'uniqueness', min(20, pct * 2))
+            _deduct(finding, 'health', min(5, pct / 2))
             
-            outlier_mask = (
-                (df[col] < (Q1 - OUTLIER_IQR_MULTIPLIER * IQR)) |
-                (df[col] > (Q3 + OUTLIER_IQR_MULTIPLIER * IQR))
+            scope = " (sampled)" if near_dups['sampled'] else ""
+            finding['issues'].append({
+                'type': 'Near Duplicates',
+                'severity': 'Low' if pct < 5 else 'Medium',
+                'message': (
+                    f"{near_dups['duplicate_rows']:,} near-duplicate rows in "
+                    f"{near_dups['cluster_count']:,} clusters ({pct:.1f}%{scope}, "
+                    f"linked by row pairs ≥{near_dups['threshold']:.0%} similar)"
+                )
+            })
+            finding['recommendations'].append(
+                "🔍 Review near-duplicate rows (differ only in case, spacing, rounding or a few fields)"
             )
-            outliers = outlier_mask.sum()
-            
-            if outliers > 0:
-                pct = (outliers / total_rows) * 100
-                outlier_info.append({
-                    'Column': col,
-                    'Outliers': outliers,
-                    'Percentage': pct,
-                    'Lower_Bound': Q1 - OUTLIER_IQR_MULTIPLIER * IQR,
-                    'Upper_Bound': Q3 + OUTLIER_IQR_MULTIPLIER * IQR
-                })
-                iqr_outlier_indices.update(df[outlier_mask].index.tolist())
-                
-                if pct > 5:
-                    deduct_quality_dimension(results, 'accuracy', min(10, pct))
-                    deduct_health_score(results, min(5, pct/5))
-                    results['issues'].append({
-                        'type': 'Statistical Outliers',
-                        'severity': 'Medium',
-                        'message': f"'{col}' has {outliers:,} outliers ({pct:.1f}%)"
-                    })
-        except Exception as e:
-            logger.log_error_with_context(e, f"Outlier analysis for {col}")
-            continue
     
-    if outlier_info:
-        results['stats']['outlier_info'] = pd.DataFrame(outlier_info)
+    except Exception as e:
+        logger.log_error_with_context(e, "Near-duplicate analysis")
+    return finding
+
+
+# =====================================================================
+# 3. OUTLIERS ANALYSIS (Accuracy) - IQR Method
+# =====================================================================
+
+def _compute_column_stats(ctx):
+    """
+    One vectorized pass gives quartiles, moments and outlier counts for
+    every numeric column; the outlier and skewness checks only read from it
+    """
+    df, types, source_profile = ctx['df'], ctx['types'], ctx['source_profile']
+    try:
+        full_file_quartiles = None
+        if source_profile is not None and source_profile['truncated']:
+            # Fences from the whole file's quartile sketches, not just the sample
+            full_file_quartiles = {
+                col: (summary['q1'], summary['q3'])
+                for col, summary in source_profile['columns'].items()
+                if col in types['numeric'] and 'q1' in summary
+            }
+        return compute_numeric_stats(df, types['numeric'], quartiles=full_file_quartiles)
+    except Exception as e:
+        logger.log_error_with_context(e, "Numeric column statistics")
+        return compute_numeric_stats(df, [])
+
+
+def _check_outliers(ctx, column_stats, iqr_outlier_rows):
+    finding = _new_finding()
+    finding['stats']['column_stats'] = column_stats
+    if ctx['source_profile'] is not None and ctx['source_profile']['truncated']:
+        finding['stats']['sketches'] = ctx['source_profile'].get('sketches', {})
     
-    # =====================================================================
-    # 4. SKEWNESS ANALYSIS (Validity)
-    # =====================================================================
+    outlier_info = []
+    
+    for col, col_stats in column_stats[column_stats['outliers'] > 0].iterrows():
+        outliers = int(col_stats['outliers'])
+        pct = (outliers / ctx['total_rows']) * 100
+        outlier_info.append({
+            'Column': col,
+            'Outliers': outliers,
+            'Percentage': pct,
+            'Lower_Bound': col_stats['lower_bound'],
+            'Upper_Bound': col_stats['upper_bound']
+        })
+        
+        if pct > 5:
+            _deduct(finding, 'accuracy', min(10, pct))
+            _deduct(finding, 'health', min(5, pct/5))
+            finding['issues'].append({
+                'type': 'Statistical Outliers',
+                'severity': 'Medium',
+                'message': f"'{col}' has {outliers:,} outliers ({pct:.1f}%)"
+            })
+    
+    if outlier_info:
+        finding['stats']['outlier_info'] = pd.DataFrame(outlier_info)
+    return finding
+
+
+# =====================================================================
+# 4. SKEWNESS ANALYSIS (Validity)
+# =====================================================================
+
+def _check_skewness(column_stats):
+    finding = _new_finding()
     skew_info = []
-    for col in types['numeric']:
-        try:
-            col_data = df[col].dropna()
-            if len(col_data) < 3:
-                continue
-                
-            skew = col_data.skew()
-            if abs(skew) > MEDIUM_SKEW_THRESHOLD:
-                skew_info.append({
-                    'Column': col, 
-                    'Skewness': round(skew, 3),
-                    'Interpretation': 'Right-skewed' if skew > 0 else 'Left-skewed'
-                })
-                
-                if abs(skew) > HIGH_SKEW_THRESHOLD:
-                    deduct_quality_dimension(results, 'validity', 5)
-                    deduct_health_score(results, 2)
-                    results['issues'].append({
-                        'type': 'High Skewness',
-                        'severity': 'Low',
-                        'message': f"'{col}' is highly skewed ({skew:.2f}) - consider log transform"
-                    })
-        except Exception as e:
-            logger.log_error_with_context(e, f"Skewness analysis for {col}")
-            continue
+    skewed = column_stats[column_stats['skew'].abs() > MEDIUM_SKEW_THRESHOLD]
     
-    if skew_info:
-        results['stats']['skew_info'] = pd.DataFrame(skew_info)
+    for col, skew in skewed['skew'].items():
+        skew_info.append({
+            'Column': col, 
+            'Skewness': round(skew, 3),
+            'Interpretation': 'Right-skewed' if skew > 0 else 'Left-skewed'
+        })
+        
+        if abs(skew) > HIGH_SKEW_THRESHOLD:
+            _deduct(finding, 'validity', 5)
+            _deduct(finding, 'health', 2)
+            finding['issues'].append({
+                'type': 'High Skewness',
+                'severity': 'Low',
+                'message': f"'{col}' is highly skewed ({skew:.2f}) - consider log transform"
+            })
     
-    # =====================================================================
-    # 5. CORRELATION ANALYSIS (Consistency)
-    # =====================================================================
+    if skew_info:
+        finding['stats']['skew_info'] = pd.DataFrame(skew_info)
+    return finding
+
+
+# =====================================================================
+# 5. CORRELATION ANALYSIS (Consistency)
+# =====================================================================
+
+def _check_correlation(ctx):
+    finding = _new_finding()
+    df, types, source_profile = ctx['df'], ctx['types'], ctx['source_profile']
     if len(types['numeric']) > 1:
         try:
             valid_numeric = [c for c in types['numeric'] if df[c].notna().sum() > 10]
             
             if len(valid_numeric) > 1:
-                corr_matrix = df[valid_numeric].corr()
-                results['visualizations']['correlation'] = corr_matrix
+                corr_matrix = None
+                full_corr = source_profile.get('correlation') if source_profile is not None else None
+                if full_corr and source_profile['truncated'] and set(valid_numeric) <= set(full_corr['columns']):
+                    # Whole-file co-moments accumulated while streaming
+                    corr_matrix = pd.DataFrame(
+                        full_corr['matrix'], index=full_corr['columns'], columns=full_corr['columns']
+                    ).loc[valid_numeric, valid_numeric]
+                if corr_matrix is None:
+                    corr_matrix = compute_correlation(df, valid_numeric)
+                
+                # Computed once; the Visualizations tab and the PDF heatmap reuse it
+                finding['visualizations']['correlation'] = corr_matrix
                 high_corr = []
                 
-                upper_triangle = np.triu_indices_from(corr_matrix, k=1)
-                for i, j in zip(*upper_triangle):
-                    corr_val = corr_matrix.iloc[i, j]
-                    if pd.notna(corr_val) and abs(corr_val) > CORR_THRESHOLD:
-                        c1, c2 = corr_matrix.columns[i], corr_matrix.columns[j]
-                        high_corr.append({
-                            'Feature 1': c1, 
-                            'Feature 2': c2, 
-                            'Correlation': round(corr_val, 3)
-                        })
-                        deduct_quality_dimension(results, 'consistency', 5)
-                        deduct_health_score(results, 2)
-                        results['issues'].append({
-                            'type': 'High Correlation',
-                            'severity': 'Medium',
-                            'message': f"'{c1}' & '{c2}' highly correlated ({corr_val:.2f}) - consider removing one"
-                        })
+                for c1, c2, corr_val in high_correlation_pairs(corr_matrix, CORR_THRESHOLD):
+                    high_corr.append({
+                        'Feature 1': c1, 
+                        'Feature 2': c2, 
+                        'Correlation': round(corr_val, 3)
+                    })
+                    _deduct(finding, 'consistency', 5)
+                    _deduct(finding, 'health', 2)
+                    finding['issues'].append({
+                        'type': 'High Correlation',
+                        'severity': 'Medium',
+                        'message': f"'{c1}' & '{c2}' highly correlated ({corr_val:.2f}) - consider removing one"
+                    })
                 
                 if high_corr:
-                    results['stats']['high_corr'] = pd.DataFrame(high_corr)
+                    finding['stats']['high_corr'] = pd.DataFrame(high_corr)
                     
         except Exception as e:
             logger.log_error_with_context(e, "Correlation analysis")
+    return finding
+
+
+# =====================================================================
+# 6. AI ANOMALY DETECTION (Isolation Forest)
+# =====================================================================
+
+def _prepare_model_input(ctx):
+    """
+    Numeric model input with missing values handled per imputation_method
     
-    # =====================================================================
-    # 6. AI ANOMALY DETECTION (Isolation Forest)
-    # =====================================================================
-    if len(types['numeric']) >= MIN_NUMERIC_COLS_FOR_AI and len(df) >= MIN_ROWS_FOR_AI:
+    Returns:
+        Tuple of (DataFrame without missing values, extra stats dict), or None
+        when there are too few numeric columns or rows for the AI checks
+    """
+    df, types, imputation_method = ctx['df'], ctx['types'], ctx['imputation_method']
+    if len(types['numeric']) < MIN_NUMERIC_COLS_FOR_AI or len(df) < MIN_ROWS_FOR_AI:
+        return None
+    
+    extra_stats = {}
+    # float64 copy so Arrow-backed and nullable columns feed sklearn directly
+    df_numeric = df[types['numeric']].astype('float64')
+    
+    # Handle missing values based on method
+    if imputation_method == 'drop':
+        df_ai = df_numeric.dropna()
+    elif imputation_method == 'mean':
+        df_ai = df_numeric.fillna(df_numeric.mean())
+    elif imputation_method == 'mice':
         try:
-            df_numeric = df[types['numeric']].copy()
-            
-            # Handle missing values based on method
-            if imputation_method == 'drop':
-                df_ai = df_numeric.dropna()
-                indices_mapping = df_ai.index.tolist()
-            elif imputation_method == 'mean':
-                df_ai = df_numeric.fillna(df_numeric.mean())
-                indices_mapping = df_ai.index.tolist()
-            elif imputation_method == 'mice':
-                try:
-                    mice_imputer = IterativeImputer(
-                        max_iter=10,
-                        random_state=42,
-                        initial_strategy='mean'
-                    )
-                    imputed_data = mice_imputer.fit_transform(df_numeric)
-                    df_ai = pd.DataFrame(imputed_data, columns=df_numeric.columns, index=df_numeric.index)
-                    indices_mapping = df_ai.index.tolist()
-                except Exception as mice_error:
-                    logger.log_error_with_context(mice_error, "MICE imputation failed, falling back to mean")
-                    df_ai = df_numeric.fillna(df_numeric.mean())
-                    indices_mapping = df_ai.index.tolist()
-            else:
-                df_ai = df_numeric.dropna()
-                indices_mapping = df_ai.index.tolist()
-            
-            if len(df_ai) >= MIN_ROWS_FOR_AI:
-                iso_forest = IsolationForest(
-                    contamination=contamination,
-                    random_state=42,
-                    n_estimators=100,
-                    n_jobs=-1
+            mice_imputer = IterativeImputer(
+                max_iter=10,
+                random_state=42,
+                initial_strategy='mean'
+            )
+            imputed_data = mice_imputer.fit_transform(df_numeric)
+            df_ai = pd.DataFrame(imputed_data, columns=df_numeric.columns, index=df_numeric.index)
+        except Exception as mice_error:
+            logger.log_error_with_context(mice_error, "MICE imputation failed, falling back to mean")
+            df_ai = df_numeric.fillna(df_numeric.mean())
+    elif imputation_method == 'mice_fast':
+        try:
+            df_ai, _ = fast_mice_imputation(df_numeric)
+        except Exception as mice_error:
+            logger.log_error_with_context(mice_error, "Fast MICE imputation failed, falling back to mean")
+            df_ai = df_numeric.fillna(df_numeric.mean())
+    elif imputation_method == 'mice_multiple':
+        try:
+            df_ai, uncertainty = advanced_mice_imputation(df_numeric, n_imputations=MICE_N_IMPUTATIONS)
+            extra_stats['imputation_uncertainty'] = uncertainty
+            draws = min((column['draws'] for column in uncertainty.values()), default=0)
+            if df_numeric.isna().any().any() and draws < MICE_N_IMPUTATIONS:
+                # Rubin's rules with fewer draws misstate the variance; say so
+                extra_stats['imputation_warning'] = (
+                    f"Only {draws} of {MICE_N_IMPUTATIONS} MICE draws succeeded"
+                    + ("; missing values were mean-filled" if draws == 0 else "; pooled uncertainty is less reliable")
                 )
-                
-                predictions = iso_forest.fit_predict(df_ai)
-                anomaly_scores = iso_forest.score_samples(df_ai)
-                
-                results['model'] = iso_forest
-                
-                anomaly_mask = predictions == -1
-                anomaly_indices = np.array(indices_mapping)[anomaly_mask]
-                num_anomalies = len(anomaly_indices)
-                
-                if num_anomalies > 0:
-                    results['stats']['ai_anomalies'] = {
-                        'indices': anomaly_indices.tolist(),
-                        'scores': anomaly_scores[anomaly_mask].tolist(),
-                        'all_scores': anomaly_scores.tolist(),
-                        'predictions': predictions.tolist()
-                    }
-                    
-                    both_methods = set(anomaly_indices) & iqr_outlier_indices
-                    deduct_quality_dimension(results, 'accuracy', min(15, num_anomalies / len(df) * 100))
-                    deduct_health_score(results, min(10, num_anomalies / len(df) * 100))
-                    
-                    results['issues'].append({
-                        'type': 'AI Anomaly Detection',
-                        'severity': 'High',
-                        'message': f"🤖 AI detected {num_anomalies:,} anomalies ({len(both_methods)} also statistical outliers)"
-                    })
-                    
-                    # Feature importance
-                    try:
-                        importances = np.zeros(len(types['numeric']))
-                        for tree in iso_forest.estimators_:
-                            importances += tree.feature_importances_
-                        importances /= len(iso_forest.estimators_)
-                        
-                        feature_imp = pd.DataFrame({
-                            'Feature': types['numeric'],
-                            'Importance': importances
-                        }).sort_values('Importance', ascending=False)
-                        results['stats']['feature_importance'] = feature_imp
-                    except Exception as fi_error:
-                        logger.log_error_with_context(fi_error, "Feature importance calculation")
-                
-                # PCA Analysis
-                try:
-                    scaler = StandardScaler()
-                    scaled_data = scaler.fit_transform(df_ai)
-                    
-                    n_components = min(10, len(types['numeric']), len(df_ai))
-                    pca = PCA(n_components=n_components)
-                    pca_components = pca.fit_transform(scaled_data)
-                    
-                    results['stats']['pca'] = {
-                        'explained': pca.explained_variance_ratio_,
-                        'cumulative': np.cumsum(pca.explained_variance_ratio_),
-                        'components': pca_components,
-                        'anomaly_labels': predictions,
-                        'variance_explained_2d': sum(pca.explained_variance_ratio_[:2]) if len(pca.explained_variance_ratio_) >= 2 else 0,
-                        'loadings': pca.components_
-                    }
-                except Exception as pca_error:
-                    logger.log_error_with_context(pca_error, "PCA analysis")
+        except Exception as mice_error:
+            logger.log_error_with_context(mice_error, "Multiple MICE imputation failed, falling back to mean")
+            df_ai = df_numeric.fillna(df_numeric.mean())
+    else:
+        df_ai = df_numeric.dropna()
+    
+    return df_ai, extra_stats
+
+
+def _fit_anomaly_model(model_input):
+    """Isolation Forest and raw scores for the model input (None when too small)"""
+    if model_input is None or len(model_input[0]) < MIN_ROWS_FOR_AI:
+        return None
+    return fit_anomaly_model(model_input[0])
+
+
+def _detect_anomalies(ctx, model_input, fitted):
+    """
+    Label anomalies by thresholding the fitted forest's scores
+    
+    Returns:
+        Dict with df_ai, predictions, scores, anomaly mask/indices, the
+        thresholded model and stats, or None when the AI checks are skipped
+    """
+    if model_input is None:
+        return None
+    df_ai, extra_stats = model_input
+    if len(df_ai) < MIN_ROWS_FOR_AI:
+        return {'stats': extra_stats, 'skipped': True}
+    if fitted is None:
+        return None
+    
+    # Fitted once per dataset ('anomaly_fit'); contamination only sets the threshold
+    base_forest, anomaly_scores = fitted
+    predictions, iso_forest = threshold_anomalies(base_forest, anomaly_scores, ctx['contamination'])
+    
+    anomaly_mask = predictions == -1
+    anomaly_indices = np.array(df_ai.index.tolist())[anomaly_mask]
+    stats = dict(extra_stats)
+    
+    if len(anomaly_indices) > 0:
+        stats['ai_anomalies'] = {
+            'indices': anomaly_indices.tolist(),
+            'scores': anomaly_scores[anomaly_mask].tolist(),
+            'all_scores': anomaly_scores.tolist(),
+            'predictions': predictions.tolist()
+        }
         
-        except Exception as e:
-            logger.log_error_with_context(e, "AI anomaly detection")
+        # Feature importance and per-row attribution for every anomaly
+        try:
+            stats['feature_importance'] = compute_feature_importance(
+                iso_forest, ctx['types']['numeric']
+            )
+            stats['ai_anomalies']['attributions'] = pd.DataFrame(
+                compute_path_attributions(iso_forest, df_ai[anomaly_mask]),
+                index=anomaly_indices,
+                columns=ctx['types']['numeric']
+            )
+        except Exception as fi_error:
+            logger.log_error_with_context(fi_error, "Feature importance calculation")
+    
+    return {
+        'skipped': False,
+        'df_ai': df_ai,
+        'model': iso_forest,
+        'predictions': predictions,
+        'anomaly_mask': anomaly_mask,
+        'anomaly_indices': anomaly_indices,
+        'stats': stats
+    }
+
+
+def _check_anomalies(ctx, anomalies, iqr_outlier_rows):
+    """Turn the anomaly labels into score deductions and an issue"""
+    if anomalies is None:
+        return None
+    finding = _new_finding()
+    finding['stats'].update(anomalies['stats'])
+    if 'imputation_warning' in finding['stats']:
+        finding['issues'].append({
+            'type': 'Imputation',
+            'severity': 'Medium',
+            'message': f"⚠️ {finding['stats']['imputation_warning']}"
+        })
+    if anomalies['skipped']:
+        return finding
+    
+    finding['model'] = anomalies['model']
+    anomaly_indices = anomalies['anomaly_indices']
+    num_anomalies = len(anomaly_indices)
+    
+    if num_anomalies > 0:
+        df = ctx['df']
+        both_methods = set(anomaly_indices) & set(df.index[iqr_outlier_rows])
+        _deduct(finding, 'accuracy', min(15, num_anomalies / len(df) * 100))
+        _deduct(finding, 'health', min(10, num_anomalies / len(df) * 100))
+        
+        finding['issues'].append({
+            'type': 'AI Anomaly Detection',
+            'severity': 'High',
+            'message': f"🤖 AI detected {num_anomalies:,} anomalies ({len(both_methods)} also statistical outliers)"
+        })
+    return finding
+
+
+def _fit_pca(model_input):
+    """PCA service for the model input (None when the AI checks are skipped)"""
+    if model_input is None or len(model_input[0]) < MIN_ROWS_FOR_AI:
+        return None
+    try:
+        return fit_pca(model_input[0])
+    except Exception as pca_error:
+        logger.log_error_with_context(pca_error, "PCA analysis")
+        return None
+
+
+def _compute_pca(anomalies, pca_service):
+    """PCA Analysis (fitted once per dataset, reused by the PCA tab)"""
+    finding = _new_finding()
+    if anomalies is None or anomalies['skipped'] or pca_service is None:
+        return finding
+    try:
+        df_ai, predictions = anomalies['df_ai'], anomalies['predictions']
+        explained = pca_service.explained_variance_ratio
+        
+        # float32 scores for a plot sample that keeps every anomaly
+        plot_rows = plot_sample_positions(len(df_ai), np.flatnonzero(anomalies['anomaly_mask']))
+        
+        finding['stats']['pca'] = {
+            'explained': explained,
+            'cumulative': np.cumsum(explained),
+            'components': pca_service.transform(df_ai.iloc[plot_rows]),
+            'anomaly_labels': predictions[plot_rows],
+            'plot_rows': plot_rows,
+            'variance_explained_2d': sum(explained[:2]) if len(explained) >= 2 else 0,
+            'loadings': pca_service.loadings,
+            'model': pca_service
+        }
+    except Exception as pca_error:
+        logger.log_error_with_context(pca_error, "PCA analysis")
+    return finding
+
+
+# Order in which findings are applied (and issues listed)
+CHECK_ORDER = [
+    'missing', 'duplicates', 'near_duplicates', 'outliers', 'skewness',
+    'correlation', 'anomalies', 'pca'
+]
+
+# Checks cheap enough for a preliminary score (see quick_analysis)
+QUICK_CHECKS = ['missing', 'duplicates', 'outliers', 'skewness', 'correlation']
+
+
+def build_check_graph(ctx):
+    """
+    Analysis checks as a dependency graph for core.task_graph
+    
+    Args:
+        ctx: Dict with df, types, total_rows, source_profile, contamination
+            and imputation_method
+    
+    Returns:
+        Dict of task name -> (function, dependency names); the names in
+        CHECK_ORDER produce findings
+    """
+    def ai_failed(function):
+        # The AI checks share one try block in spirit: any failure skips them
+        def run(deps):
+            try:
+                return function(deps)
+            except Exception as e:
+                logger.log_error_with_context(e, "AI anomaly detection")
+                return None
+        return run
+    
+    return {
+        'missing': (lambda deps: _check_missing(ctx), []),
+        'duplicates': (lambda deps: _check_duplicates(ctx), []),
+        # Shares the duplicate index built by the duplicates check
+        'near_duplicates': (lambda deps: _check_near_duplicates(ctx), ['duplicates']),
+        'column_stats': (lambda deps: _compute_column_stats(ctx), []),
+        'outliers': (lambda deps: _check_outliers(ctx, *deps['column_stats']), ['column_stats']),
+        'skewness': (lambda deps: _check_skewness(deps['column_stats'][0]), ['column_stats']),
+        'correlation': (lambda deps: _check_correlation(ctx), []),
+        'model_input': (ai_failed(lambda deps: _prepare_model_input(ctx)), []),
+        # Fits depend on the model input only, so a sensitivity change reuses them
+        'anomaly_fit': (ai_failed(lambda deps: _fit_anomaly_model(deps['model_input'])), ['model_input']),
+        'anomaly_model': (
+            ai_failed(lambda deps: _detect_anomalies(ctx, deps['model_input'], deps['anomaly_fit'])),
+            ['model_input', 'anomaly_fit']
+        ),
+        'anomalies': (
+            ai_failed(lambda deps: _check_anomalies(ctx, deps['anomaly_model'], deps['column_stats'][1])),
+            ['anomaly_model', 'column_stats']
+        ),
+        'pca_fit': (lambda deps: _fit_pca(deps['model_input']), ['model_input']),
+        'pca': (lambda deps: _compute_pca(deps['anomaly_model'], deps['pca_fit']), ['anomaly_model', 'pca_fit'])
+    }
+
+
+# Analysis settings each stage reads directly (besides its dependencies'
+# outputs). A stage is recomputed only when one of these or an upstream
+# stage changes, so moving the sensitivity slider only re-thresholds the
+# fitted forest (the fits themselves are stages), and switching imputation
+# also reruns the model input and both fits. This is the only cache of
+# intermediate results; every key derives from the one DataFrame hash.
+STAGE_INPUTS = {
+    'missing': ['df', 'total_rows', 'source_profile'],
+    'duplicates': ['df', 'total_rows'],
+    'near_duplicates': ['df', 'ids'],
+    'column_stats': ['df', 'numeric', 'source_profile'],
+    'outliers': ['total_rows', 'source_profile'],
+    'skewness': [],
+    'correlation': ['df', 'numeric', 'source_profile'],
+    'model_input': ['df', 'numeric', 'imputation_method'],
+    'anomaly_fit': [],
+    'anomaly_model': ['contamination', 'numeric'],
+    'anomalies': ['df'],
+    'pca_fit': [],
+    'pca': []
+}
+
+
+def _stage_keys(tasks, fingerprints):
+    """
+    Cache key per stage: its own inputs plus the keys of the stages it
+    depends on, so a change anywhere upstream changes every key downstream
+    
+    Args:
+        tasks: Task graph from build_check_graph
+        fingerprints: Dict of input name -> hashable fingerprint
+    
+    Returns:
+        Dict of stage name -> cache key
+    """
+    keys = {}
+    
+    def key_of(name):
+        if name not in keys:
+            _, deps = tasks[name]
+            inputs = {item: fingerprints[item] for item in STAGE_INPUTS[name]}
+            upstream = [key_of(dep) for dep in deps]
+            keys[name] = f"stage_{name}_{compute_params_hash((inputs, upstream), {})}"
+        return keys[name]
+    
+    for name in tasks:
+        key_of(name)
+    return keys
+
+
+def _with_stage_cache(tasks, keys, reused):
+    """Wrap every stage so it returns its cached output when the key matches"""
+    def cached(name, function):
+        def run(deps):
+            output = _stage_cache.get(keys[name])
+            if output is not None:
+                reused.append(name)
+                return output
+            output = function(deps)
+            if output is not None:
+                _stage_cache.set(keys[name], output, session_id='stages')
+            return output
+        return run
+    
+    return {name: (cached(name, function), deps) for name, (function, deps) in tasks.items()}
+
+
+def _new_results(df, source_profile):
+    """Results dictionary before any check has run"""
+    results = {
+        'health_score': 100,
+        'quality_dimensions': {
+            'completeness': 100,
+            'consistency': 100,
+            'accuracy': 100,
+            'validity': 100,
+            'uniqueness': 100
+        },
+        'issues': [],
+        'recommendations': [],
+        'stats': {
+            'missing_info': pd.DataFrame(),
+            'skew_info': pd.DataFrame(),
+            'outlier_info': pd.DataFrame(),
+            'high_corr': pd.DataFrame(),
+            'pca': None,
+            'ai_anomalies': None,
+            'feature_importance': None,
+            'column_stats': pd.DataFrame(),
+            'near_duplicates': None,
+            'sketches': {}
+        },
+        'visualizations': {},
+        'model': None,
+        'total_rows': len(df),
+        'sampled': False,
+        'preliminary': False,
+        'skipped_checks': []
+    }
+    if source_profile is not None:
+        results['total_rows'] = source_profile['total_rows']
+        results['sampled'] = source_profile['truncated']
+    return results
+
+
+def _score_findings(results, outputs, checks, isolate=True):
+    """
+    Merge the findings of the given checks (those present in outputs) in
+    CHECK_ORDER and compute the final weighted scores
+    
+    Args:
+        results: Fresh dictionary from _new_results()
+        outputs: Dict of task name -> output (may be partial)
+        checks: Checks whose findings count
+        isolate: Copy the findings' contents (see _merge_finding)
+    
+    Returns:
+        The results dictionary
+    """
+    for name in CHECK_ORDER:
+        if name in checks and name in outputs:
+            _merge_finding(results, outputs[name], isolate)
     
     # =====================================================================
     # 7. CALCULATE FINAL SCORES
@@ -395,6 +755,181 @@ def analyze_csv_with_ai(df, types, contamination=DEFAULT_AI_CONTAMINATION, imput
     for dim in results['quality_dimensions']:
         results['quality_dimensions'][dim] = round(results['quality_dimensions'][dim], 1)
     
+    return results
+
+
+def _required_tasks(tasks, checks):
+    """Names of the given checks plus every task they depend on"""
+    required = set()
+    stack = list(checks)
+    while stack:
+        name = stack.pop()
+        if name not in required:
+            required.add(name)
+            stack.extend(tasks[name][1])
+    return required
+
+
+def analyze_csv_with_ai(df, types, contamination=DEFAULT_AI_CONTAMINATION, imputation_method='drop',
+                        source_profile=None, max_workers=ANALYSIS_MAX_WORKERS, checks=None,
+                        time_budget=None, progress_callback=None, df_hash=None):
+    """
+    Advanced analysis with AI-powered anomaly detection
+    
+    Independent checks (missing values, duplicates, column statistics,
+    correlation, anomaly model) run concurrently on a thread pool; their
+    findings are then merged in a fixed order, so the results do not depend
+    on which check finishes first. Each stage's output is cached by its
+    inputs (STAGE_INPUTS), so a settings change only recomputes the stages
+    that depend on it.
+    
+    Args:
+        df: DataFrame to analyze
+        types: Dictionary of column types from detect_column_types()
+        contamination: Proportion of outliers in dataset (for AI)
+        imputation_method: How to handle missing values ('drop', 'mean', 'mice', 'mice_fast',
+            'mice_multiple')
+        source_profile: Full-file profile when df is a sample (see core.streaming);
+            missing-value counts and total_rows are then exact for the whole file
+        max_workers: Threads running checks concurrently (1 = sequential)
+        checks: Subset of CHECK_ORDER to run (default: all); only the stages
+            they need are computed
+        time_budget: Seconds after which checks not yet started are skipped
+            (listed in results['skipped_checks']); None waits for all. Checks
+            are started as soon as their dependencies finish and are then
+            always awaited, so only stages still waiting on a dependency at
+            the deadline are skipped.
+        progress_callback: Optional function called after every stage with a
+            dict of stage, completed, total and the provisional results so far.
+            It runs in the calling thread, so it may update UI elements.
+        df_hash: compute_dataframe_hash(df) when the caller already has it;
+            every stage cache key derives from it, so df is hashed at most once
+    
+    Returns:
+        Dictionary containing health score, quality dimensions, issues, 
+        recommendations, stats, visualizations, model
+    """
+    logger.log_analysis_start(len(df), len(df.columns))
+    
+    results = _new_results(df, source_profile)
+    
+    total_rows = len(df)
+    if total_rows == 0:
+        results['health_score'] = 0
+        results['issues'].append({
+            'type': 'Empty Dataset',
+            'severity': 'High',
+            'message': 'Dataset contains no rows'
+        })
+        return results
+    
+    df_hash = compute_dataframe_hash(df) if df_hash is None else df_hash
+    ctx = {
+        'df': df,
+        'df_hash': df_hash,
+        'types': types,
+        'total_rows': total_rows,
+        'source_profile': source_profile,
+        'contamination': contamination,
+        'imputation_method': imputation_method
+    }
+    fingerprints = {
+        'df': df_hash,
+        'total_rows': total_rows,
+        'source_profile': compute_params_hash((source_profile,), {}),
+        'numeric': list(types['numeric']),
+        'ids': list(types.get('ids', [])),
+        'contamination': contamination,
+        'imputation_method': imputation_method
+    }
+    checks = list(CHECK_ORDER) if checks is None else [name for name in CHECK_ORDER if name in checks]
+    tasks = build_check_graph(ctx)
+    required = _required_tasks(tasks, checks)
+    tasks = {name: task for name, task in tasks.items() if name in required}
+    
+    finished = {}
+    
+    def on_complete(name, output, completed, total):
+        finished[name] = output
+        if progress_callback is not None:
+            progress_callback({
+                'stage': name,
+                'completed': completed,
+                'total': total,
+                # Previews are only rendered, so they skip the copies
+                'results': _score_findings(_new_results(df, source_profile), finished, checks, isolate=False)
+            })
+    
+    reused = []
+    outputs = run_task_graph(
+        _with_stage_cache(tasks, _stage_keys(tasks, fingerprints), reused),
+        max_workers=max_workers,
+        on_complete=on_complete,
+        deadline=None if time_budget is None else time.monotonic() + time_budget
+    )
+    if reused:
+        logger.info(f"Reused {len(reused)} of {len(tasks)} analysis stages: {', '.join(sorted(reused))}")
+    
+    _score_findings(results, finished, checks)
+    results['skipped_checks'] = [name for name in checks if name not in finished]
+    
     logger.log_analysis_complete(results['health_score'], 0)
     
-    return results
\ No newline at end of file
+    return results
+
+
+def quick_analysis(df, types, source_profile=None, time_budget=QUICK_ANALYSIS_BUDGET_S,
+                   max_rows=QUICK_ANALYSIS_ROWS, max_workers=ANALYSIS_MAX_WORKERS, df_hash=None,
+                   max_cells=QUICK_ANALYSIS_MAX_CELLS):
+    """
+    Preliminary health score from the cheap checks on a row sample
+    
+    Runs QUICK_CHECKS (no near-duplicate search, Isolation Forest or
+    imputation) on a row sample, so a score can be shown while
+    analyze_csv_with_ai() refines it.
+    
+    The quick checks have no dependencies and all start at once, so the
+    time_budget deadline practically never skips one; latency is bounded by
+    the size of the work instead. The sample holds at most max_rows rows and
+    max_cells cells (fewer rows for wide files), and correlation, whose
+    cost grows with the square of the numeric columns, is skipped (listed
+    in results['skipped_checks']) when rows x numeric columns^2 exceeds
+    QUICK_CORRELATION_MAX_WORK. The defaults finish in about
+    QUICK_ANALYSIS_BUDGET_S on a typical machine.
+    
+    Args:
+        df: DataFrame to analyze
+        types: Dictionary of column types from detect_column_types()
+        source_profile: Full-file profile when df is itself a sample
+        time_budget: Seconds after which checks not yet started are skipped
+        max_rows: Rows sampled at most
+        max_workers: Threads running checks concurrently
+        df_hash: compute_dataframe_hash(df), reused when df is not sampled
+        max_cells: Cells (rows x columns) sampled at most
+    
+    Returns:
+        Results dictionary as from analyze_csv_with_ai(), with preliminary=True
+        and sample_rows
+    """
+    sample_rows = min(max_rows, max(1, max_cells // max(1, len(df.columns))))
+    sample = df
+    if len(df) > sample_rows:
+        # Keep file order so duplicate and missing-value checks see the same layout
+        sample = df.sample(n=sample_rows, random_state=42).sort_index()
+        df_hash = None
+    
+    checks = list(QUICK_CHECKS)
+    if len(sample) * len(types['numeric']) ** 2 > QUICK_CORRELATION_MAX_WORK:
+        checks.remove('correlation')
+    
+    results = analyze_csv_with_ai(
+        sample, types, source_profile=source_profile, max_workers=max_workers,
+        checks=checks, time_budget=time_budget, df_hash=df_hash
+    )
+    results['skipped_checks'] += [name for name in QUICK_CHECKS if name not in checks]
+    results['sample_rows'] = len(sample)
+    results['preliminary'] = True
+    if source_profile is None:
+        results['total_rows'] = len(df)
+    results['sampled'] = results['sampled'] or len(sample) < len(df)
+    return results
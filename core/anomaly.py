@@ -0,0 +1,201 @@
+"""
+Anomaly Model Service
+Isolation Forest fitted once per dataset; sensitivity changes only move the threshold
+"""
+import copy
+
+import pandas as pd
+import numpy as np
+from scipy.sparse import coo_matrix
+from sklearn.ensemble import IsolationForest
+
+from config.constants import (
+    ISOLATION_N_ESTIMATORS, ISOLATION_MAX_SAMPLES, ISOLATION_FIT_MAX_ROWS,
+    ISOLATION_SCORE_CHUNK_ROWS
+)
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def resolve_max_samples(n_rows, max_samples=ISOLATION_MAX_SAMPLES):
+    """
+    Rows drawn per tree
+    
+    Isolation works best on small subsamples (256 in the original paper);
+    more rows per tree add cost without improving separation.
+    
+    Args:
+        n_rows: Rows available for fitting
+        max_samples: Upper bound per tree
+    
+    Returns:
+        Integer sample size
+    """
+    return int(max(1, min(n_rows, max_samples)))
+
+
+def score_in_chunks(model, X, chunk_rows=ISOLATION_SCORE_CHUNK_ROWS):
+    """
+    Raw anomaly scores (sklearn score_samples) computed in bounded row chunks
+    
+    Args:
+        model: Fitted IsolationForest
+        X: DataFrame (or 2D array) with the model's features
+        chunk_rows: Rows scored per chunk
+    
+    Returns:
+        1D array of scores (lower = more anomalous)
+    """
+    scores = np.empty(len(X), dtype='float64')
+    for start in range(0, len(X), chunk_rows):
+        chunk = X.iloc[start:start + chunk_rows] if hasattr(X, 'iloc') else X[start:start + chunk_rows]
+        scores[start:start + chunk_rows] = model.score_samples(chunk)
+    return scores
+
+
+def fit_anomaly_model(df_ai, random_state=42):
+    """
+    Fit an Isolation Forest and score every row once
+    
+    The forest is fitted without a contamination level, so the same model and
+    scores serve every sensitivity setting (the analysis caches them as the
+    'anomaly_fit' stage). At most ISOLATION_FIT_MAX_ROWS randomly chosen rows
+    are handed to the fit (each tree only draws max_samples of them); scoring
+    always covers every row.
+    
+    Args:
+        df_ai: Fully numeric DataFrame without missing values
+        random_state: Seed for subsampling and the forest
+    
+    Returns:
+        Tuple of (fitted IsolationForest, raw scores array aligned with df_ai)
+    """
+    fit_rows = df_ai
+    if len(df_ai) > ISOLATION_FIT_MAX_ROWS:
+        rng = np.random.default_rng(random_state)
+        fit_rows = df_ai.iloc[np.sort(rng.choice(len(df_ai), ISOLATION_FIT_MAX_ROWS, replace=False))]
+    
+    model = IsolationForest(
+        n_estimators=ISOLATION_N_ESTIMATORS,
+        max_samples=resolve_max_samples(len(fit_rows)),
+        contamination='auto',
+        random_state=random_state,
+        n_jobs=-1
+    )
+    model.fit(fit_rows)
+    
+    scores = score_in_chunks(model, df_ai)
+    
+    logger.info(f"Isolation Forest fitted ({len(fit_rows):,} rows) and scored ({len(df_ai):,} rows)")
+    return model, scores
+
+
+def threshold_anomalies(model, scores, contamination):
+    """
+    Label anomalies for a contamination level without refitting
+    
+    Uses the same rule as IsolationForest(contamination=...).fit_predict:
+    the threshold is the contamination percentile of the scores.
+    
+    Args:
+        model: Fitted IsolationForest (from fit_anomaly_model)
+        scores: Raw scores from fit_anomaly_model
+        contamination: Expected share of anomalies
+    
+    Returns:
+        Tuple of (predictions array of 1/-1, model copy whose predict() and
+        decision_function() use this threshold)
+    """
+    threshold = np.percentile(scores, 100.0 * contamination)
+    predictions = np.where(scores < threshold, -1, 1)
+    
+    # Shallow copy shares the trees; only the threshold differs
+    thresholded = copy.copy(model)
+    thresholded.contamination = contamination
+    thresholded.offset_ = threshold
+    return predictions, thresholded
+
+
+# =================================================================
+# ATTRIBUTION
+# =================================================================
+
+def _average_path_length(n_samples):
+    """Expected path length of an unsuccessful BST search, c(n) (vectorized)"""
+    n = np.asarray(n_samples, dtype='float64')
+    result = np.zeros_like(n)
+    result[n == 2] = 1.0
+    large = n > 2
+    result[large] = 2.0 * (np.log(n[large] - 1.0) + np.euler_gamma) - 2.0 * (n[large] - 1.0) / n[large]
+    return result
+
+
+def compute_feature_importance(model, feature_names):
+    """
+    Mean tree feature importance over all trees of a fitted forest
+    
+    Args:
+        model: Fitted IsolationForest
+        feature_names: Names of the model's input columns
+    
+    Returns:
+        DataFrame with Feature and Importance columns, most important first
+    """
+    # Each tree reports importances over its own feature subset; map them back
+    features = np.concatenate(model.estimators_features_)
+    importances = np.concatenate([tree.feature_importances_ for tree in model.estimators_])
+    totals = np.bincount(features, weights=importances, minlength=len(feature_names))
+    
+    return pd.DataFrame({
+        'Feature': list(feature_names),
+        'Importance': totals / len(model.estimators_)
+    }).sort_values('Importance', ascending=False)
+
+
+def compute_path_attributions(model, X):
+    """
+    Per-row, per-feature contributions to isolation for many rows at once
+    
+    For every tree, the splits on a row's root-to-leaf path are credited to
+    their features with weight 1 / path length, so features that isolate a
+    row quickly get most of the credit (depth-weighted split counts, as in
+    DIFFI). Paths come from each tree's decision_path as sparse matrices and
+    are mapped to features with a node -> feature matrix; no per-row loop.
+    
+    Args:
+        model: Fitted IsolationForest
+        X: DataFrame or 2D array of rows with the model's features
+    
+    Returns:
+        (n_rows, n_features) array; each row sums to 1 (0 if never split)
+    """
+    X = np.asarray(X, dtype=np.float32)
+    n_rows, n_features = X.shape
+    attributions = np.zeros((n_rows, n_features), dtype='float64')
+    if n_rows == 0:
+        return attributions
+    
+    for tree, tree_features in zip(model.estimators_, model.estimators_features_):
+        structure = tree.tree_
+        paths = tree.decision_path(X[:, tree_features]).tocsr()
+        
+        # Path length as sklearn scores it: leaf depth + c(samples in leaf)
+        leaves = tree.apply(X[:, tree_features])
+        depth = np.asarray(paths.sum(axis=1)).ravel() - 1.0
+        path_length = depth + _average_path_length(structure.n_node_samples[leaves])
+        weights = 1.0 / np.maximum(path_length, 1.0)
+        
+        # node -> global feature indicator (leaves have feature -2 and are dropped)
+        internal = np.flatnonzero(structure.feature >= 0)
+        node_to_feature = coo_matrix(
+            (np.ones(len(internal)), (internal, tree_features[structure.feature[internal]])),
+            shape=(structure.node_count, n_features)
+        ).tocsr()
+        
+        splits_per_feature = paths @ node_to_feature
+        attributions += splits_per_feature.multiply(weights[:, None]).toarray()
+    
+    totals = attributions.sum(axis=1, keepdims=True)
+    np.divide(attributions, totals, out=attributions, where=totals > 0)
+    return attributions
@@ -0,0 +1,208 @@
+"""
+Command-Line Health Checker
+Analyze files or whole directories without the web app: python -m core.cli data/*.csv
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from config.constants import DEFAULT_AI_CONTAMINATION, ANALYSIS_MAX_WORKERS, STREAM_MEMORY_BUDGET_MB
+from core.pipeline import check_file, IMPUTATION_METHODS, STREAMING_CHOICES
+from core.readers import detect_file_format
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def _is_supported(path):
+    try:
+        detect_file_format(path)
+        return True
+    except ValueError:
+        return False
+
+
+def collect_files(targets, recursive=False):
+    """
+    Expand files, directories and glob patterns into supported data files
+    
+    Args:
+        targets: Paths, directories or glob patterns
+        recursive: Descend into subdirectories (and let ** match in patterns)
+    
+    Returns:
+        Sorted list of unique file paths
+    """
+    files = set()
+    for target in targets:
+        if os.path.isdir(target):
+            pattern = os.path.join(target, '**', '*') if recursive else os.path.join(target, '*')
+            matches = glob.glob(pattern, recursive=recursive)
+        elif os.path.isfile(target):
+            matches = [target]
+        else:
+            matches = glob.glob(target, recursive=recursive)
+            if not matches:
+                logger.warning(f"No files match '{target}'")
+        files.update(path for path in matches if os.path.isfile(path) and _is_supported(path))
+    return sorted(files)
+
+
+def _init_worker(log_level):
+    get_logger().logger.setLevel(log_level)
+
+
+def run_checks(files, jobs, options, log_level=logging.WARNING, on_result=None):
+    """
+    Check files in a process pool, one file per task
+    
+    Args:
+        files: File paths
+        jobs: Worker processes (1 runs in this process)
+        options: Keyword arguments for core.pipeline.check_file()
+        log_level: Logging level inside the workers
+        on_result: Optional callback(summary) as each file finishes
+    
+    Returns:
+        List of summaries in the order of files
+    """
+    summaries = {}
+    if jobs <= 1 or len(files) <= 1:
+        for path in files:
+            summaries[path] = check_file(path, **options)
+            if on_result is not None:
+                on_result(summaries[path])
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(log_level,)) as pool:
+            futures = {pool.submit(check_file, path, **options): path for path in files}
+            for future in as_completed(futures):
+                summaries[futures[future]] = future.result()
+                if on_result is not None:
+                    on_result(summaries[futures[future]])
+    return [summaries[path] for path in files]
+
+
+def write_summaries(summaries, output):
+    """
+    Write summaries as JSON (full detail) or Parquet (one row per file)
+    
+    Args:
+        summaries: List of summary dictionaries
+        output: Path ending in .json or .parquet
+    """
+    if output.endswith('.parquet'):
+        rows = []
+        for summary in summaries:
+            row = {key: value for key, value in summary.items()
+                   if key not in ('quality_dimensions', 'issues_summary', 'issues', 'recommendations',
+                                  'column_types', 'notices')}
+            for dim, score in summary.get('quality_dimensions', {}).items():
+                row[f'dim_{dim}'] = score
+            for severity, count in summary.get('issues_summary', {}).items():
+                row[f'issues_{severity.lower()}'] = count
+            # Nested detail stays queryable as JSON text
+            row['issues'] = json.dumps(summary.get('issues', []))
+            row['recommendations'] = json.dumps(summary.get('recommendations', []))
+            rows.append(row)
+        pd.DataFrame(rows).to_parquet(output, index=False)
+    else:
+        report = {
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'files': summaries
+        }
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def _print_summary(summary):
+    if summary['status'] != 'ok':
+        print(f"ERROR  {summary['file']}: {summary['error']}", flush=True)
+        return
+    counts = summary['issues_summary']
+    print(
+        f"{summary['health_score']:5.1f} {summary['grade']:<2}  {summary['file']}  "
+        f"({summary['total_rows']:,} rows, {counts['High']} high / {counts['Medium']} medium / "
+        f"{counts['Low']} low issues, {summary['elapsed_s']:.1f}s)",
+        flush=True
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m core.cli',
+        description='Check the health of CSV, Parquet and Feather files.'
+    )
+    parser.add_argument('targets', nargs='+', help='Files, directories or glob patterns')
+    parser.add_argument('-r', '--recursive', action='store_true', help='Descend into subdirectories')
+    parser.add_argument('-o', '--output', help='Write summaries to a .json or .parquet file')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Files analyzed in parallel (worker processes)')
+    parser.add_argument('--sensitivity', type=float, default=DEFAULT_AI_CONTAMINATION,
+                        help='Expected anomaly share for the Isolation Forest')
+    parser.add_argument('--imputation', choices=IMPUTATION_METHODS, default='drop',
+                        help='Missing-value handling before anomaly detection')
+    parser.add_argument('--streaming', choices=list(STREAMING_CHOICES), default='auto',
+                        help='Read CSVs in bounded chunks (auto: large files only)')
+    parser.add_argument('--memory-budget', type=int, default=STREAM_MEMORY_BUDGET_MB,
+                        help='Memory budget in MB for streamed files')
+    parser.add_argument('--no-sample', action='store_true', help='Analyze every row of large files')
+    parser.add_argument('--fail-under', type=float,
+                        help='Exit with status 1 if any file scores below this health score')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Show analysis logs')
+    return parser
+
+
+def main(argv=None):
+    """
+    Entry point; returns the process exit status
+    
+    0 when every file was analyzed (and met --fail-under), 1 when a file
+    failed or scored too low, 2 when no files were found.
+    """
+    args = build_parser().parse_args(argv)
+    log_level = logging.INFO if args.verbose else logging.WARNING
+    logger.logger.setLevel(log_level)
+    
+    files = collect_files(args.targets, recursive=args.recursive)
+    if not files:
+        print("No supported files found", file=sys.stderr)
+        return 2
+    
+    jobs = max(1, min(args.jobs, len(files)))
+    options = {
+        'contamination': args.sensitivity,
+        'imputation_method': args.imputation,
+        'streaming': STREAMING_CHOICES[args.streaming],
+        'memory_budget_mb': args.memory_budget,
+        'sample': not args.no_sample,
+        # Processes already run files side by side; share the cores among them
+        'max_workers': max(1, ANALYSIS_MAX_WORKERS // jobs)
+    }
+    
+    start = time.time()
+    summaries = run_checks(files, jobs, options, log_level=log_level, on_result=_print_summary)
+    
+    if args.output:
+        write_summaries(summaries, args.output)
+    
+    failed = [s for s in summaries if s['status'] != 'ok']
+    below = [s for s in summaries if s['status'] == 'ok' and args.fail_under is not None
+             and s['health_score'] < args.fail_under]
+    print(
+        f"Checked {len(summaries)} files in {time.time() - start:.1f}s: "
+        f"{len(failed)} failed, {len(below)} below threshold",
+        flush=True
+    )
+    return 1 if failed or below else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
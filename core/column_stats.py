@@ -0,0 +1,124 @@
+"""
+Column Statistics Kernel
+Vectorized null counts, quartiles, moments and IQR outliers for all numeric columns at once
+"""
+import pandas as pd
+import numpy as np
+
+from config.constants import OUTLIER_IQR_MULTIPLIER
+
+STATS_COLUMNS = [
+    'count', 'nulls', 'min', 'max', 'q1', 'median', 'q3', 'mean', 'var',
+    'skew', 'kurtosis', 'lower_bound', 'upper_bound', 'outliers'
+]
+
+
+def _quantiles(sorted_values, counts, qs):
+    """
+    Linear-interpolated quantiles of NaN-last column-sorted data
+    (same definition as pandas' default quantile)
+    """
+    cols = np.arange(sorted_values.shape[1])
+    last = np.maximum(counts - 1, 0)
+    out = []
+    for q in qs:
+        pos = last * q
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.minimum(lo + 1, last)
+        lo_vals = sorted_values[lo, cols]
+        hi_vals = sorted_values[hi, cols]
+        values = lo_vals + (hi_vals - lo_vals) * (pos - lo)
+        out.append(np.where(counts > 0, values, np.nan))
+    return out
+
+
+def compute_numeric_stats(df, columns, iqr_multiplier=OUTLIER_IQR_MULTIPLIER, quartiles=None):
+    """
+    Compute per-column statistics for numeric columns in one vectorized pass
+    
+    The columns are copied once into a contiguous float64 array (column-major,
+    so every column is one contiguous block) and sorted once; quartiles,
+    moments and outlier counts are then read off that array for all columns
+    together. Skewness and kurtosis use the same bias-corrected formulas as
+    pandas.
+    
+    Args:
+        df: DataFrame
+        columns: Numeric columns to profile
+        iqr_multiplier: IQR fence multiplier for outlier counts
+        quartiles: Optional dict of column -> (q1, q3) that replaces the
+            quartiles of df (e.g. full-file sketch estimates when df is a sample)
+    
+    Returns:
+        Tuple of (stats DataFrame indexed by column with STATS_COLUMNS,
+        boolean array flagging rows that are an IQR outlier in any column)
+    """
+    n_rows = len(df)
+    if not columns or n_rows == 0:
+        return pd.DataFrame(columns=STATS_COLUMNS, dtype='float64'), np.zeros(n_rows, dtype=bool)
+    
+    values = np.asfortranarray(df[columns].to_numpy(dtype='float64', na_value=np.nan))
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=0)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Moments around the column means
+        sums = np.where(valid, values, 0.0).sum(axis=0)
+        means = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+        centered = np.where(valid, values - means, 0.0)
+        sq = centered * centered
+        m2 = sq.sum(axis=0)
+        m3 = (sq * centered).sum(axis=0)
+        m4 = (sq * sq).sum(axis=0)
+        del centered, sq
+        
+        n = counts.astype('float64')
+        var = np.where(counts > 1, m2 / (n - 1), np.nan)
+        
+        flat = m2 == 0
+        skew = (n * np.sqrt(n - 1) / (n - 2)) * (m3 / m2 ** 1.5)
+        skew = np.where(counts < 3, np.nan, np.where(flat, 0.0, skew))
+        
+        kurt = (n * (n + 1) * (n - 1) * m4) / ((n - 2) * (n - 3) * m2 ** 2) \
+            - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+        kurt = np.where(counts < 4, np.nan, np.where(flat, 0.0, kurt))
+        
+        # One sort gives min, max and all quartiles (NaNs sort last)
+        sorted_values = np.sort(values, axis=0)
+        q1, median, q3 = _quantiles(sorted_values, counts, (0.25, 0.5, 0.75))
+        mins = np.where(counts > 0, sorted_values[0], np.nan)
+        maxs = sorted_values[np.maximum(counts - 1, 0), np.arange(len(columns))]
+        maxs = np.where(counts > 0, maxs, np.nan)
+        del sorted_values
+        
+        if quartiles:
+            for j, col in enumerate(columns):
+                if col in quartiles:
+                    q1[j], q3[j] = quartiles[col]
+        
+        iqr = q3 - q1
+        lower = q1 - iqr_multiplier * iqr
+        upper = q3 + iqr_multiplier * iqr
+        
+        # Fences are skipped for tiny or constant columns
+        fenced = (counts >= 4) & (iqr != 0)
+        outlier_mask = ((values < lower) | (values > upper)) & fenced
+    
+    stats = pd.DataFrame({
+        'count': counts,
+        'nulls': n_rows - counts,
+        'min': mins,
+        'max': maxs,
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'mean': means,
+        'var': var,
+        'skew': skew,
+        'kurtosis': kurt,
+        'lower_bound': lower,
+        'upper_bound': upper,
+        'outliers': outlier_mask.sum(axis=0)
+    }, index=pd.Index(columns))
+    
+    return stats, outlier_mask.any(axis=1)
@@ -0,0 +1,173 @@
+"""
+Correlation Engine
+Pairwise-complete Pearson correlation from mergeable co-moment accumulators
+"""
+import pandas as pd
+import numpy as np
+
+from config.constants import CORR_CHUNK_ROWS, CORR_SPEARMAN_MAX_ROWS
+
+
+class CorrelationAccumulator:
+    """
+    Running co-moments of a set of numeric columns
+    
+    For every column pair (i, j) only rows where both are present count, as
+    in DataFrame.corr(). Entry [i, j] of `count`, `mean` and `m2` holds the
+    row count, the mean of column i and the sum of squared deviations of
+    column i over those rows; `comoment` holds the cross deviations. A chunk
+    is reduced with a few matrix products, and chunks (or accumulators built
+    in other processes) merge with the Chan et al. parallel update.
+    """
+    
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.count = np.zeros((k, k))
+        self.mean = np.zeros((k, k))
+        self.m2 = np.zeros((k, k))
+        self.comoment = np.zeros((k, k))
+    
+    def add_columns(self, columns):
+        """
+        Start tracking more columns (exact when they were missing from every
+        row folded in so far, since such rows pair with nothing)
+        """
+        columns = [c for c in dict.fromkeys(columns) if c not in self.columns]
+        if not columns:
+            return self
+        k_old = len(self.columns)
+        self.columns.extend(columns)
+        k = len(self.columns)
+        for name in ('count', 'mean', 'm2', 'comoment'):
+            grown = np.zeros((k, k))
+            grown[:k_old, :k_old] = getattr(self, name)
+            setattr(self, name, grown)
+        return self
+    
+    def update(self, chunk):
+        """Fold a DataFrame chunk containing the accumulator's columns into the co-moments"""
+        frame = chunk[self.columns]
+        if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in frame.dtypes):
+            # Streamed chunks may parse a numeric column as text; unparseable cells count as missing
+            frame = frame.apply(pd.to_numeric, errors='coerce')
+        values = frame.to_numpy(dtype='float64', na_value=np.nan)
+        present = ~np.isnan(values)
+        if not present.any():
+            return
+        
+        # Shifting by the chunk means keeps the sums small (no cancellation)
+        # (columns with nothing present in this chunk shift by 0)
+        present_counts = present.sum(axis=0)
+        shift = np.divide(np.where(present, values, 0.0).sum(axis=0), present_counts,
+                          out=np.zeros(len(self.columns)), where=present_counts > 0)
+        centered = np.where(present, values - shift, 0.0)
+        weights = present.astype('float64')
+        
+        other = CorrelationAccumulator(self.columns)
+        other.count = weights.T @ weights
+        sums = centered.T @ weights
+        squares = (centered * centered).T @ weights
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pair_mean = np.where(other.count > 0, sums / other.count, 0.0)
+            other.mean = pair_mean + shift[:, None]
+            other.m2 = np.maximum(squares - sums * pair_mean, 0.0)
+            other.comoment = centered.T @ centered - sums * pair_mean.T
+        self.merge(other)
+    
+    def merge(self, other):
+        """Merge another accumulator over the same columns into this one"""
+        total = self.count + other.count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = other.mean - self.mean
+            weight = np.where(total > 0, self.count * other.count / total, 0.0)
+            share = np.where(total > 0, other.count / total, 0.0)
+        
+        self.comoment += other.comoment + delta * delta.T * weight
+        self.m2 += other.m2 + delta * delta * weight
+        self.mean += delta * share
+        self.count = total
+        return self
+    
+    def correlation(self):
+        """
+        Pearson correlation matrix (NaN where a pair has < 2 shared rows or a
+        column is constant over them)
+        
+        Returns:
+            DataFrame indexed and labelled by the columns
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.comoment / np.sqrt(self.m2 * self.m2.T)
+        corr = np.where((self.count >= 2) & np.isfinite(corr), np.clip(corr, -1.0, 1.0), np.nan)
+        np.fill_diagonal(corr, np.where((np.diag(self.count) >= 2) & (np.diag(self.m2) > 0), 1.0, np.nan))
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+    
+    def to_dict(self, columns=None):
+        """Serialize the correlation matrix (of `columns`, default all) as the column labels and plain lists"""
+        columns = self.columns if columns is None else list(columns)
+        return {
+            'columns': columns,
+            'matrix': self.correlation().loc[columns, columns].to_numpy().tolist()
+        }
+
+
+def compute_correlation(df, columns, chunk_rows=CORR_CHUNK_ROWS):
+    """
+    Pairwise-complete Pearson correlation (same result as df[columns].corr())
+    
+    Args:
+        df: DataFrame
+        columns: Numeric columns to correlate
+        chunk_rows: Rows reduced per chunk (bounds the float64 working copy)
+    
+    Returns:
+        Correlation DataFrame
+    """
+    accumulator = CorrelationAccumulator(columns)
+    for start in range(0, len(df), chunk_rows):
+        accumulator.update(df.iloc[start:start + chunk_rows])
+    return accumulator.correlation()
+
+
+def compute_spearman(df, columns, max_rows=CORR_SPEARMAN_MAX_ROWS, random_state=42):
+    """
+    Spearman rank correlation on at most max_rows sampled rows
+    
+    Each column is ranked once over its present values (average ranks for
+    ties) and the ranks are correlated pairwise-complete. Without missing
+    values this equals df.corr(method='spearman'); with them it is a close
+    approximation that avoids re-ranking every pair.
+    
+    Args:
+        df: DataFrame
+        columns: Numeric columns to correlate
+        max_rows: Rows sampled at most
+        random_state: Seed for the row sample
+    
+    Returns:
+        Correlation DataFrame
+    """
+    sample = df[columns]
+    if len(sample) > max_rows:
+        sample = sample.sample(n=max_rows, random_state=random_state)
+    return compute_correlation(sample.rank(), columns)
+
+
+def high_correlation_pairs(corr_matrix, threshold):
+    """
+    Column pairs whose absolute correlation exceeds threshold
+    
+    Args:
+        corr_matrix: Square correlation DataFrame
+        threshold: Absolute correlation cut-off
+    
+    Returns:
+        List of (column 1, column 2, correlation) in upper-triangle row order
+    """
+    values = corr_matrix.to_numpy()
+    with np.errstate(invalid='ignore'):
+        mask = np.triu(np.abs(values) > threshold, k=1)
+    rows, cols = np.nonzero(mask)
+    columns = corr_matrix.columns
+    return [(columns[i], columns[j], float(values[i, j])) for i, j in zip(rows, cols)]
@@ -1,78 +1,202 @@
 """
 Data Loading and Validation
-Handle CSV file upload, validation, and test dataset generation
+Handle CSV, Parquet and Arrow/Feather uploads, validation, and test dataset generation
 """
 import streamlit as st
 import pandas as pd
 import numpy as np
 
-from config.constants import MAX_FILE_SIZE_MB, LARGE_DATASET_THRESHOLD, SAMPLE_FRACTION
+from config.constants import SAMPLE_FRACTION, STREAM_MEMORY_BUDGET_MB, DEFAULT_CSV_ENGINE
+from core.dataset_cache import get_dataset_cache, hash_upload_bytes
+from core.pipeline import load_source, DataSourceError
+from core.readers import detect_file_format, read_column_names
+from core.type_detection import detect_column_types
 from utils.logger import get_logger
-from utils.memory import sample_large_dataset
 
 logger = get_logger()
 
 
-def handle_file_upload(uploaded_file, enable_sampling=True):
+def handle_file_upload(uploaded_file, enable_sampling=True, streaming=None,
+                       memory_budget_mb=STREAM_MEMORY_BUDGET_MB, stratify_by=None,
+                       engine=DEFAULT_CSV_ENGINE, arrow_dtypes=False, columns=None):
     """
-    Validate and load CSV file with optional sampling
+    Validate and load an uploaded file with optional sampling
+    
+    CSV (plain or gzip/zstd/bz2 compressed), Parquet and Arrow IPC/Feather are
+    accepted and all produce the same kind of DataFrame.
     
     Args:
         uploaded_file: Streamlit UploadedFile object
         enable_sampling: Whether to offer sampling for large files
+        streaming: Read in bounded chunks (True), load whole file (False),
+            or decide from file size (None)
+        memory_budget_mb: Memory budget for streaming ingestion
+        stratify_by: Optional column to stratify the streaming sample by
+        engine: 'pyarrow' for the multi-threaded Arrow parser, 'c' for pandas
+        arrow_dtypes: Keep Arrow-backed columns when parsing with pyarrow
+        columns: Optional list of columns to load (others are never decoded)
     
     Returns:
-        DataFrame or None if validation fails
+        DataFrame or None if validation fails. The exact full-file profile
+        (row count, per-column nulls) is kept in st.session_state['source_profile']
+        whenever the file was streamed or sampled, otherwise None.
     """
-    # Check file size
-    file_size_mb = uploaded_file.size / (1024 * 1024)
+    logger.log_file_upload(uploaded_file.name, uploaded_file.size / (1024 * 1024))
+    st.session_state['sampling_prompt_rows'] = 0
     
-    logger.log_file_upload(uploaded_file.name, file_size_mb)
+    def confirm_sampling(n_rows):
+        # Keep the prompt's row count so a cached reload can show it again
+        st.session_state['sampling_prompt_rows'] = n_rows
+        return render_sampling_prompt(n_rows)
     
-    if file_size_mb > MAX_FILE_SIZE_MB:
-        st.error(f"❌ File too large ({file_size_mb:.1f} MB). Maximum: {MAX_FILE_SIZE_MB} MB")
-        return None
-    elif file_size_mb > 50:
-        st.warning(
-            f"⚠️ Large file detected ({file_size_mb:.1f} MB). "
-            f"Analysis may take 30-60 seconds."
+    # Loading and validation are UI-free (core.pipeline); only display happens here
+    try:
+        df, profile, notices = load_source(
+            uploaded_file,
+            filename=uploaded_file.name,
+            streaming=streaming,
+            memory_budget_mb=memory_budget_mb,
+            sample=enable_sampling,
+            stratify_by=stratify_by,
+            engine=engine,
+            arrow_dtypes=arrow_dtypes,
+            columns=columns,
+            confirm_sampling=confirm_sampling
         )
+    except DataSourceError as e:
+        st.error(f"❌ {e}")
+        return None
+    except Exception as e:
+        st.error(f"❌ Error reading file: {str(e)}")
+        logger.log_error_with_context(e, "File reading")
+        return None
     
-    # Load CSV
-    try:
-        if file_size_mb > MAX_FILE_SIZE_MB:
-            st.warning(f"⚠️ Large file ({file_size_mb:.1f} MB). Analyzing first 10k rows.")
-            df = pd.read_csv(uploaded_file, nrows=10000)
+    for notice in notices:
+        if notice['level'] == 'warning':
+            st.warning(f"⚠️ {notice['message']}")
         else:
-            df = pd.read_csv(uploaded_file)
-        
-        # Validation
-        if df.empty:
-            st.error("❌ The uploaded file is empty!")
-            return None
+            st.info(f"📉 {notice['message']}")
+    
+    # Exact full-file counts for the overview cards and health score
+    st.session_state['source_profile'] = profile
+    
+    return df
+
+
+def render_sampling_prompt(n_rows):
+    """Ask whether to analyze a sample of a large in-memory dataset"""
+    return st.checkbox(
+        f"📊 Dataset has {n_rows:,} rows. Use {SAMPLE_FRACTION*100:.0f}% sample for faster analysis?",
+        value=True,
+        key="use_sampling"
+    )
+
+
+def load_dataset(uploaded_file, settings, columns=None):
+    """
+    Load, validate and type-detect an upload, reusing a cached parse when the
+    same bytes were already loaded with the same options
+    
+    Args:
+        uploaded_file: Streamlit UploadedFile object
+        settings: Sidebar settings (parser, streaming and sampling options)
+        columns: Optional list of columns to load
+    
+    Returns:
+        Tuple of (DataFrame, column types) or (None, None) if loading failed
+    """
+    # Hash the bytes once per upload, not on every rerun
+    digests = st.session_state.setdefault('upload_digests', {})
+    file_id = getattr(uploaded_file, 'file_id', None) or f"{uploaded_file.name}:{uploaded_file.size}"
+    if file_id not in digests:
+        digests[file_id] = hash_upload_bytes(uploaded_file.getbuffer())
+    
+    options = {
+        'columns': columns,
+        'engine': settings['csv_engine'],
+        'arrow_dtypes': settings['arrow_dtypes'],
+        'streaming': settings['streaming'],
+        'memory_budget_mb': settings['memory_budget_mb'],
+        'stratify_by': settings['stratify_by'],
+        'use_sampling': st.session_state.get('use_sampling', True)
+    }
+    
+    cache = get_dataset_cache()
+    key = cache.make_key(digests[file_id], options)
+    cached = cache.get(key)
+    
+    if cached is not None:
+        df, meta = cached
+        logger.info(f"Dataset cache hit: {uploaded_file.name} ({len(df):,} rows)")
         
-        if len(df.columns) == 0:
-            st.error("❌ No columns found in the file!")
-            return None
+        # Keep the sampling prompt on screen so it can still be toggled
+        if meta['sampling_prompt_rows']:
+            render_sampling_prompt(meta['sampling_prompt_rows'])
         
-        # Sampling for very large datasets
-        if enable_sampling and len(df) > LARGE_DATASET_THRESHOLD:
-            use_sample = st.checkbox(
-                f"📊 Dataset has {len(df):,} rows. Use {SAMPLE_FRACTION*100:.0f}% sample for faster analysis?",
-                value=True,
-                key="use_sampling"
-            )
-            if use_sample:
-                df, was_sampled = sample_large_dataset(df, LARGE_DATASET_THRESHOLD, SAMPLE_FRACTION)
-                if was_sampled:
-                    st.info(f"📉 Using sample of {len(df):,} rows for analysis")
+        profile = meta['source_profile']
+        if profile is not None and profile['truncated']:
+            st.info(f"📉 Using sample of {len(df):,} of {profile['total_rows']:,} rows for analysis")
         
-        return df
+        st.session_state['source_profile'] = profile
+        return df, meta['col_types']
+    
+    df = handle_file_upload(
+        uploaded_file,
+        streaming=settings['streaming'],
+        memory_budget_mb=settings['memory_budget_mb'],
+        stratify_by=settings['stratify_by'],
+        engine=settings['csv_engine'],
+        arrow_dtypes=settings['arrow_dtypes'],
+        columns=columns
+    )
+    
+    if df is None:
+        return None, None
+    
+    col_types, df = detect_column_types(df)
+    
+    profile = st.session_state.get('source_profile')
+    
+    cache.put(key, df, {
+        'col_types': col_types,
+        'source_profile': profile,
+        'sampling_prompt_rows': st.session_state.get('sampling_prompt_rows', 0),
+        'arrow_dtypes': any(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+    })
+    
+    return df, col_types
+
+
+def select_columns_to_load(uploaded_file):
+    """
+    Let the user pick which columns to load before the file is parsed
+    
+    Only the header (CSV) or schema (Parquet/Arrow) is read here.
+    
+    Args:
+        uploaded_file: Streamlit UploadedFile object
     
+    Returns:
+        List of selected columns, or None to load every column
+    """
+    try:
+        file_format, compression = detect_file_format(uploaded_file.name)
+        all_columns = read_column_names(uploaded_file, file_format, compression)
     except Exception as e:
-        st.error(f"❌ Error reading CSV: {str(e)}")
-        logger.log_error_with_context(e, "CSV file reading")
+        logger.log_error_with_context(e, "Reading column names")
+        return None
+    
+    with st.expander(f"🗂️ Columns to Load ({len(all_columns)} available)", expanded=False):
+        selected = st.multiselect(
+            "Only the selected columns are decoded",
+            all_columns,
+            default=all_columns,
+            key=f"load_columns_{uploaded_file.name}"
+        )
+    
+    if not selected or len(selected) == len(all_columns):
         return None
+    return selected
 
 
 def generate_test_dataset():
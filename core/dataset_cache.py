@@ -0,0 +1,172 @@
+"""
+Parsed Dataset Cache
+Content-addressed on-disk cache of loaded, type-detected DataFrames
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from config.constants import CACHE_TTL, DATASET_CACHE_DIR, DATASET_CACHE_MAX_MB
+from core.readers import table_to_pandas
+from utils.cache import DiskCache
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def hash_upload_bytes(data):
+    """
+    Fast content hash of raw upload bytes
+    
+    Args:
+        data: bytes, bytearray or memoryview
+    
+    Returns:
+        Hex digest string
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class DatasetCache:
+    """
+    Stores DataFrames as Parquet files named by a content key, evicting the
+    least recently used entries once the directory exceeds its size budget
+    
+    Uploads may hold personal data, so the directory must be private to the
+    current user (otherwise the cache is disabled), files are created
+    owner-only and entries expire after `ttl` seconds. The metadata (column
+    types, the source profile) is kept exactly as stored: it is pickled and
+    signed by a utils.cache.DiskCache sharing the directory.
+    """
+    
+    def __init__(self, cache_dir=DATASET_CACHE_DIR, max_bytes=DATASET_CACHE_MAX_MB * 1024 ** 2, ttl=CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._meta = DiskCache(cache_dir, max_bytes, ttl)
+        self.enabled = self._meta.enabled
+    
+    @staticmethod
+    def make_key(content_hash, options):
+        """Combine the content hash with the load options that shaped the frame"""
+        options_json = json.dumps(options, sort_keys=True, default=str)
+        options_hash = hashlib.blake2b(options_json.encode(), digest_size=8).hexdigest()
+        return f"{content_hash}_{options_hash}"
+    
+    def _paths(self, key):
+        return os.path.join(self.cache_dir, key + '.parquet'), self._meta._path(key)
+    
+    def _remove(self, key):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def get(self, key):
+        """
+        Look up a live cached frame
+        
+        Returns:
+            Tuple of (DataFrame, metadata dict) or None on a miss
+        """
+        if not self.enabled:
+            return None
+        data_path, _ = self._paths(key)
+        try:
+            if time.time() - os.path.getmtime(data_path) > self.ttl:
+                self._remove(key)
+                return None
+        except OSError:
+            return None
+        
+        # The metadata tier verifies its entry and bumps its recency
+        meta = self._meta.get(key)
+        if meta is None:
+            return None
+        try:
+            table = pq.read_table(data_path, memory_map=True)
+            os.utime(data_path)
+        except (OSError, ValueError, pa.ArrowException):
+            return None
+        
+        return table_to_pandas(table, meta.get('arrow_dtypes', False)), meta
+    
+    def put(self, key, df, meta):
+        """
+        Store a frame; frames Parquet cannot represent and metadata that
+        cannot be pickled are skipped
+        
+        Returns:
+            True when the entry was written
+        """
+        if not self.enabled:
+            return False
+        data_path, _ = self._paths(key)
+        tmp_path = f"{data_path}.tmp{os.getpid()}_{threading.get_ident()}"
+        
+        try:
+            table = pa.Table.from_pandas(df)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                pq.write_table(table, f)
+            # Atomic rename: concurrent readers never see partial files
+            os.replace(tmp_path, data_path)
+        except (OSError, ValueError, TypeError, pa.ArrowException) as e:
+            logger.log_error_with_context(e, "Dataset cache write")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        
+        # The frame is only found once its metadata exists
+        if not self._meta.set(key, meta):
+            self._remove(key)
+            return False
+        
+        self._evict()
+        return True
+    
+    def _evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            expired_before = time.time() - self.ttl
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.parquet'):
+                    continue
+                key = name[:-len('.parquet')]
+                data_path, meta_path = self._paths(key)
+                try:
+                    info = os.stat(data_path)
+                except OSError:
+                    continue
+                if info.st_mtime < expired_before:
+                    self._remove(key)
+                    continue
+                size = info.st_size + (os.path.getsize(meta_path) if os.path.exists(meta_path) else 0)
+                entries.append((info.st_mtime, size, key))
+                total += size
+            
+            for _, size, key in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(key)
+                total -= size
+                logger.info(f"Dataset cache evicted {key} ({size / 1024**2:.1f} MB)")
+
+
+_dataset_cache = None
+
+
+def get_dataset_cache():
+    """Get the process-wide dataset cache"""
+    global _dataset_cache
+    if _dataset_cache is None:
+        _dataset_cache = DatasetCache()
+    return _dataset_cache
@@ -0,0 +1,149 @@
+"""
+PCA Service
+Standardize + PCA fitted once per dataset, shared by the analysis, plots and reduced-dataset export
+"""
+import numpy as np
+from sklearn.decomposition import PCA, IncrementalPCA
+from sklearn.preprocessing import StandardScaler
+
+from config.constants import (
+    PCA_MAX_COMPONENTS, PCA_RANDOMIZED_MIN_FEATURES, PCA_INCREMENTAL_MIN_ROWS,
+    PCA_BATCH_ROWS, PCA_PLOT_MAX_ROWS
+)
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+class PCAService:
+    """
+    A fitted scaler + PCA pair
+    
+    Tall inputs (PCA_INCREMENTAL_MIN_ROWS+ rows) are standardized and fitted
+    in PCA_BATCH_ROWS chunks with IncrementalPCA, so no scaled copy of the
+    whole matrix is ever held. Wide inputs (many columns, few rows per
+    column) use randomized SVD, which only computes the leading components;
+    everything else lets sklearn choose between exact SVD and the
+    covariance eigensolver.
+    """
+    
+    def __init__(self, n_components, random_state=42):
+        self.n_components = n_components
+        self.random_state = random_state
+        self.scaler = StandardScaler()
+        self.pca = None
+        self.solver = None
+        self.feature_names = []
+    
+    def fit(self, df):
+        """
+        Fit on a fully numeric DataFrame without missing values
+        
+        Returns:
+            self
+        """
+        self.feature_names = list(df.columns)
+        n_rows, n_features = df.shape
+        
+        if n_rows >= PCA_INCREMENTAL_MIN_ROWS:
+            self.solver = 'incremental'
+            for chunk in self._chunks(df):
+                self.scaler.partial_fit(chunk)
+            batch_rows = max(PCA_BATCH_ROWS, self.n_components)
+            self.pca = IncrementalPCA(n_components=self.n_components, batch_size=batch_rows)
+            for chunk in self._chunks(df):
+                # IncrementalPCA needs at least n_components rows per batch
+                if len(chunk) >= self.n_components:
+                    self.pca.partial_fit(self.scaler.transform(chunk))
+        else:
+            scaled = self.scaler.fit_transform(df.to_numpy(dtype='float64'))
+            wide = n_features >= PCA_RANDOMIZED_MIN_FEATURES and n_rows < 10 * n_features
+            if wide and self.n_components < 0.8 * min(n_rows, n_features):
+                self.solver = 'randomized'
+            else:
+                # sklearn picks exact SVD or the covariance eigensolver (tall data)
+                self.solver = 'auto'
+            self.pca = PCA(n_components=self.n_components, svd_solver=self.solver,
+                           random_state=self.random_state)
+            self.pca.fit(scaled)
+        
+        logger.info(f"PCA fitted ({self.solver}, {n_rows:,} x {n_features}, {self.n_components} components)")
+        return self
+    
+    def transform(self, df, n_components=None):
+        """
+        Project rows onto the leading components (chunked, float32)
+        
+        Args:
+            df: DataFrame with the fitted columns (no missing values)
+            n_components: Keep only the first n components (default: all)
+        
+        Returns:
+            float32 array of shape (len(df), n_components)
+        """
+        k = n_components or self.n_components
+        components = self.pca.components_[:k]
+        mean = getattr(self.pca, 'mean_', None)
+        
+        out = np.empty((len(df), k), dtype=np.float32)
+        for start, chunk in self._chunks(df[self.feature_names], with_start=True):
+            scaled = self.scaler.transform(chunk)
+            if mean is not None:
+                scaled = scaled - mean
+            out[start:start + len(chunk)] = scaled @ components.T
+        return out
+    
+    @property
+    def explained_variance_ratio(self):
+        return self.pca.explained_variance_ratio_
+    
+    @property
+    def loadings(self):
+        return self.pca.components_
+    
+    @staticmethod
+    def _chunks(df, with_start=False):
+        for start in range(0, len(df), PCA_BATCH_ROWS):
+            chunk = df.iloc[start:start + PCA_BATCH_ROWS].to_numpy(dtype='float64')
+            yield (start, chunk) if with_start else chunk
+
+
+def fit_pca(df, max_components=PCA_MAX_COMPONENTS, random_state=42):
+    """
+    Fit the PCA service for a model input (cached by the analysis as the
+    'pca_fit' stage)
+    
+    Args:
+        df: Fully numeric DataFrame without missing values
+        max_components: Upper bound on components kept
+        random_state: Seed for randomized SVD
+    
+    Returns:
+        Fitted PCAService
+    """
+    n_components = min(max_components, df.shape[1], len(df))
+    return PCAService(n_components, random_state).fit(df)
+
+
+def plot_sample_positions(n_rows, always_include=None, max_rows=PCA_PLOT_MAX_ROWS, random_state=42):
+    """
+    Row positions to draw in a scatter plot
+    
+    Every position in always_include (e.g. anomalies) is kept; the rest are a
+    random sample so the total stays within max_rows.
+    
+    Returns:
+        Sorted integer array of positions
+    """
+    if n_rows <= max_rows:
+        return np.arange(n_rows)
+    
+    keep = np.zeros(n_rows, dtype=bool)
+    if always_include is not None:
+        keep[np.asarray(always_include, dtype=np.int64)] = True
+    
+    budget = max(0, max_rows - int(keep.sum()))
+    rest = np.flatnonzero(~keep)
+    rng = np.random.default_rng(random_state)
+    keep[rng.choice(rest, size=min(budget, len(rest)), replace=False)] = True
+    return np.flatnonzero(keep)
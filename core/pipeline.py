@@ -0,0 +1,279 @@
+"""
+Headless Analysis Pipeline
+Load, type-detect and analyze a file without any Streamlit UI (CLI and services)
+"""
+import math
+import os
+import time
+
+import pandas as pd
+import numpy as np
+
+from config.constants import (
+    MAX_FILE_SIZE_MB, STREAMING_THRESHOLD_MB, STREAM_MEMORY_BUDGET_MB, STREAM_SAMPLE_ROWS,
+    LARGE_DATASET_THRESHOLD, SAMPLE_FRACTION, DEFAULT_CSV_ENGINE, DEFAULT_AI_CONTAMINATION,
+    ANALYSIS_MAX_WORKERS
+)
+from core.analysis import analyze_csv_with_ai
+from core.readers import detect_file_format, open_csv_stream, read_file
+from core.streaming import stream_csv, profile_dataframe
+from core.type_detection import detect_column_types
+from features.statistics import get_health_grade
+from utils.logger import get_logger
+from utils.memory import sample_large_dataset
+
+logger = get_logger()
+
+
+class DataSourceError(ValueError):
+    """The input cannot be analyzed (unsupported format, too large, no data)"""
+
+
+def _source_size(source):
+    """Size in bytes of a path or file-like object (None if unknown)"""
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    size = getattr(source, 'size', None)
+    if size is None and hasattr(source, 'seek') and hasattr(source, 'tell'):
+        position = source.tell()
+        size = source.seek(0, os.SEEK_END)
+        source.seek(position)
+    return size
+
+
+def load_source(source, filename=None, streaming=None, memory_budget_mb=STREAM_MEMORY_BUDGET_MB,
+                sample=True, stratify_by=None, engine=DEFAULT_CSV_ENGINE, arrow_dtypes=False,
+                columns=None, max_size_mb=MAX_FILE_SIZE_MB, confirm_sampling=None):
+    """
+    Load a file into a DataFrame, streaming or sampling large inputs
+    
+    Same rules as the upload flow: CSV over STREAMING_THRESHOLD_MB is
+    streamed (profiling every row, keeping a reservoir sample), and an
+    in-memory frame over LARGE_DATASET_THRESHOLD rows is sampled when
+    `sample` is set (and confirm_sampling agrees). Problems are raised and
+    messages returned, never displayed, so a UI decides how to show them.
+    
+    Args:
+        source: Path or file-like object
+        filename: Name used to detect the format (defaults to the source name)
+        streaming: True/False to force, None to decide from the file size
+        memory_budget_mb: Memory budget for streaming ingestion
+        sample: Analyze a sample of very large inputs
+        stratify_by: Optional column to stratify the streaming sample by
+        engine: 'pyarrow' or 'c' CSV parser
+        arrow_dtypes: Keep Arrow-backed columns when parsing with pyarrow
+        columns: Optional list of columns to load
+        max_size_mb: Largest file loaded whole (None for no limit)
+        confirm_sampling: Optional function(n_rows) -> bool asked before
+            sampling a large in-memory frame (e.g. a UI checkbox)
+    
+    Returns:
+        Tuple of (DataFrame, profile, notices)
+        - profile: exact full-file profile when the data was streamed or
+          sampled (see core.streaming), otherwise None
+        - notices: list of {'level': 'info' | 'warning', 'message'} for the
+          caller to show
+    
+    Raises:
+        DataSourceError: Unsupported format, file too large, unreadable or no data
+    """
+    filename = filename or str(getattr(source, 'name', source))
+    try:
+        file_format, compression = detect_file_format(filename)
+    except ValueError as e:
+        raise DataSourceError(str(e)) from e
+    size_bytes = _source_size(source)
+    file_size_mb = (size_bytes or 0) / (1024 * 1024)
+    notices = []
+    
+    # Columnar formats are already bounded by column projection
+    if file_format != 'csv':
+        streaming = False
+    elif streaming is None:
+        streaming = file_size_mb > STREAMING_THRESHOLD_MB
+    
+    if max_size_mb is not None and file_size_mb > max_size_mb and not streaming:
+        raise DataSourceError(f"File too large ({file_size_mb:.1f} MB). Maximum: {max_size_mb} MB")
+    elif file_size_mb > STREAMING_THRESHOLD_MB:
+        notices.append({
+            'level': 'warning',
+            'message': f"Large file detected ({file_size_mb:.1f} MB). Analysis may take 30-60 seconds."
+        })
+    
+    profile = None
+    try:
+        if streaming:
+            df, profile = stream_csv(
+                open_csv_stream(source, compression),
+                memory_budget_mb=memory_budget_mb,
+                sample_rows=STREAM_SAMPLE_ROWS if sample else None,
+                stratify_by=stratify_by or None,
+                usecols=columns
+            )
+            if profile['truncated']:
+                # Describe the sample that was drawn, not the one requested
+                notices.append({
+                    'level': 'info',
+                    'message': (f"Streamed all {profile['total_rows']:,} rows; analyzing a "
+                                f"{'stratified' if profile['stratified_by'] is not None else 'uniform'} "
+                                f"sample of {profile['retained_rows']:,} rows")
+                })
+            if stratify_by and profile['stratified_by'] is None:
+                notices.append({
+                    'level': 'warning',
+                    'message': f"Column '{stratify_by}' not found; stratification was skipped"
+                })
+        else:
+            df = read_file(source, filename=filename, engine=engine, arrow_dtypes=arrow_dtypes, columns=columns)
+    except Exception as e:
+        logger.log_error_with_context(e, "File reading")
+        raise DataSourceError(f"Error reading file: {e}") from e
+    
+    if df.empty:
+        raise DataSourceError("The file is empty")
+    if len(df.columns) == 0:
+        raise DataSourceError("No columns found in the file")
+    
+    # Streamed files are sampled while reading
+    if (sample and not streaming and len(df) > LARGE_DATASET_THRESHOLD
+            and (confirm_sampling is None or confirm_sampling(len(df)))):
+        profile = profile_dataframe(df)
+        df, was_sampled = sample_large_dataset(df, LARGE_DATASET_THRESHOLD, SAMPLE_FRACTION)
+        profile['retained_rows'] = len(df)
+        profile['truncated'] = was_sampled
+        if was_sampled:
+            notices.append({'level': 'info', 'message': f"Using sample of {len(df):,} rows for analysis"})
+    
+    return df, profile, notices
+
+
+# Options accepted by run_health_check, shared by the CLI and the HTTP API
+IMPUTATION_METHODS = ('drop', 'mean', 'mice', 'mice_fast', 'mice_multiple')
+STREAMING_CHOICES = {'auto': None, 'always': True, 'never': False}  # name -> load_source(streaming=...)
+
+
+def run_health_check(source, filename=None, contamination=DEFAULT_AI_CONTAMINATION, imputation_method='drop',
+                     max_workers=ANALYSIS_MAX_WORKERS, progress_callback=None, **load_options):
+    """
+    Load, type-detect and analyze one file
+    
+    Args:
+        source: Path or file-like object
+        filename: Name used to detect the format (defaults to the source name)
+        contamination: Expected anomaly share for the Isolation Forest
+        imputation_method: One of IMPUTATION_METHODS
+        max_workers: Threads used by the analysis
+        progress_callback: Forwarded to analyze_csv_with_ai()
+        **load_options: Forwarded to load_source()
+    
+    Returns:
+        Tuple of (DataFrame, column types, results, notices)
+    """
+    df, profile, notices = load_source(source, filename=filename, **load_options)
+    types, df = detect_column_types(df)
+    results = analyze_csv_with_ai(
+        df, types, contamination, imputation_method, source_profile=profile, max_workers=max_workers,
+        progress_callback=progress_callback
+    )
+    return df, types, results, notices
+
+
+def summarize_results(df, types, results):
+    """
+    JSON-safe summary of an analysis (no DataFrames, models or figures)
+    
+    Args:
+        df: Analyzed DataFrame
+        types: Column types from detect_column_types()
+        results: Dictionary from analyze_csv_with_ai()
+    
+    Returns:
+        Dictionary of plain Python values
+    """
+    severities = {'High': 0, 'Medium': 0, 'Low': 0}
+    for issue in results['issues']:
+        severities[issue['severity']] = severities.get(issue['severity'], 0) + 1
+    
+    anomalies = results['stats'].get('ai_anomalies')
+    return {
+        'health_score': float(results['health_score']),
+        'grade': get_health_grade(results['health_score']),
+        'quality_dimensions': {dim: float(score) for dim, score in results['quality_dimensions'].items()},
+        'total_rows': int(results['total_rows']),
+        'analyzed_rows': len(df),
+        'columns': len(df.columns),
+        'sampled': bool(results['sampled']),
+        'issues_summary': severities,
+        'issues': [{key: str(value) for key, value in issue.items()} for issue in results['issues']],
+        'recommendations': [str(rec) for rec in results['recommendations']],
+        'ai_anomalies': len(anomalies['indices']) if anomalies else 0,
+        'column_types': {kind: [str(col) for col in cols] for kind, cols in types.items()}
+    }
+
+
+def check_file(path, **options):
+    """
+    Run and summarize the health check of one file, capturing failures
+    
+    Args:
+        path: File path
+        **options: Forwarded to run_health_check()
+    
+    Returns:
+        Summary dictionary with 'file', 'status' ('ok' or 'error'),
+        'elapsed_s', and either the summarize_results() fields or 'error'
+    """
+    start = time.time()
+    try:
+        df, types, results, notices = run_health_check(path, **options)
+        summary = {'file': str(path), 'status': 'ok'}
+        summary.update(summarize_results(df, types, results))
+        summary['notices'] = notices
+    except Exception as e:
+        logger.log_error_with_context(e, f"Health check of {path}")
+        summary = {'file': str(path), 'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+    summary['elapsed_s'] = round(time.time() - start, 3)
+    return summary
+
+
+def to_jsonable(value):
+    """
+    Convert analysis values to plain JSON types
+    
+    DataFrames become lists of records, arrays and Series lists, NumPy
+    scalars Python numbers, and NaN/inf None. Objects with no JSON form
+    (fitted models, figures) become None.
+    """
+    if isinstance(value, dict):
+        return {str(key): to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_jsonable(item) for item in value]
+    if isinstance(value, pd.DataFrame):
+        return to_jsonable(value.to_dict(orient='records'))
+    if isinstance(value, (pd.Series, pd.Index, np.ndarray)):
+        return to_jsonable(list(value))
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if value is None or isinstance(value, (str, int, bool)):
+        return value
+    if value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, (pd.Timestamp, pd.Timedelta)):
+        return str(value)
+    return None
+
+
+def results_to_json(results):
+    """
+    The results dictionary as JSON-safe values (without the fitted model
+    and the Plotly figures)
+    
+    Args:
+        results: Dictionary from analyze_csv_with_ai()
+    
+    Returns:
+        Dictionary of plain Python values
+    """
+    return to_jsonable({key: value for key, value in results.items() if key not in ('model', 'visualizations')})
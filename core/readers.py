@@ -0,0 +1,280 @@
+"""
+Fast File Readers
+UI-free parsing paths for CSV (plain or compressed), Parquet and Arrow IPC/Feather
+"""
+import io
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from config.constants import CSV_SNIFF_BYTES
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# File extension -> (format, compression codec)
+FILE_FORMATS = {
+    '.csv': ('csv', None),
+    '.gz': ('csv', 'gzip'),
+    '.zst': ('csv', 'zstd'),
+    '.bz2': ('csv', 'bz2'),
+    '.parquet': ('parquet', None),
+    '.pq': ('parquet', None),
+    '.feather': ('ipc', None),
+    '.arrow': ('ipc', None),
+    '.ipc': ('ipc', None)
+}
+
+SUPPORTED_EXTENSIONS = [ext.lstrip('.') for ext in FILE_FORMATS]
+
+
+def detect_file_format(filename):
+    """
+    Identify the format of a file from its name
+    
+    Args:
+        filename: File name or path (e.g. 'data.csv.gz')
+    
+    Returns:
+        Tuple of (format, compression) where format is 'csv', 'parquet' or 'ipc'
+        and compression is a pyarrow codec name or None
+    """
+    ext = os.path.splitext(str(filename).lower())[1]
+    if ext not in FILE_FORMATS:
+        raise ValueError(f"Unsupported file type '{ext or filename}'")
+    return FILE_FORMATS[ext]
+
+
+def _source_name(source):
+    return getattr(source, 'name', source if isinstance(source, (str, os.PathLike)) else '')
+
+
+def _arrow_input(source):
+    """
+    Wrap a source for pyarrow without copying it
+    
+    Paths are memory-mapped; in-memory uploads are read through a buffer view.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return pa.memory_map(os.fspath(source), 'r')
+    if hasattr(source, 'getbuffer'):
+        return pa.BufferReader(pa.py_buffer(source.getbuffer()))
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return pa.BufferReader(source)
+    return source
+
+
+def open_csv_stream(source, compression=None):
+    """
+    Open a CSV source as a binary file-like object, decompressing on the fly
+    
+    Args:
+        source: Path or file-like object
+        compression: pyarrow codec name ('gzip', 'zstd', 'bz2') or None
+    
+    Returns:
+        File-like object readable by pd.read_csv
+    """
+    if compression is None:
+        return source
+    return pa.CompressedInputStream(_arrow_input(source), compression)
+
+
+def _read_bytes(source):
+    """Return the raw bytes of a path, bytes object or (re-seekable) file-like"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, 'getvalue'):
+        return source.getvalue()
+    if hasattr(source, 'read'):
+        source.seek(0)
+        data = source.read()
+        source.seek(0)
+        return data
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def sniff_csv_types(data, sniff_bytes=CSV_SNIFF_BYTES):
+    """
+    Infer Arrow column types from the head of a CSV
+    
+    Args:
+        data: Raw CSV bytes
+        sniff_bytes: How many leading bytes to inspect
+    
+    Returns:
+        Dictionary of column name -> pyarrow DataType (all-null columns omitted)
+    """
+    head = data[:sniff_bytes]
+    if len(data) > sniff_bytes:
+        # Cut at the last complete line so the sniff never sees a partial row
+        head = head[:head.rfind(b'\n') + 1]
+    
+    if not head.strip():
+        return {}
+    
+    schema = pa_csv.read_csv(pa.BufferReader(head)).schema
+    return {
+        field.name: field.type
+        for field in schema
+        if not pa.types.is_null(field.type)
+    }
+
+
+def _arrow_types_mapper(arrow_type):
+    # Dates and timestamps stay datetime64[ns] so type detection and the
+    # time-series charts see ordinary datetime columns
+    if pa.types.is_temporal(arrow_type):
+        return None
+    return pd.ArrowDtype(arrow_type)
+
+
+def read_column_names(source, file_format='csv', compression=None):
+    """
+    Read only the column names of a file (header line or schema)
+    
+    Args:
+        source: Path or file-like object
+        file_format: 'csv', 'parquet' or 'ipc'
+        compression: Codec for compressed CSV
+    
+    Returns:
+        List of column names
+    """
+    if file_format == 'parquet':
+        names = pq.read_schema(_arrow_input(source)).names
+    elif file_format == 'ipc':
+        names = pa.ipc.open_file(_arrow_input(source)).schema.names
+    else:
+        stream = open_csv_stream(source, compression)
+        names = pd.read_csv(stream, nrows=0).columns.tolist()
+    
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return names
+
+
+def read_table_file(source, file_format, columns=None, arrow_dtypes=False):
+    """
+    Load a Parquet or Arrow IPC/Feather file, decoding only the requested columns
+    
+    Paths are memory-mapped and IPC files are read zero-copy, so unselected
+    columns are never materialized.
+    
+    Args:
+        source: Path or file-like object
+        file_format: 'parquet' or 'ipc'
+        columns: Optional list of columns to load
+        arrow_dtypes: Return Arrow-backed columns instead of NumPy ones
+    
+    Returns:
+        DataFrame
+    """
+    if file_format == 'parquet':
+        table = pq.read_table(_arrow_input(source), columns=columns, use_threads=True)
+    elif file_format == 'ipc':
+        table = feather.read_table(_arrow_input(source), columns=columns, memory_map=True)
+    else:
+        raise ValueError(f"Not a columnar format: '{file_format}'")
+    
+    return table_to_pandas(table, arrow_dtypes)
+
+
+def read_file(source, filename=None, engine='pyarrow', arrow_dtypes=False, columns=None):
+    """
+    Load any supported file into a DataFrame
+    
+    Args:
+        source: Path or file-like object
+        filename: Name used to detect the format (defaults to the source name)
+        engine: CSV parser, 'pyarrow' or 'c'
+        arrow_dtypes: Keep Arrow-backed columns (pyarrow paths only)
+        columns: Optional list of columns to load
+    
+    Returns:
+        DataFrame
+    """
+    file_format, compression = detect_file_format(filename or _source_name(source))
+    
+    if file_format != 'csv':
+        return read_table_file(source, file_format, columns=columns, arrow_dtypes=arrow_dtypes)
+    
+    if compression is not None:
+        source = io.BytesIO(open_csv_stream(source, compression).read())
+    
+    if engine == 'pyarrow':
+        return read_csv_arrow(source, arrow_dtypes=arrow_dtypes, columns=columns)
+    return pd.read_csv(source, usecols=columns)
+
+
+def read_csv_arrow(source, sniff=True, arrow_dtypes=False, columns=None):
+    """
+    Parse a CSV with the multi-threaded pyarrow reader
+    
+    Args:
+        source: Path, bytes or file-like object
+        sniff: Infer column types from the head first and pin them for the full parse
+        arrow_dtypes: Return Arrow-backed columns (dtype_backend="pyarrow")
+            instead of NumPy ones; off by default so text columns stay
+            `object` like the C engine and streamed reads produce
+        columns: Optional list of columns to decode (others are skipped)
+    
+    Returns:
+        DataFrame
+    """
+    data = _read_bytes(source)
+    
+    read_options = pa_csv.ReadOptions(use_threads=True)
+    convert_kwargs = {'include_columns': columns} if columns else {}
+    
+    column_types = {}
+    if sniff:
+        try:
+            column_types = sniff_csv_types(data)
+        except pa.ArrowInvalid as e:
+            logger.log_error_with_context(e, "CSV type sniffing")
+    
+    try:
+        table = pa_csv.read_csv(
+            pa.BufferReader(data),
+            read_options=read_options,
+            convert_options=pa_csv.ConvertOptions(column_types=column_types, **convert_kwargs)
+        )
+    except pa.ArrowInvalid as e:
+        if not column_types:
+            raise
+        # A value past the sniffed head did not fit its hinted type
+        logger.log_error_with_context(e, "Sniffed CSV types rejected, re-inferring")
+        table = pa_csv.read_csv(
+            pa.BufferReader(data),
+            read_options=read_options,
+            convert_options=pa_csv.ConvertOptions(**convert_kwargs)
+        )
+    
+    return table_to_pandas(table, arrow_dtypes)
+
+
+def table_to_pandas(table, arrow_dtypes):
+    """
+    Convert an Arrow table the same way every reader does
+    
+    Args:
+        table: pyarrow Table
+        arrow_dtypes: Arrow-backed columns (dates and timestamps stay datetime64)
+            or plain NumPy columns
+    
+    Returns:
+        DataFrame
+    """
+    if arrow_dtypes:
+        return table.to_pandas(
+            types_mapper=_arrow_types_mapper,
+            date_as_object=False,
+            self_destruct=True
+        )
+    return table.to_pandas(date_as_object=False, split_blocks=True, self_destruct=True)
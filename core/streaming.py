@@ -0,0 +1,281 @@
+"""
+Streaming CSV Ingestion
+Read large CSV files in bounded chunks and profile every row with mergeable accumulators
+"""
+import pandas as pd
+import numpy as np
+
+from config.constants import (
+    STREAM_MEMORY_BUDGET_MB, STREAM_CHUNK_BUDGET_FRACTION, STREAM_PROBE_ROWS, CORR_CHUNK_ROWS
+)
+from core.correlation import CorrelationAccumulator
+from utils.cache import compute_params_hash
+from utils.logger import get_logger
+from utils.memory import ReservoirSampler, StratifiedReservoirSampler
+from utils.sketches import KLLSketch, HyperLogLog, SpaceSaving
+
+logger = get_logger()
+
+
+class ColumnAccumulator:
+    """
+    Running statistics for a single column that can be merged across chunks
+    
+    Numeric moments use the Chan et al. parallel update, so accumulators built
+    on separate chunks (or processes) merge to the same result as one pass.
+    Quartiles, distinct counts and top values come from mergeable sketches
+    (utils.sketches), so they also cover every row in bounded memory.
+    """
+    
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.nulls = 0
+        self.is_numeric = True
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.quantiles = KLLSketch()
+        self.distinct = HyperLogLog()
+        self.top_values = SpaceSaving()
+    
+    def update(self, series):
+        """Fold one chunk of the column into the running statistics"""
+        null_mask = series.isna()
+        n_null = int(null_mask.sum())
+        self.nulls += n_null
+        if n_null == len(series):
+            # An all-null chunk says nothing about the column's type
+            return
+        present = series[~null_mask] if n_null else series
+        self.distinct.update(present)
+        self.top_values.update(present)
+        
+        if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            self.is_numeric = False
+            self.count += len(series) - n_null
+            return
+        
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        values = values[~np.isnan(values)]
+        
+        other = ColumnAccumulator(self.name)
+        other.count = len(values)
+        if other.count > 0:
+            other.mean = float(values.mean())
+            other.m2 = float(((values - other.mean) ** 2).sum())
+            other.min = float(values.min())
+            other.max = float(values.max())
+        self._merge_moments(other)
+        self.quantiles.update(values)
+    
+    def merge(self, other):
+        """Merge another accumulator for the same column into this one"""
+        self.nulls += other.nulls
+        self.is_numeric = self.is_numeric and other.is_numeric
+        self._merge_moments(other)
+        self.quantiles.merge(other.quantiles)
+        self.distinct.merge(other.distinct)
+        self.top_values.merge(other.top_values)
+        return self
+    
+    def _merge_moments(self, other):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+        
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+    
+    def to_dict(self):
+        """Summarize the accumulator as a plain dictionary"""
+        summary = {
+            'count': self.count,
+            'nulls': self.nulls,
+            'is_numeric': self.is_numeric,
+            'distinct': self.distinct.estimate(),
+            'top_values': [(value, count) for value, count, _ in self.top_values.top(10)]
+        }
+        if self.is_numeric and self.count > 0:
+            q1, median, q3 = self.quantiles.quantiles([0.25, 0.5, 0.75])
+            summary.update({
+                'mean': self.mean,
+                'std': float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else 0.0,
+                'min': self.min,
+                'max': self.max,
+                'q1': float(q1),
+                'median': float(median),
+                'q3': float(q3)
+            })
+        return summary
+    
+    def sketches_to_dict(self):
+        """Serialized sketch states (rebuild with utils.sketches.sketch_from_dict)"""
+        sketches = {
+            'distinct': self.distinct.to_dict(),
+            'top_values': self.top_values.to_dict()
+        }
+        if self.is_numeric:
+            sketches['quantiles'] = self.quantiles.to_dict()
+        return sketches
+
+
+def stream_csv(source, memory_budget_mb=STREAM_MEMORY_BUDGET_MB, sample_rows=None,
+               stratify_by=None, chunk_rows=None, random_state=42, **read_kwargs):
+    """
+    Read a CSV in bounded chunks, profiling every row while reservoir-sampling
+    the rows that are kept for analysis
+    
+    Args:
+        source: Path or file-like object accepted by pd.read_csv
+        memory_budget_mb: Upper bound for the retained sample plus one chunk
+        sample_rows: Maximum rows to keep; the memory budget may lower it
+        stratify_by: Optional column whose levels must all appear in the sample
+        chunk_rows: Fixed chunk size; estimated from a probe chunk when None
+        random_state: Seed for the reservoir draws
+        **read_kwargs: Extra keyword arguments forwarded to pd.read_csv
+    
+    Returns:
+        Tuple of (sampled DataFrame, profile dictionary)
+        - The sample is uniform over all rows (or stratified) and in file order;
+          it is the whole file when every row fits
+        - profile keys: 'total_rows', 'retained_rows', 'chunks', 'truncated',
+          'memory_budget_mb', 'columns' (per-column accumulator summaries),
+          'sketches' (per-column serialized sketch states), 'correlation'
+          (full-file Pearson matrix of the numeric columns, or None),
+          'stratified_by' (the column the sample was stratified by, or None
+          when it was drawn uniformly, e.g. because stratify_by is missing),
+          'digest' (hash of the columns, sketches and correlation, computed
+          once so cache keys need not serialize them; those entries must not
+          change afterwards)
+        - Column types are judged on every chunk, not just the first: a
+          column that is null in early chunks joins the numeric statistics
+          when values appear, and a column with text in any chunk is reported
+          as non-numeric (no moments, quartiles or correlation)
+    """
+    budget_bytes = memory_budget_mb * 1024 ** 2
+    reader = pd.read_csv(source, iterator=True, **read_kwargs)
+    
+    accumulators = {}
+    total_rows = 0
+    n_chunks = 0
+    
+    try:
+        chunk = reader.get_chunk(chunk_rows or STREAM_PROBE_ROWS)
+    except StopIteration:
+        return pd.DataFrame(), _build_profile(accumulators, 0, 0, 0, memory_budget_mb)
+    
+    # Size chunks and the reservoir from the probe's bytes per row
+    bytes_per_row = max(1.0, chunk.memory_usage(deep=True).sum() / max(1, len(chunk)))
+    if chunk_rows is None:
+        chunk_rows = max(STREAM_PROBE_ROWS, int(budget_bytes * STREAM_CHUNK_BUDGET_FRACTION / bytes_per_row))
+    capacity = max(1, int(budget_bytes * (1 - STREAM_CHUNK_BUDGET_FRACTION) / bytes_per_row))
+    if sample_rows is not None:
+        capacity = min(capacity, sample_rows)
+    
+    # Co-moments of the numeric columns; columns join once they hold values
+    correlator = CorrelationAccumulator([])
+    
+    if stratify_by is not None and stratify_by in chunk.columns:
+        sampler = StratifiedReservoirSampler(capacity, stratify_by, random_state=random_state)
+    else:
+        if stratify_by is not None:
+            logger.warning(f"Stratification column '{stratify_by}' not found; sampling uniformly")
+        sampler = ReservoirSampler(capacity, random_state=random_state)
+    
+    while True:
+        n_chunks += 1
+        total_rows += len(chunk)
+        
+        for col in chunk.columns:
+            if col not in accumulators:
+                accumulators[col] = ColumnAccumulator(col)
+            accumulators[col].update(chunk[col])
+        
+        # A numeric column first seen with values here was null in every
+        # earlier row, so starting its co-moments now loses nothing
+        correlator.add_columns([col for col in chunk.columns
+                                if accumulators[col].is_numeric and accumulators[col].count > 0])
+        correlator.update(chunk)
+        sampler.update(chunk)
+        
+        try:
+            chunk = reader.get_chunk(chunk_rows)
+        except StopIteration:
+            break
+    
+    reader.close()
+    
+    df = sampler.result()
+    profile = _build_profile(accumulators, total_rows, len(df), n_chunks, memory_budget_mb, correlator)
+    if isinstance(sampler, StratifiedReservoirSampler):
+        profile['stratified_by'] = stratify_by
+    
+    logger.info(
+        f"Streamed CSV: {total_rows:,} rows in {n_chunks} chunks, "
+        f"sampled {len(df):,} rows within {memory_budget_mb} MB"
+    )
+    return df, profile
+
+
+def profile_dataframe(df):
+    """
+    Build the same profile that stream_csv produces for an in-memory frame
+    
+    Args:
+        df: Fully loaded DataFrame
+    
+    Returns:
+        Profile dictionary (see stream_csv)
+    """
+    accumulators = {}
+    for col in df.columns:
+        accumulators[col] = ColumnAccumulator(col)
+        accumulators[col].update(df[col])
+    
+    numeric_cols = [c for c in df.columns
+                    if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+    correlator = None
+    if len(numeric_cols) > 1:
+        correlator = CorrelationAccumulator(numeric_cols)
+        for start in range(0, len(df), CORR_CHUNK_ROWS):
+            correlator.update(df.iloc[start:start + CORR_CHUNK_ROWS])
+    return _build_profile(accumulators, len(df), len(df), 1, None, correlator)
+
+
+def _build_profile(accumulators, total_rows, retained_rows, n_chunks, memory_budget_mb, correlator=None):
+    columns = {col: acc.to_dict() for col, acc in accumulators.items()}
+    sketches = {col: acc.sketches_to_dict() for col, acc in accumulators.items()}
+    correlation = _correlation_summary(accumulators, correlator)
+    return {
+        'total_rows': total_rows,
+        'retained_rows': retained_rows,
+        'chunks': n_chunks,
+        'truncated': retained_rows < total_rows,
+        'memory_budget_mb': memory_budget_mb,
+        'columns': columns,
+        'sketches': sketches,
+        'correlation': correlation,
+        'stratified_by': None,
+        # Flat entries (counts, flags) stay outside the digest and may be updated
+        'digest': compute_params_hash((columns, sketches, correlation), {})
+    }
+
+
+def _correlation_summary(accumulators, correlator):
+    if correlator is None:
+        return None
+    # A column that turned to text partway has co-moments over part of the file only
+    columns = [col for col in correlator.columns if accumulators[col].is_numeric]
+    return correlator.to_dict(columns) if len(columns) > 1 else None
@@ -0,0 +1,84 @@
+"""
+Task Graph Runner
+Run named tasks on a thread pool as soon as the tasks they depend on have finished
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from config.constants import ANALYSIS_MAX_WORKERS
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def run_task_graph(tasks, max_workers=ANALYSIS_MAX_WORKERS, on_complete=None, deadline=None):
+    """
+    Execute a dependency graph of tasks
+    
+    Each task is started once every task it depends on has returned, so
+    independent tasks overlap. NumPy, pandas and scikit-learn release the GIL
+    in their heavy loops, which makes threads effective for analysis work.
+    A task that raises is logged and yields None; its dependents still run
+    and receive None for it.
+    
+    on_complete runs in the calling thread (never in a worker), so it may
+    safely update UI elements owned by that thread.
+    
+    Args:
+        tasks: Dict of name -> (function, list of dependency names); the
+            function is called with a dict of its dependencies' outputs
+        max_workers: Threads used (1 runs the tasks one after another)
+        on_complete: Optional callback(name, output, completed, total)
+            called after each task finishes
+        deadline: Optional time.monotonic() value; tasks not started by
+            then are skipped and yield None. Ready tasks are handed to the
+            pool at once and always awaited, so only tasks still waiting on
+            a dependency can be skipped.
+    
+    Returns:
+        Dict of name -> task output
+    """
+    for name, (_, deps) in tasks.items():
+        unknown = [d for d in deps if d not in tasks]
+        if unknown:
+            raise ValueError(f"Task '{name}' depends on unknown tasks: {unknown}")
+    
+    outputs = {}
+    pending = dict(tasks)
+    running = {}
+    
+    def run(name):
+        function, deps = tasks[name]
+        try:
+            return function({d: outputs[d] for d in deps})
+        except Exception as e:
+            logger.log_error_with_context(e, f"Task '{name}'")
+            return None
+    
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        while pending or running:
+            if deadline is not None and pending and time.monotonic() > deadline:
+                logger.info(f"Time budget reached; skipped tasks: {', '.join(sorted(pending))}")
+                for name in pending:
+                    outputs[name] = None
+                pending.clear()
+                if not running:
+                    break
+            
+            ready = [name for name, (_, deps) in pending.items() if all(d in outputs for d in deps)]
+            for name in ready:
+                running[pool.submit(run, name)] = name
+                del pending[name]
+            
+            if not running:
+                raise ValueError(f"Task graph has a dependency cycle: {sorted(pending)}")
+            
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, _ = wait(running, timeout=timeout if pending else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                outputs[name] = future.result()
+                if on_complete is not None:
+                    on_complete(name, outputs[name], len(outputs), len(tasks))
+    
+    return outputs
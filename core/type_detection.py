@@ -33,7 +33,7 @@ def detect_column_types(df):
         
         # Try parsing dates from strings
         try:
-            if df[col].dtype == 'object':
+            if pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col]):
                 non_null = df[col].dropna()
                 
                 if len(non_null) > 0:
@@ -3,8 +3,8 @@ PDF Report Generation
 Generate comprehensive PDF reports and executive scorecards
 """
 from io import BytesIO
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
 from datetime import datetime
 import re
 
@@ -30,6 +30,10 @@ def generate_pdf(df, results):
     """
     Generate comprehensive PDF report with matplotlib
     
+    Figures are built with the object-oriented API rather than pyplot, whose
+    global figure state is not safe to use from the background job threads
+    this runs in.
+    
     Args:
         df: DataFrame
         results: Analysis results dictionary
@@ -38,15 +42,15 @@ def generate_pdf(df, results):
         BytesIO buffer containing PDF
     """
     buffer = BytesIO()
-    plt.style.use('default')
     
     try:
         with PdfPages(buffer) as pdf:
             # PAGE 1: SUMMARY
-            fig = plt.figure(figsize=(8.5, 11))
+            fig = Figure(figsize=(8.5, 11))
+            ax = fig.add_subplot()
             
             # Title
-            plt.text(0.5, 0.95, 'AI Data Health Report', 
+            ax.text(0.5, 0.95, 'AI Data Health Report', 
                     ha='center', fontsize=24, fontweight='bold')
             
             # Health Score
@@ -69,33 +73,33 @@ def generate_pdf(df, results):
             }
             
             # Display score
-            plt.text(0.5, 0.80, f"{score}/100", 
+            ax.text(0.5, 0.80, f"{score}/100", 
                     ha='center', fontsize=45, fontweight='bold', color=color)
-            plt.text(0.5, 0.70, f"{grade} {grade_desc.get(grade, '')}", 
+            ax.text(0.5, 0.70, f"{grade} {grade_desc.get(grade, '')}", 
                     ha='center', fontsize=24, color=color)
             
             # Issues list
             y = 0.55
             for issue in results['issues'][:12]:
-                plt.text(0.1, y, 
+                ax.text(0.1, y, 
                         f"[{issue['severity'][0]}] {clean_text_for_pdf(issue['message'])}", 
                         fontsize=9)
                 y -= 0.03
             
             # Footer
             current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
-            plt.text(0.5, 0.05, f"Generated: {current_time}", 
+            ax.text(0.5, 0.05, f"Generated: {current_time}", 
                     ha='center', fontsize=8, color='gray')
-            plt.text(0.95, 0.02, f"Page 1", 
+            ax.text(0.95, 0.02, f"Page 1", 
                     ha='right', fontsize=8, color='gray')
             
-            plt.axis('off')
+            ax.axis('off')
             pdf.savefig(fig)
-            plt.close()
             
             # PAGE 2: CORRELATION HEATMAP (if available)
             if 'correlation' in results['visualizations']:
-                fig2, ax = plt.subplots(figsize=(8.5, 11))
+                fig2 = Figure(figsize=(8.5, 11))
+                ax = fig2.add_subplot()
                 corr = results['visualizations']['correlation']
                 
                 # Plot heatmap
@@ -108,19 +112,16 @@ def generate_pdf(df, results):
                 ax.set_xticklabels(corr.columns, rotation=45, ha='right', fontsize=8)
                 ax.set_yticklabels(corr.columns, fontsize=8)
                 
-                plt.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
+                fig2.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
                 
                 # Footer
-                plt.text(0.5, 0.05, f"Generated: {current_time}", 
-                        ha='center', fontsize=8, color='gray', 
-                        transform=fig2.transFigure)
-                plt.text(0.95, 0.02, f"Page 2", 
-                        ha='right', fontsize=8, color='gray', 
-                        transform=fig2.transFigure)
+                fig2.text(0.5, 0.05, f"Generated: {current_time}", 
+                        ha='center', fontsize=8, color='gray')
+                fig2.text(0.95, 0.02, f"Page 2", 
+                        ha='right', fontsize=8, color='gray')
                 
-                plt.tight_layout(rect=[0, 0.06, 1, 0.95])
+                fig2.tight_layout(rect=[0, 0.06, 1, 0.95])
                 pdf.savefig(fig2)
-                plt.close()
     
     except Exception as e:
         print(f"Error generating PDF: {e}")
@@ -0,0 +1,180 @@
+"""
+Duplicate Row Detection
+Hash-based duplicate index built once per DataFrame and shared by every caller
+"""
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import numpy as np
+
+from config.constants import DUPLICATE_INDEX_CACHE_ENTRIES
+from utils.cache import compute_dataframe_hash
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def compute_row_hashes(df):
+    """
+    Compute a 64-bit fingerprint per row (values only, index ignored)
+    
+    Args:
+        df: DataFrame
+    
+    Returns:
+        uint64 numpy array of length len(df)
+    """
+    float_positions = [i for i, dtype in enumerate(df.dtypes) if pd.api.types.is_float_dtype(dtype)]
+    if float_positions:
+        # -0.0 and 0.0 are equal but hash differently; adding 0.0 turns -0.0 into 0.0
+        df = df.copy(deep=False)
+        for i in float_positions:
+            df.isetitem(i, df.iloc[:, i] + 0.0)
+    try:
+        return pd.util.hash_pandas_object(df, index=False).to_numpy()
+    except TypeError:
+        # Unhashable cells (lists, dicts) are fingerprinted through their text form
+        unhashable = [c for c in df.columns if pd.api.types.is_object_dtype(df[c])
+                      or isinstance(df[c].dtype, pd.ArrowDtype)]
+        return pd.util.hash_pandas_object(
+            df.astype({c: str for c in unhashable}), index=False
+        ).to_numpy()
+
+
+def _exact_row_codes(df):
+    """Group ids of identical rows, compared value by value (NaNs equal)"""
+    if df.shape[1] == 0:
+        return np.zeros(len(df), dtype=np.intp)
+    column_codes = []
+    for i in range(df.shape[1]):
+        column = df.iloc[:, i]
+        try:
+            codes, _ = pd.factorize(column, use_na_sentinel=False)
+        except TypeError:
+            # Unhashable cells compare through their text form, as they are hashed
+            codes, _ = pd.factorize(column.astype(str), use_na_sentinel=False)
+        column_codes.append(codes)
+    _, inverse = np.unique(np.column_stack(column_codes), axis=0, return_inverse=True)
+    return inverse.ravel()
+
+
+class DuplicateIndex:
+    """
+    Duplicate structure of a DataFrame derived from row fingerprints
+    
+    Rows are grouped by their 64-bit hash; only rows that share a hash with
+    another row are then compared value by value, so a hash collision never
+    merges distinct rows. One uint64 per row plus one group code per row is
+    kept. Semantics match df.duplicated() (NaNs and signed zeros compare
+    equal, first occurrence kept).
+    """
+    
+    def __init__(self, df):
+        hashes = compute_row_hashes(df)
+        self.n_rows = len(hashes)
+        self._index = df.index
+        codes, uniques = pd.factorize(hashes)
+        
+        # Rows sharing a hash are nearly always equal; confirm it on those rows only
+        candidates = np.flatnonzero(np.bincount(codes, minlength=len(uniques))[codes] > 1)
+        if len(candidates):
+            codes = codes.copy()
+            codes[candidates] = len(uniques) + _exact_row_codes(df.iloc[candidates])
+            # Renumber in order of first appearance (first_mask relies on it)
+            codes, uniques = pd.factorize(codes)
+        
+        self.codes = codes
+        self.group_sizes = np.bincount(self.codes, minlength=len(uniques))
+        self.n_unique = len(uniques)
+        self._first_mask = None
+    
+    @property
+    def duplicate_count(self):
+        """Number of rows that repeat an earlier row"""
+        return self.n_rows - self.n_unique
+    
+    @property
+    def first_mask(self):
+        """Boolean array, True for the first occurrence of each distinct row"""
+        if self._first_mask is None:
+            # factorize numbers groups in order of first appearance, so a row
+            # is a first occurrence exactly when its code exceeds every earlier one
+            seen_max = np.maximum.accumulate(self.codes)
+            mask = np.empty(self.n_rows, dtype=bool)
+            mask[:1] = True
+            mask[1:] = self.codes[1:] > seen_max[:-1]
+            self._first_mask = mask
+        return self._first_mask
+    
+    @property
+    def duplicated_mask(self):
+        """Boolean array equal to df.duplicated(keep='first')"""
+        return ~self.first_mask
+    
+    def groups(self, max_groups=None):
+        """
+        Index labels of each group of identical rows (groups of size > 1)
+        
+        Args:
+            max_groups: Optional limit on the number of (largest) groups returned
+        
+        Returns:
+            List of pandas Index objects, largest groups first
+        """
+        dup_codes = np.flatnonzero(self.group_sizes > 1)
+        dup_codes = dup_codes[np.argsort(-self.group_sizes[dup_codes], kind='stable')]
+        if max_groups is not None:
+            dup_codes = dup_codes[:max_groups]
+        
+        positions = np.flatnonzero(np.isin(self.codes, dup_codes))
+        row_codes = self.codes[positions]
+        order = np.argsort(row_codes, kind='stable')
+        positions, row_codes = positions[order], row_codes[order]
+        splits = np.split(positions, np.flatnonzero(np.diff(row_codes)) + 1)
+        by_code = {int(self.codes[part[0]]): part for part in splits if len(part)}
+        return [self._index[by_code[code]] for code in dup_codes]
+    
+    def drop_duplicates(self, df):
+        """Return df without repeated rows (same as df.drop_duplicates())"""
+        return df[self.first_mask]
+
+
+# Indexes are keyed by the frame's content hash, so a frame edited in place
+# gets a fresh index; the most recently used few are kept
+_indexes = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_duplicate_index(df, df_hash=None):
+    """
+    Get the duplicate index of a DataFrame, building it on first use
+    
+    Args:
+        df: DataFrame
+        df_hash: compute_dataframe_hash(df) when the caller already has it
+    
+    Returns:
+        DuplicateIndex
+    """
+    key = compute_dataframe_hash(df) if df_hash is None else df_hash
+    with _lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            return index
+    
+    index = DuplicateIndex(df)
+    
+    with _lock:
+        _indexes[key] = index
+        while len(_indexes) > DUPLICATE_INDEX_CACHE_ENTRIES:
+            _indexes.popitem(last=False)
+    
+    logger.info(f"Duplicate index built: {index.duplicate_count:,} duplicates in {index.n_rows:,} rows")
+    return index
+
+
+def count_duplicates(df, df_hash=None):
+    """Number of duplicate rows in df (shared equivalent of df.duplicated().sum())"""
+    return get_duplicate_index(df, df_hash).duplicate_count
@@ -2,13 +2,22 @@
 AI Smart Imputation using MICE
 Use Multiple Imputation by Chained Equations for missing value prediction
 """
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
 import pandas as pd
 import numpy as np
 
 # Enable experimental IterativeImputer (MICE)
 from sklearn.experimental import enable_iterative_imputer  # noqa
 from sklearn.impute import IterativeImputer
+from sklearn.linear_model import BayesianRidge
 
+from config.constants import (
+    MICE_MAX_ITER, MICE_TOL, MICE_FIT_ROWS, MICE_N_JOBS,
+    MICE_PREDICT_CHUNK_ROWS, MICE_START_METHODS, MICE_N_IMPUTATIONS
+)
 from utils.logger import get_logger
 
 logger = get_logger()
@@ -74,6 +83,96 @@ def mice_imputation(df, max_iter=10, random_state=42, verbose=False):
     return df_imputed
 
 
+def fast_mice_imputation(df_numeric, max_iter=MICE_MAX_ITER, tol=MICE_TOL, fit_rows=MICE_FIT_ROWS,
+                         n_jobs=MICE_N_JOBS, random_state=42):
+    """
+    Fast chained-equation imputation for large numeric frames
+    
+    Differs from IterativeImputer in three ways, trading some accuracy for
+    speed:
+    - each column's BayesianRidge model is fitted on at most `fit_rows`
+      randomly chosen rows (coefficient error shrinks as 1/sqrt(fit_rows),
+      negligible for linear models at the default 20k) and then predicts
+      every missing cell of the full frame;
+    - predictions over the full frame run in row chunks on `n_jobs` threads;
+      columns are still updated one after another (fewest missing first),
+      since updating them all at once oscillates on correlated columns;
+    - rounds stop once the largest change of any single imputed cell in a
+      round falls below `tol` times the largest observed magnitude.
+      IterativeImputer instead takes the largest row sum of changes
+      (np.linalg.norm(..., ord=np.inf)), so this rule can stop earlier on
+      rows with several missing cells.
+    
+    Args:
+        df_numeric: DataFrame of numeric columns
+        max_iter: Maximum imputation rounds
+        tol: Relative convergence tolerance
+        fit_rows: Rows sampled to fit each column's model
+        n_jobs: Threads predicting row chunks concurrently
+        random_state: Seed for the row sample
+    
+    Returns:
+        Tuple of (imputed DataFrame, info dict with iterations and converged)
+    """
+    X = df_numeric.to_numpy(dtype='float64', na_value=np.nan, copy=True)
+    missing = np.isnan(X)
+    info = {'iterations': 0, 'converged': True, 'fit_rows': 0}
+    
+    target_cols = np.flatnonzero(missing.any(axis=0) & ~missing.all(axis=0))
+    col_means = np.nanmean(np.where(missing.all(axis=0), 0.0, X), axis=0)
+    
+    # Start from column means, as IterativeImputer(initial_strategy='mean') does
+    X[missing] = np.take(col_means, np.nonzero(missing)[1])
+    if len(target_cols) == 0 or X.shape[1] < 2:
+        return pd.DataFrame(X, columns=df_numeric.columns, index=df_numeric.index), info
+    
+    # Same visiting order as IterativeImputer(imputation_order='ascending')
+    target_cols = target_cols[np.argsort(missing[:, target_cols].sum(axis=0), kind='stable')]
+    
+    rng = np.random.default_rng(random_state)
+    n_rows = len(X)
+    sample = np.sort(rng.choice(n_rows, size=min(n_rows, fit_rows), replace=False))
+    info['fit_rows'] = len(sample)
+    
+    observed = X[~missing]
+    scale = np.max(np.abs(observed)) if observed.size else 1.0
+    all_cols = np.arange(X.shape[1])
+    missing_rows = {j: np.flatnonzero(missing[:, j]) for j in target_cols}
+    
+    info['converged'] = False
+    with ThreadPoolExecutor(max_workers=max(1, n_jobs)) as pool:
+        for iteration in range(max_iter):
+            change = 0.0
+            for j in target_cols:
+                predictors = all_cols != j
+                fit_idx = sample[~missing[sample, j]]
+                if len(fit_idx) < 2:
+                    continue
+                model = BayesianRidge()
+                model.fit(X[np.ix_(fit_idx, predictors)], X[fit_idx, j])
+                
+                rows = missing_rows[j]
+                chunks = [rows[start:start + MICE_PREDICT_CHUNK_ROWS]
+                          for start in range(0, len(rows), MICE_PREDICT_CHUNK_ROWS)]
+                values = np.concatenate(list(pool.map(
+                    lambda chunk: model.predict(X[np.ix_(chunk, predictors)]), chunks
+                )))
+                
+                change = max(change, np.max(np.abs(X[rows, j] - values)))
+                X[rows, j] = values
+            
+            info['iterations'] = iteration + 1
+            if change < tol * scale:
+                info['converged'] = True
+                break
+    
+    logger.info(
+        f"Fast MICE: {len(target_cols)} columns, {info['iterations']} rounds "
+        f"(converged={info['converged']}, fitted on {info['fit_rows']:,} rows)"
+    )
+    return pd.DataFrame(X, columns=df_numeric.columns, index=df_numeric.index), info
+
+
 def ai_smart_imputation(df, col):
     """
     Use MICE to predict missing values for a specific column
@@ -125,65 +224,229 @@ def ai_smart_imputation(df, col):
     return df
 
 
-def advanced_mice_imputation(df, n_imputations=5, max_iter=10, random_state=42):
+def batch_smart_imputation(df):
+    """
+    Fill every missing value in one pass
+    
+    All incomplete numeric columns are imputed together with a single MICE
+    fit over the numeric columns (the sampled fast variant once the frame
+    has more than MICE_FIT_ROWS rows); other columns get their mode in one
+    vectorized fillna. Numeric columns whose observed values are all whole
+    numbers are rounded back to nullable integers.
+    
+    Args:
+        df: DataFrame to repair (not modified)
+    
+    Returns:
+        Tuple of (repaired DataFrame, dict of column -> number of cells filled)
+    """
+    df_repaired = df.copy()
+    missing_before = df.isna().sum()
+    incomplete = missing_before[missing_before > 0].index.tolist()
+    if not incomplete:
+        return df_repaired, {}
+    
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    numeric_targets = [c for c in incomplete if c in numeric_cols]
+    other_targets = [c for c in incomplete if c not in numeric_cols]
+    
+    # =================================================================
+    # NUMERIC: ONE JOINT IMPUTATION
+    # =================================================================
+    if numeric_targets:
+        df_numeric = df[numeric_cols].astype('float64')
+        try:
+            if len(numeric_cols) < 2:
+                imputed = df_numeric.fillna(df_numeric.mean())
+            elif len(df) > MICE_FIT_ROWS:
+                imputed, _ = fast_mice_imputation(df_numeric)
+            else:
+                imputer = IterativeImputer(max_iter=10, random_state=42, initial_strategy='mean')
+                imputed = pd.DataFrame(imputer.fit_transform(df_numeric),
+                                       columns=numeric_cols, index=df.index)
+        except Exception as e:
+            logger.log_error_with_context(e, "Batch MICE imputation, falling back to mean")
+            imputed = df_numeric.fillna(df_numeric.mean())
+        
+        for col in numeric_targets:
+            values = imputed[col]
+            observed = df[col].dropna()
+            try:
+                if len(observed) > 0 and (observed == np.round(observed)).all():
+                    values = values.round().astype('Int64')
+            except Exception:
+                pass
+            df_repaired[col] = values
+    
+    # =================================================================
+    # CATEGORICAL: MODE FILL
+    # =================================================================
+    if other_targets:
+        modes = df[other_targets].mode(dropna=True)
+        if not modes.empty:
+            fill_values = modes.iloc[0].dropna().to_dict()
+            df_repaired = df_repaired.fillna(value=fill_values)
+    
+    missing_after = df_repaired[incomplete].isna().sum()
+    changes = {col: int(missing_before[col] - missing_after[col]) for col in incomplete}
+    changes = {col: count for col, count in changes.items() if count > 0}
+    
+    logger.info(f"Batch imputation filled {sum(changes.values()):,} cells in {len(changes)} columns")
+    return df_repaired, changes
+
+
+def _process_context():
+    """
+    Multiprocessing context for the MICE process pool
+    
+    Never fork: the app and API servers run threads (Streamlit, job
+    executor, HTTP handlers) whose locks a forked child would inherit in
+    whatever state they were in. forkserver/spawn start clean interpreters,
+    so the worker and its arguments must be picklable (a module-level
+    function and a numpy array).
+    """
+    available = multiprocessing.get_all_start_methods()
+    method = next((m for m in MICE_START_METHODS if m in available), 'spawn')
+    return multiprocessing.get_context(method)
+
+
+def _posterior_imputation(X, max_iter, seed):
+    """
+    One stochastic MICE draw (process pool worker)
+    
+    Returns:
+        1D array of the imputed values at X's missing cells (row-major order)
+    """
+    imputer = IterativeImputer(max_iter=max_iter, random_state=seed, sample_posterior=True)
+    imputed = imputer.fit_transform(X)
+    return imputed[np.isnan(X)]
+
+
+def advanced_mice_imputation(df, n_imputations=MICE_N_IMPUTATIONS, max_iter=10, random_state=42,
+                             n_jobs=MICE_N_JOBS):
     """
     Perform multiple MICE imputations and return pooled results
+    
+    The independent posterior draws run in a process pool (started with
+    forkserver or spawn, see _process_context) and each worker sends back
+    only the values it imputed. Draws are pooled as they arrive
+    (running mean per missing cell, running Rubin's-rules moments per
+    column), so memory holds one numeric block regardless of n_imputations.
+    Draws lost to a dead worker (or an unusable pool) are rerun in this
+    process; a draw that fails on its own is dropped, so fewer than
+    n_imputations may be pooled (reported as 'draws' per column).
+    
+    Args:
+        df: DataFrame to impute
+        n_imputations: Number of posterior draws to pool
+        max_iter: MICE rounds per draw
+        random_state: Seed of the first draw (draw i uses random_state + i)
+        n_jobs: Worker processes (1 runs the draws in this process)
+    
+    Returns:
+        Tuple of (pooled DataFrame, dict of column -> within/between/total
+        variance, std_error and the number of draws pooled)
     """
     numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
     
     if not numeric_cols or not df[numeric_cols].isna().any().any():
         return df.copy(), {}
     
-    imputed_datasets = []
+    X = df[numeric_cols].to_numpy(dtype='float64', na_value=np.nan)
+    missing = np.isnan(X)
+    seeds = [random_state + i for i in range(n_imputations)]
     
-    for i in range(n_imputations):
-        df_copy = df.copy()
+    # Running pooled state (Welford): mean and spread of every imputed cell
+    # across draws, and of every column's mean across draws
+    draws = 0
+    missing_cols = np.nonzero(missing)[1]
+    cell_mean = np.zeros(len(missing_cols), dtype='float64')
+    cell_m2 = np.zeros(len(missing_cols), dtype='float64')
+    means_mean = np.zeros(len(numeric_cols), dtype='float64')
+    means_m2 = np.zeros(len(numeric_cols), dtype='float64')
+    
+    def pool_draw(values):
+        nonlocal draws
+        draws += 1
+        completed = X.copy()
+        completed[missing] = values
+        col_means = completed.mean(axis=0)
         
+        cell_delta = values - cell_mean
+        cell_mean[:] += cell_delta / draws
+        cell_m2[:] += cell_delta * (values - cell_mean)
+        delta = col_means - means_mean
+        means_mean[:] += delta / draws
+        means_m2[:] += delta * (col_means - means_mean)
+    
+    def run_sequential(pending):
+        for seed in pending:
+            try:
+                pool_draw(_posterior_imputation(X, max_iter, seed))
+            except Exception as e:
+                logger.log_error_with_context(e, f"MICE imputation iteration {seed - random_state + 1}")
+    
+    # Seeds whose draw has not been pooled (or given up on) yet
+    pending = list(seeds)
+    workers = max(1, min(n_jobs, n_imputations))
+    if workers > 1:
         try:
-            mice_imputer = IterativeImputer(
-                max_iter=max_iter,
-                random_state=random_state + i,
-                sample_posterior=True
-            )
-            
-            imputed_numeric = mice_imputer.fit_transform(df_copy[numeric_cols])
-            df_copy[numeric_cols] = imputed_numeric
-            imputed_datasets.append(df_copy)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_process_context()) as pool:
+                futures = {pool.submit(_posterior_imputation, X, max_iter, seed): seed for seed in seeds}
+                for future in as_completed(futures):
+                    seed = futures[future]
+                    try:
+                        pool_draw(future.result())
+                    except BrokenProcessPool as e:
+                        # A worker died (e.g. killed for memory); the draw is rerun below
+                        logger.log_error_with_context(e, f"MICE imputation iteration {seed - random_state + 1}")
+                        continue
+                    except Exception as e:
+                        logger.log_error_with_context(e, f"MICE imputation iteration {seed - random_state + 1}")
+                    pending.remove(seed)
         except Exception as e:
-            logger.log_error_with_context(e, f"MICE imputation iteration {i+1}")
-            continue
+            # No usable process pool (e.g. restricted sandbox)
+            logger.log_error_with_context(e, "MICE process pool unavailable")
+        if pending:
+            logger.warning(f"Running {len(pending)} MICE draws in this process")
+    run_sequential(pending)
     
-    if not imputed_datasets:
+    if draws < n_imputations:
+        logger.warning(f"Only {draws} of {n_imputations} MICE draws succeeded; "
+                       "the pooled variance rests on fewer draws")
+    if draws == 0:
         logger.warning("All MICE iterations failed, returning original with mean imputation")
         df_fallback = df.copy()
-        for col in numeric_cols:
-            df_fallback[col].fillna(df_fallback[col].mean(), inplace=True)
+        df_fallback[numeric_cols] = df_fallback[numeric_cols].fillna(df_fallback[numeric_cols].mean())
         return df_fallback, {}
     
+    pooled = X.copy()
+    pooled[missing] = cell_mean
     df_pooled = df.copy()
-    uncertainty = {}
+    df_pooled[numeric_cols] = pooled
     
-    for col in numeric_cols:
-        all_values = np.array([d[col].values for d in imputed_datasets])
-        
-        pooled_values = np.mean(all_values, axis=0)
-        df_pooled[col] = pooled_values
-        
-        within_var = np.mean(np.var(all_values, axis=0))
-        between_var = np.var(np.mean(all_values, axis=1))
-        total_var = within_var + (1 + 1/n_imputations) * between_var
-        
+    # Observed cells never vary between draws, so they add zero to the row average
+    within = np.bincount(missing_cols, weights=cell_m2 / draws, minlength=len(numeric_cols)) / len(X)
+    between = means_m2 / draws
+    uncertainty = {}
+    for j, col in enumerate(numeric_cols):
+        total_var = within[j] + (1 + 1/draws) * between[j]
         uncertainty[col] = {
-            'within_variance': within_var,
-            'between_variance': between_var,
+            'within_variance': within[j],
+            'between_variance': between[j],
             'total_variance': total_var,
-            'std_error': np.sqrt(total_var)
+            'std_error': np.sqrt(total_var),
+            'draws': draws
         }
     
+    fill_values = {}
     for col in df.columns:
         if col not in numeric_cols and df[col].isna().any():
             mode_val = df[col].mode()
             if not mode_val.empty:
-                df_pooled[col].fillna(mode_val[0], inplace=True)
+                fill_values[col] = mode_val[0]
+    if fill_values:
+        df_pooled = df_pooled.fillna(value=fill_values)
     
-    return df_pooled, uncertainty
\ No newline at end of file
+    logger.info(f"Pooled {draws} MICE draws over {len(numeric_cols)} numeric columns")
+    return df_pooled, uncertainty
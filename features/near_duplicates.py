@@ -0,0 +1,245 @@
+"""
+Near-Duplicate Detection
+MinHash signatures with locality-sensitive hashing over normalized row tokens
+"""
+import pandas as pd
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from config.constants import (
+    NEAR_DUP_THRESHOLD, NEAR_DUP_NUM_PERM, NEAR_DUP_MAX_ROWS, NEAR_DUP_SIGNIFICANT_DIGITS,
+    NEAR_DUP_BUCKET_WINDOW
+)
+from features.duplicates import get_duplicate_index
+from utils.logger import get_logger
+
+logger = get_logger()
+
+_EMPTY = np.iinfo(np.uint64).max
+_ROW_CHUNK = 50000
+
+
+def _mix64(values):
+    """splitmix64 finalizer: a fast, well-distributed uint64 -> uint64 hash"""
+    with np.errstate(over='ignore'):
+        z = values ^ (values >> np.uint64(30))
+        z = z * np.uint64(0xBF58476D1CE4E5B9)
+        z = z ^ (z >> np.uint64(27))
+        z = z * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def _normalize_column(series, significant_digits):
+    """Canonical form of a column so trivial variants hash the same"""
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Round to significant digits so 1e6 and 1000000.0000001 match
+            magnitude = np.floor(np.log10(np.abs(values)))
+            scale = 10.0 ** (significant_digits - 1 - np.where(np.isfinite(magnitude), magnitude, 0))
+            values = np.round(values * scale) / scale
+        return pd.Series(values, index=series.index)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    
+    # Text: case, surrounding and repeated whitespace are ignored
+    text = series.astype('string')
+    return text.str.strip().str.lower().str.replace(r'\s+', ' ', regex=True)
+
+
+def _token_hashes(df, significant_digits):
+    """
+    One uint64 token per (column, normalized value); missing cells get _EMPTY
+    
+    Returns:
+        (n_rows, n_columns) uint64 array
+    """
+    tokens = np.empty((len(df), len(df.columns)), dtype=np.uint64)
+    for j, col in enumerate(df.columns):
+        normalized = _normalize_column(df[col], significant_digits)
+        hashes = pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+        # Salt with the column position so equal values in different columns differ
+        hashes = _mix64(hashes ^ _mix64(np.full(len(hashes), j + 1, dtype=np.uint64)))
+        tokens[:, j] = np.where(normalized.isna().to_numpy(), _EMPTY, hashes)
+    return tokens
+
+
+def _minhash_signatures(tokens, num_perm, random_state=42):
+    """
+    MinHash signature per row (rows processed in chunks to bound memory)
+    
+    Tokens are already well mixed, so each permutation is the cheap bijection
+    a*x + b (mod 2^64) with odd a.
+    """
+    rng = np.random.default_rng(random_state)
+    multipliers = rng.integers(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64) | np.uint64(1)
+    offsets = rng.integers(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64)
+    
+    # A set is unchanged by repeating a member, so missing cells take the
+    # row's first present token and drop out of every minimum
+    missing = tokens == _EMPTY
+    first_present = tokens[np.arange(len(tokens)), np.argmin(missing, axis=1)]
+    tokens = np.where(missing, first_present[:, None], tokens)
+    
+    signatures = np.empty((len(tokens), num_perm), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for start in range(0, len(tokens), _ROW_CHUNK):
+            block = tokens[start:start + _ROW_CHUNK]
+            for k in range(num_perm):
+                signatures[start:start + _ROW_CHUNK, k] = (block * multipliers[k] + offsets[k]).min(axis=1)
+    return signatures
+
+
+def choose_lsh_bands(num_perm, threshold):
+    """
+    Pick (bands, rows per band) whose LSH threshold (1/b)^(1/r) sits a little
+    below the similarity threshold, favouring recall (candidates are verified)
+    
+    Returns:
+        Tuple of (bands, rows_per_band)
+    """
+    target = threshold * 0.85
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - target)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+def _lsh_similar_pairs(signatures, bands, rows_per_band, threshold, window=NEAR_DUP_BUCKET_WINDOW):
+    """
+    Pairs of rows that share an LSH bucket and whose signatures agree on at
+    least `threshold` of the permutations
+    
+    Inside a bucket every pair is verified as long as the bucket holds at
+    most `window` + 1 rows; in larger buckets (many mutually similar rows)
+    each row is verified against the `window` rows that follow it, which
+    bounds the work at n * window comparisons per band and still links the
+    bucket's similar rows through overlapping windows.
+    
+    Returns:
+        Tuple of (left, right) position arrays, each pair once
+    """
+    n = len(signatures)
+    left, right = [], []
+    for b in range(bands):
+        band = signatures[:, b * rows_per_band:(b + 1) * rows_per_band]
+        key = np.full(n, b + 1, dtype=np.uint64)
+        for r in range(band.shape[1]):
+            key = _mix64(key ^ band[:, r])
+        
+        # Rows of a bucket become neighbours once sorted by bucket code
+        codes, _ = pd.factorize(key)
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+        for offset in range(1, window + 1):
+            same = sorted_codes[:-offset] == sorted_codes[offset:]
+            if not same.any():
+                break
+            first, second = order[:-offset][same], order[offset:][same]
+            similar = (signatures[first] == signatures[second]).mean(axis=1) >= threshold
+            left.append(first[similar])
+            right.append(second[similar])
+    
+    if not left:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    left, right = np.concatenate(left), np.concatenate(right)
+    if len(left) == 0:
+        return left, right
+    
+    # The same pair is usually found by several bands
+    pairs = np.unique(np.sort(np.stack([left, right], axis=1), axis=1), axis=0)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def find_near_duplicates(df, exclude_columns=None, threshold=NEAR_DUP_THRESHOLD,
+                         num_perm=NEAR_DUP_NUM_PERM, max_rows=NEAR_DUP_MAX_ROWS,
+                         significant_digits=NEAR_DUP_SIGNIFICANT_DIGITS, random_state=42, df_hash=None):
+    """
+    Find clusters of rows that are nearly identical
+    
+    Each row becomes a set of (column, normalized value) tokens, where text is
+    lower-cased with whitespace collapsed and numbers are rounded to
+    `significant_digits`. Rows whose estimated Jaccard similarity reaches
+    `threshold` are linked; candidates come from MinHash LSH buckets, so the
+    work grows roughly linearly with the number of rows. Clusters are the
+    connected groups of linked rows (single linkage): every member is similar
+    to some other member, not necessarily to all of them. Exact duplicates
+    are left to the exact duplicate check and are not reported again.
+    
+    Args:
+        df: DataFrame to scan
+        exclude_columns: Columns to ignore (e.g. ID columns that are always unique)
+        threshold: Minimum estimated Jaccard similarity between rows
+        num_perm: Number of MinHash permutations
+        max_rows: Rows scanned at most (a random sample beyond that)
+        significant_digits: Numeric rounding used before comparing
+        random_state: Seed for the hash permutations and sampling
+        df_hash: compute_dataframe_hash(df) when the caller already has it
+    
+    Returns:
+        Dictionary with clusters (lists of index labels, largest first),
+        cluster_count, duplicate_rows (rows beyond the first of each cluster),
+        rows_scanned, sampled, threshold
+    """
+    result = {
+        'clusters': [],
+        'cluster_count': 0,
+        'duplicate_rows': 0,
+        'rows_scanned': 0,
+        'sampled': False,
+        'threshold': threshold
+    }
+    
+    columns = [c for c in df.columns if c not in set(exclude_columns or [])]
+    if len(columns) < 2 or len(df) < 2:
+        return result
+    
+    # Exact repeats are already counted by the exact duplicate check
+    frame = df[get_duplicate_index(df, df_hash).first_mask][columns]
+    
+    if len(frame) > max_rows:
+        frame = frame.sample(n=max_rows, random_state=random_state)
+        result['sampled'] = True
+    result['rows_scanned'] = len(frame)
+    
+    tokens = _token_hashes(frame, significant_digits)
+    has_tokens = (tokens != _EMPTY).any(axis=1)
+    frame, tokens = frame[has_tokens], tokens[has_tokens]
+    if len(frame) < 2:
+        return result
+    
+    signatures = _minhash_signatures(tokens, num_perm, random_state)
+    bands, rows_per_band = choose_lsh_bands(num_perm, threshold)
+    left, right = _lsh_similar_pairs(signatures, bands, rows_per_band, threshold)
+    
+    if len(left) == 0:
+        return result
+    
+    n = len(frame)
+    graph = coo_matrix((np.ones(len(left), dtype=np.int8), (left, right)), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    
+    sizes = np.bincount(labels)
+    cluster_ids = np.flatnonzero(sizes > 1)
+    cluster_ids = cluster_ids[np.argsort(-sizes[cluster_ids], kind='stable')]
+    
+    # Group member positions by cluster with one sort instead of a scan per cluster
+    members = np.flatnonzero(sizes[labels] > 1)
+    members = members[np.argsort(labels[members], kind='stable')]
+    splits = np.split(members, np.flatnonzero(np.diff(labels[members])) + 1)
+    by_cluster = {int(labels[part[0]]): part for part in splits if len(part)}
+    
+    index = frame.index
+    result['clusters'] = [index[by_cluster[cid]].tolist() for cid in cluster_ids]
+    result['cluster_count'] = len(cluster_ids)
+    result['duplicate_rows'] = int((sizes[cluster_ids] - 1).sum())
+    
+    logger.info(
+        f"Near-duplicates: {result['duplicate_rows']:,} rows in {result['cluster_count']:,} clusters "
+        f"({result['rows_scanned']:,} rows scanned, {bands}x{rows_per_band} LSH bands)"
+    )
+    return result
@@ -171,7 +171,7 @@ def detect_column_pii(df: pd.DataFrame, col: str) -> Dict:
             break
     
     # Check data patterns (only for string columns)
-    if df[col].dtype == 'object':
+    if pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col]):
         data_pii = detect_data_patterns(df[col])
         
         if data_pii['is_pii']:
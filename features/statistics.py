@@ -2,6 +2,8 @@
 Statistical Helper Functions
 Health grading, anomaly severity, and analysis helpers
 """
+import pandas as pd
+import numpy as np
 
 
 def get_health_grade(score):
@@ -30,7 +32,16 @@ def get_anomaly_severity(score):
         return "🟢 Low"
 
 
-def explain_anomaly(row, df, feature_importance):
+def _column_moments(df, columns, column_stats=None):
+    """Means and standard deviations, read from the precomputed stats table when available"""
+    if column_stats is not None and not column_stats.empty and set(columns) <= set(column_stats.index):
+        stats = column_stats.loc[columns]
+        return stats['mean'], np.sqrt(stats['var'])
+    numeric = df[columns].astype('float64')
+    return numeric.mean(), numeric.std()
+
+
+def explain_anomaly(row, df, feature_importance, column_stats=None):
     """
     Explain why a specific row is anomalous
     
@@ -38,6 +49,8 @@ def explain_anomaly(row, df, feature_importance):
         row: The anomalous row (pandas Series)
         df: The full DataFrame
         feature_importance: DataFrame with Feature and Importance columns
+        column_stats: Optional results['stats']['column_stats'] table, so means
+            and standard deviations are not recomputed on every click
     
     Returns:
         List of explanation dictionaries
@@ -46,15 +59,15 @@ def explain_anomaly(row, df, feature_importance):
     if feature_importance is None:
         return []
     
-    for idx, feat in feature_importance.iterrows():
-        col = feat['Feature']
+    columns = feature_importance['Feature'].tolist()
+    means, stds = _column_moments(df, columns, column_stats)
+    
+    for col in columns:
         row_val = row[col]
+        mean = means[col]
+        std = stds[col]
         
-        # Compare to typical values
-        mean = df[col].mean()
-        std = df[col].std()
-        
-        if std == 0:
+        if std == 0 or pd.isna(std):
             continue
         
         z_score = abs((row_val - mean) / std)
@@ -69,4 +82,52 @@ def explain_anomaly(row, df, feature_importance):
                 'deviation': z_score
             })
     
-    return explanations
\ No newline at end of file
+    return explanations
+
+
+def explain_anomalies(df, ai_anomalies, column_stats=None, top_k=3):
+    """
+    Explain every flagged row at once for bulk export
+    
+    Uses the per-row path attributions from the analysis (which features
+    isolated the row) and z-scores from the cached column moments.
+    
+    Args:
+        df: The full DataFrame
+        ai_anomalies: results['stats']['ai_anomalies'] (with 'attributions')
+        column_stats: Optional results['stats']['column_stats'] table
+        top_k: Number of driving features listed per row
+    
+    Returns:
+        DataFrame with one row per anomaly: Index, AI_Score, then for each of
+        the top_k features its name, attribution share, value and z-score
+    """
+    attributions = ai_anomalies.get('attributions')
+    if attributions is None or attributions.empty:
+        return pd.DataFrame()
+    
+    columns = attributions.columns.tolist()
+    top_k = min(top_k, len(columns))
+    means, stds = _column_moments(df, columns, column_stats)
+    
+    values = df.loc[attributions.index, columns].to_numpy(dtype='float64', na_value=np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z_scores = (values - means.to_numpy()) / stds.replace(0, np.nan).to_numpy()
+    
+    shares = attributions.to_numpy()
+    order = np.argsort(-shares, axis=1, kind='stable')[:, :top_k]
+    rows = np.arange(len(shares))[:, None]
+    names = np.asarray(columns, dtype=object)
+    
+    report = pd.DataFrame({
+        'Index': attributions.index,
+        'AI_Score': ai_anomalies['scores']
+    })
+    for k in range(top_k):
+        picked = order[:, k]
+        report[f'Feature_{k + 1}'] = names[picked]
+        report[f'Share_{k + 1}'] = shares[rows[:, 0], picked].round(3)
+        report[f'Value_{k + 1}'] = values[rows[:, 0], picked]
+        report[f'Z_Score_{k + 1}'] = z_scores[rows[:, 0], picked].round(2)
+    
+    return report.sort_values('AI_Score').reset_index(drop=True)
@@ -7,7 +7,7 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import pickle
-from features.statistics import explain_anomaly, get_anomaly_severity
+from features.statistics import explain_anomaly, explain_anomalies, get_anomaly_severity
 
 
 def render_ai_deep_dive_tab(df, results, col_types, settings):
@@ -124,7 +124,9 @@ anomalies.to_csv('detected_anomalies.csv', index=False)""", language='python')
                 row = df.iloc[real_idx]
                 
                 if st.button("Explain Why"):
-                    explanations = explain_anomaly(row, df, results['stats']['feature_importance'])
+                    explanations = explain_anomaly(
+                        row, df, results['stats']['feature_importance'], results['stats']['column_stats']
+                    )
                     st.markdown(f"### 🎯 Why Row {real_idx} is Anomalous")
                     
                     if explanations:
@@ -155,6 +157,17 @@ anomalies.to_csv('detected_anomalies.csv', index=False)""", language='python')
             
             if len(ai_data['indices']) > 20:
                 st.caption(f"Showing top 20 by severity (total: {len(ai_data['indices'])})")
+            
+            # All anomalies explained in one batch (driving features + z-scores)
+            explanations_df = explain_anomalies(df, ai_data, results['stats']['column_stats'])
+            if not explanations_df.empty:
+                st.download_button(
+                    "⬇️ Download Explanations for All Anomalies (CSV)",
+                    explanations_df.to_csv(index=False).encode('utf-8'),
+                    "anomaly_explanations.csv",
+                    "text/csv",
+                    use_container_width=True
+                )
         
         with col_scores:
             st.markdown("**Score Distribution**")
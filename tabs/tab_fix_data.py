@@ -5,7 +5,11 @@ Auto-cleaning, AI repair, wizard, and interactive editor
 import streamlit as st
 import pandas as pd
 import numpy as np
-from features.imputation import ai_smart_imputation
+from features.imputation import batch_smart_imputation
+from features.duplicates import count_duplicates, get_duplicate_index
+from utils.jobs import (
+    start_session_job, get_session_job, cancel_session_job, track_job, JOB_DONE, JOB_FAILED, JOB_CANCELLED
+)
 
 
 def render_fix_data_tab(df, results, col_types):
@@ -19,25 +23,33 @@ def render_fix_data_tab(df, results, col_types):
     with st.expander("🤖 AI Auto-Repair (Experimental)", expanded=False):
         st.caption("Uses Random Forest to predict and fill missing values based on patterns in other columns.")
         
+        # Runs as a background job, so clicking elsewhere keeps (and later shows) the repair
+        repair_key = st.session_state.get('dataset_key')
         if st.button("🚀 Run AI Repair"):
-            with st.spinner("🧠 AI analyzing patterns..."):
-                progress = st.progress(0)
-                df_repaired = df.copy()
-                repaired_cols = []
-                cols_with_missing = [c for c in df.columns if df[c].isna().sum() > 0]
-                
-                for idx, col in enumerate(cols_with_missing):
-                    df_repaired = ai_smart_imputation(df_repaired, col)
-                    repaired_cols.append(col)
-                    progress.progress((idx + 1) / len(cols_with_missing))
-                
-                progress.empty()
-                
-                if repaired_cols:
-                    st.success(f"✨ Repaired {len(repaired_cols)} columns: {', '.join(repaired_cols)}")
-                    st.dataframe(df_repaired.head(20))
-                else:
-                    st.info("✅ Data is already complete!")
+            start_session_job('ai_repair', repair_key, lambda job: batch_smart_imputation(df), restart=True)
+        
+        repair_job = get_session_job('ai_repair', repair_key)
+        if repair_job is not None and not repair_job.done:
+            if st.button("⏹️ Cancel Repair"):
+                cancel_session_job('ai_repair')
+            track_job(repair_job, "🧠 AI analyzing patterns...")
+        
+        if repair_job is not None and repair_job.status == JOB_DONE:
+            df_repaired, changes = repair_job.result
+            
+            if changes:
+                st.success(f"✨ Repaired {len(changes)} columns: {', '.join(map(str, changes))}")
+                st.dataframe(
+                    pd.DataFrame({'Column': list(map(str, changes)), 'Values Filled': list(changes.values())}),
+                    hide_index=True
+                )
+                st.dataframe(df_repaired.head(20))
+            else:
+                st.info("✅ Data is already complete!")
+        elif repair_job is not None and repair_job.status == JOB_FAILED:
+            st.error(f"❌ AI Repair failed: {repair_job.error}")
+        elif repair_job is not None and repair_job.status == JOB_CANCELLED:
+            st.info("⏹️ AI Repair cancelled.")
     
     # =================================================================
     # SMART CLEANING WIZARD
@@ -100,7 +112,7 @@ def render_fix_data_tab(df, results, col_types):
         # STEP 2: Duplicates
         elif current_step == 2:
             st.markdown("### Step 2: Remove Duplicates")
-            dup_count = df.duplicated().sum()
+            dup_count = count_duplicates(df)
             
             if dup_count > 0:
                 st.warning(f"Found {dup_count} duplicates.")
@@ -198,7 +210,7 @@ def render_fix_data_tab(df, results, col_types):
     c1, c2 = st.columns(2)
     
     with c1:
-        dup_count = df.duplicated().sum()
+        dup_count = count_duplicates(df)
         cleaning_ops['drop_duplicates'] = st.checkbox(
             f"🗑️ Remove Duplicates ({dup_count})",
             value=(dup_count > 0)
@@ -223,10 +235,10 @@ def render_fix_data_tab(df, results, col_types):
         )
     
     # Apply auto-cleaning preview
-    df_clean_preview = df.copy()
-    
     if cleaning_ops.get('drop_duplicates'):
-        df_clean_preview.drop_duplicates(inplace=True)
+        df_clean_preview = get_duplicate_index(df).drop_duplicates(df).copy()
+    else:
+        df_clean_preview = df.copy()
     
     if cleaning_ops.get('drop_cols'):
         df_clean_preview.drop(columns=cleaning_ops['drop_cols'], inplace=True)
@@ -6,8 +6,6 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from sklearn.decomposition import PCA
-from sklearn.preprocessing import StandardScaler
 
 
 def render_pca_tab(df, results, col_types):
@@ -84,11 +82,10 @@ def render_pca_tab(df, results, col_types):
             st.metric("Reduced Features", n_components, delta=f"-{reduction_pct:.0f}%")
         
         if st.button("⚡ Generate Reduced Dataset", type="primary", use_container_width=True):
-            scaler = StandardScaler()
-            scaled_data = scaler.fit_transform(df[col_types['numeric']].fillna(df[col_types['numeric']].mean()))
-            
-            pca_model = PCA(n_components=n_components)
-            reduced_data = pca_model.fit_transform(scaled_data)
+            # Project with the PCA fitted during analysis instead of refitting
+            pca_model = pca_data['model']
+            numeric = df[pca_model.feature_names].astype('float64')
+            reduced_data = pca_model.transform(numeric.fillna(numeric.mean()), n_components)
             
             reduced_df = pd.DataFrame(
                 reduced_data,
@@ -108,9 +105,9 @@ def render_pca_tab(df, results, col_types):
             
             with st.expander("🔍 Feature Loadings (How original features map to components)"):
                 loadings = pd.DataFrame(
-                    pca_model.components_.T,
+                    pca_model.loadings[:n_components].T,
                     columns=[f'PC{i+1}' for i in range(n_components)],
-                    index=col_types['numeric']
+                    index=pca_model.feature_names
                 )
                 st.dataframe(loadings.style.background_gradient(cmap='RdBu_r', axis=None))
             
@@ -7,6 +7,10 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 
+from utils.jobs import (
+    start_session_job, get_session_job, cancel_session_job, track_job, JOB_DONE, JOB_FAILED, JOB_CANCELLED
+)
+
 try:
     from scipy import stats
     SCIPY_AVAILABLE = True
@@ -66,84 +70,108 @@ def render_synthetic_tab(df, col_types):
     # Generate Button
     st.markdown("---")
     
+    # Generation runs as a background job keyed on its settings, so other
+    # widgets can be used meanwhile and the result survives reruns
+    synthetic_key = (st.session_state.get('dataset_key'), tuple(selected_cols), n_samples,
+                     preserve_correlations, add_noise)
+    
     if st.button("🚀 Generate Synthetic Data", type="primary", use_container_width=True):
-        with st.spinner("🧬 Generating synthetic data..."):
-            progress = st.progress(0, text="Initializing...")
-            
-            try:
-                synthetic_df = generate_synthetic_data(
-                    df[selected_cols],
-                    n_samples,
-                    preserve_correlations,
-                    add_noise,
-                    col_types,
-                    progress
-                )
-                
-                progress.progress(1.0, text="✅ Complete!")
-                
-                st.success(f"✅ Generated {len(synthetic_df):,} synthetic rows!")
-                
-                # Show comparison
-                st.markdown("### 📊 Original vs Synthetic Comparison")
-                
-                tab_preview, tab_stats, tab_viz = st.tabs(["Preview", "Statistics", "Visualizations"])
-                
-                with tab_preview:
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.markdown("**Original Data (Sample)**")
-                        st.dataframe(df[selected_cols].head(10), height=300)
-                    with col2:
-                        st.markdown("**Synthetic Data (Sample)**")
-                        st.dataframe(synthetic_df.head(10), height=300)
-                
-                with tab_stats:
-                    render_stats_comparison(df[selected_cols], synthetic_df)
-                
-                with tab_viz:
-                    render_distribution_comparison(df[selected_cols], synthetic_df)
-                
-                # Download Section
-                st.markdown("---")
-                st.markdown("### 📥 Download Synthetic Data")
-                
-                col_dl1, col_dl2 = st.columns(2)
-                
-                with col_dl1:
-                    st.download_button(
-                        "⬇️ Download Synthetic CSV",
-                        synthetic_df.to_csv(index=False).encode('utf-8'),
-                        f"synthetic_data_{n_samples}rows.csv",
-                        "text/csv",
-                        use_container_width=True
-                    )
-                
-                with col_dl2:
-                    combined_df = pd.concat([df[selected_cols], synthetic_df], ignore_index=True)
-                    combined_df['_is_synthetic'] = [False] * len(df) + [True] * len(synthetic_df)
-                    
-                    st.download_button(
-                        "⬇️ Download Combined (Original + Synthetic)",
-                        combined_df.to_csv(index=False).encode('utf-8'),
-                        f"combined_data_{len(combined_df)}rows.csv",
-                        "text/csv",
-                        use_container_width=True
-                    )
+        source = df[selected_cols]
+        start_session_job(
+            'synthetic', synthetic_key,
+            lambda job: generate_synthetic_data(
+                source,
+                n_samples,
+                preserve_correlations,
+                add_noise,
+                col_types,
+                lambda fraction, text: job.report({'fraction': fraction, 'text': text})
+            ),
+            restart=True
+        )
+    
+    job = get_session_job('synthetic', synthetic_key)
+    if job is None:
+        return
+    
+    if not job.done:
+        if st.button("⏹️ Cancel Generation"):
+            cancel_session_job('synthetic')
+        track_job(job, "🧬 Generating synthetic data...")
+    
+    if job.status == JOB_FAILED:
+        st.error(f"❌ Error generating synthetic data: {str(job.error)}")
+    elif job.status == JOB_CANCELLED:
+        st.info("⏹️ Generation cancelled.")
+    elif job.status == JOB_DONE:
+        synthetic_df = job.result
+        
+        st.success(f"✅ Generated {len(synthetic_df):,} synthetic rows!")
+        
+        # Show comparison
+        st.markdown("### 📊 Original vs Synthetic Comparison")
+        
+        tab_preview, tab_stats, tab_viz = st.tabs(["Preview", "Statistics", "Visualizations"])
+        
+        with tab_preview:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("**Original Data (Sample)**")
+                st.dataframe(df[selected_cols].head(10), height=300)
+            with col2:
+                st.markdown("**Synthetic Data (Sample)**")
+                st.dataframe(synthetic_df.head(10), height=300)
+        
+        with tab_stats:
+            render_stats_comparison(df[selected_cols], synthetic_df)
+        
+        with tab_viz:
+            render_distribution_comparison(df[selected_cols], synthetic_df)
+        
+        # Download Section
+        st.markdown("---")
+        st.markdown("### 📥 Download Synthetic Data")
+        
+        col_dl1, col_dl2 = st.columns(2)
+        
+        with col_dl1:
+            st.download_button(
+                "⬇️ Download Synthetic CSV",
+                synthetic_df.to_csv(index=False).encode('utf-8'),
+                f"synthetic_data_{n_samples}rows.csv",
+                "text/csv",
+                use_container_width=True
+            )
+        
+        with col_dl2:
+            combined_df = pd.concat([df[selected_cols], synthetic_df], ignore_index=True)
+            combined_df['_is_synthetic'] = [False] * len(df) + [True] * len(synthetic_df)
             
-            except Exception as e:
-                st.error(f"❌ Error generating synthetic data: {str(e)}")
+            st.download_button(
+                "⬇️ Download Combined (Original + Synthetic)",
+                combined_df.to_csv(index=False).encode('utf-8'),
+                f"combined_data_{len(combined_df)}rows.csv",
+                "text/csv",
+                use_container_width=True
+            )
 
 
-def generate_synthetic_data(df, n_samples, preserve_corr, noise_level, col_types, progress):
-    """Generate synthetic data based on original dataset statistics"""
+def generate_synthetic_data(df, n_samples, preserve_corr, noise_level, col_types, progress=None):
+    """
+    Generate synthetic data based on original dataset statistics
+    
+    Args:
+        progress: Optional callback(fraction, text) reporting progress
+    """
+    if progress is None:
+        progress = lambda fraction, text: None
     
     synthetic_data = {}
     numeric_cols = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
     
     # If preserving correlations and we have multiple numeric columns
     if preserve_corr and len(numeric_cols) > 1:
-        progress.progress(0.1, text="Computing correlation structure...")
+        progress(0.1, "Computing correlation structure...")
         
         numeric_df = df[numeric_cols].dropna()
         
@@ -176,11 +204,11 @@ def generate_synthetic_data(df, n_samples, preserve_corr, noise_level, col_types
             except np.linalg.LinAlgError:
                 preserve_corr = False
     
-    progress.progress(0.3, text="Generating column data...")
+    progress(0.3, "Generating column data...")
     
     total_cols = len(df.columns)
     for idx, col in enumerate(df.columns):
-        progress.progress(0.3 + 0.6 * (idx / total_cols), text=f"Processing {col}...")
+        progress(0.3 + 0.6 * (idx / total_cols), f"Processing {col}...")
         
         if col in synthetic_data:
             continue
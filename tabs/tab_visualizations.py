@@ -6,6 +6,9 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from core.correlation import compute_correlation, compute_spearman
+from utils.sketches import sketch_from_dict
+
 
 def render_visualizations_tab(df, col_types, results):
     """Render the Visualizations tab"""
@@ -20,8 +23,20 @@ def render_visualizations_tab(df, col_types, results):
         if cat_col:
             c1, c2 = st.columns([2, 1])
             
-            with c1:
+            # A streamed/sampled file carries full-file sketches; prefer them over the sample
+            sketches = results['stats'].get('sketches', {}).get(cat_col) if results.get('sampled') else None
+            if sketches:
+                top_values = sketch_from_dict(sketches['top_values'])
+                top = top_values.top(10)
+                top_n = pd.Series([count for _, count, _ in top], index=[value for value, _, _ in top], name='count')
+                top_share = top_n / max(1, top_values.n)
+                cardinality = f"≈{sketch_from_dict(sketches['distinct']).estimate():,}"
+            else:
                 top_n = df[cat_col].value_counts().head(10)
+                top_share = df[cat_col].value_counts(normalize=True).head(10)
+                cardinality = df[cat_col].nunique()
+            
+            with c1:
                 fig_cat = px.bar(
                     top_n, x=top_n.index, y=top_n.values,
                     title=f"Top 10 Categories in '{cat_col}'",
@@ -36,9 +51,9 @@ def render_visualizations_tab(df, col_types, results):
                 st.plotly_chart(fig_cat, use_container_width=True)
             
             with c2:
-                st.metric("Unique Values (Cardinality)", df[cat_col].nunique())
+                st.metric("Unique Values (Cardinality)", cardinality)
                 st.markdown("**Distribution:**")
-                dist_df = df[cat_col].value_counts(normalize=True).head(10).mul(100).round(1).astype(str) + '%'
+                dist_df = top_share.mul(100).round(1).astype(str) + '%'
                 st.dataframe(dist_df)
         
         st.markdown("---")
@@ -108,11 +123,19 @@ def render_visualizations_tab(df, col_types, results):
         st.markdown("---")
         st.markdown('<h2 class="gradient-header">🔥 Correlation Heatmap</h2>', unsafe_allow_html=True)
         
-        corr = df[col_types['numeric']].corr()
+        method = st.radio("Method", ["Pearson", "Spearman (rank, sampled)"], horizontal=True)
+        if method == "Pearson":
+            # Shared with the analysis and the PDF report
+            corr = results['visualizations'].get('correlation')
+            if corr is None:
+                corr = compute_correlation(df, col_types['numeric'])
+        else:
+            corr = compute_spearman(df, col_types['numeric'])
+        
         fig_corr = px.imshow(
             corr, text_auto=".2f", aspect="auto",
             color_continuous_scale='RdBu_r', zmin=-1, zmax=1,
-            title="Feature Correlation Matrix",
+            title=f"Feature Correlation Matrix ({method.split()[0]})",
             labels=dict(color="Correlation")
         )
         fig_corr.update_layout(
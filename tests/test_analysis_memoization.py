@@ -0,0 +1,76 @@
+"""
+Tests for full-content analysis memoization
+The hash must see every cell, and the decorator must compute once per data and settings
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils.cache as cache_module
+from utils.cache import (
+    MemoryBoundedCache, SharedAnalysisCache, cached_analysis, compute_dataframe_hash, get_cache_stats
+)
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'a': rng.normal(size=500), 'b': rng.integers(0, 9, 500), 'c': ['x', 'y'] * 250})
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    cache = SharedAnalysisCache(MemoryBoundedCache(10 * 1024 ** 2, 10 * 1024 ** 2))
+    monkeypatch.setattr(cache_module, '_analysis_cache', cache)
+    return cache
+
+
+def test_hash_is_stable_for_equal_frames(frame):
+    assert compute_dataframe_hash(frame) == compute_dataframe_hash(frame.copy())
+
+
+@pytest.mark.parametrize('change', [
+    lambda df: df.iloc.__setitem__((250, 0), 0.0),   # one cell in the middle
+    lambda df: df.rename(columns={'a': 'z'}, inplace=True),
+    lambda df: df.__setitem__('b', df['b'].astype('float64')),
+    lambda df: df.set_index(df.index + 1, inplace=True),
+    lambda df: df.iloc.__setitem__((499, 2), 'q')
+])
+def test_hash_sees_every_change(frame, change):
+    changed = frame.copy()
+    change(changed)
+    
+    assert compute_dataframe_hash(changed) != compute_dataframe_hash(frame)
+
+
+def test_hash_handles_unhashable_cells():
+    df = pd.DataFrame({'lists': [[1, 2], [3]], 'dicts': [{'a': 1}, {}]})
+    
+    assert compute_dataframe_hash(df) == compute_dataframe_hash(df.copy())
+
+
+def test_decorator_computes_once_per_data_and_settings(frame, fresh_cache):
+    calls = []
+    
+    def analyze(df, types, contamination=0.1, progress_callback=None):
+        calls.append(contamination)
+        return {'rows': len(df), 'contamination': contamination}
+    
+    run = cached_analysis(analyze)
+    first = run(frame, {'numeric': ['a']}, 0.1)
+    again = run(frame.copy(), {'numeric': ['a']}, 0.1, progress_callback=lambda *a: None)
+    other = run(frame, {'numeric': ['a']}, 0.2)
+    
+    assert calls == [0.1, 0.2]
+    assert first is again
+    assert other['contamination'] == 0.2
+    assert get_cache_stats()['hits'] >= 1
+
+
+def test_cache_key_and_lookup_match_the_call(frame, fresh_cache):
+    run = cached_analysis(lambda df, contamination: {'c': contamination})
+    key = run.cache_key(compute_dataframe_hash(frame), 0.05)
+    
+    assert run.lookup(key) is None
+    run(frame, 0.05)
+    assert run.lookup(key) == {'c': 0.05}
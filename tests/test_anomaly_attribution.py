@@ -0,0 +1,70 @@
+"""
+Tests for vectorized feature importance and per-row path attributions
+The feature that makes a row anomalous should get most of its credit
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.anomaly import compute_feature_importance, compute_path_attributions, fit_anomaly_model
+
+
+@pytest.fixture
+def fitted():
+    rng = np.random.default_rng(11)
+    df = pd.DataFrame(rng.normal(size=(800, 3)), columns=['a', 'b', 'c'])
+    # Rows 0-4 are extreme in 'b' only
+    df.loc[:4, 'b'] = 15.0
+    model, _ = fit_anomaly_model(df)
+    return model, df
+
+
+def test_attribution_rows_sum_to_one(fitted):
+    model, df = fitted
+    
+    attributions = compute_path_attributions(model, df.iloc[:50])
+    
+    assert attributions.shape == (50, 3)
+    assert (attributions >= 0).all()
+    np.testing.assert_allclose(attributions.sum(axis=1), 1.0)
+
+
+def test_anomalous_feature_dominates(fitted):
+    model, df = fitted
+    
+    attributions = compute_path_attributions(model, df.iloc[:5])
+    typical = compute_path_attributions(model, df.iloc[100:300])
+    
+    assert (attributions.argmax(axis=1) == 1).all()
+    assert attributions[:, 1].min() > typical[:, 1].mean()
+
+
+def test_attributions_accept_arrays_and_empty_input(fitted):
+    model, df = fitted
+    
+    np.testing.assert_allclose(
+        compute_path_attributions(model, df.iloc[:5].to_numpy()),
+        compute_path_attributions(model, df.iloc[:5])
+    )
+    assert compute_path_attributions(model, df.iloc[:0]).shape == (0, 3)
+
+
+def test_attributions_are_per_row(fitted):
+    model, df = fitted
+    rows = df.iloc[[0, 100, 200]]
+    
+    together = compute_path_attributions(model, rows)
+    alone = np.vstack([compute_path_attributions(model, rows.iloc[[i]]) for i in range(3)])
+    
+    np.testing.assert_allclose(together, alone)
+
+
+def test_feature_importance_covers_every_feature(fitted):
+    model, _ = fitted
+    
+    importance = compute_feature_importance(model, ['a', 'b', 'c'])
+    
+    assert sorted(importance['Feature']) == ['a', 'b', 'c']
+    assert importance['Importance'].is_monotonic_decreasing
+    assert (importance['Importance'] >= 0).all()
+    assert importance['Importance'].sum() == pytest.approx(1.0, abs=1e-6)
@@ -0,0 +1,83 @@
+"""
+Tests for the anomaly model service
+Re-thresholding a fitted forest must label rows exactly like a forest fitted at that contamination
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import IsolationForest
+
+import core.anomaly as anomaly
+from config.constants import ISOLATION_N_ESTIMATORS
+from core.anomaly import fit_anomaly_model, resolve_max_samples, score_in_chunks, threshold_anomalies
+
+
+@pytest.fixture
+def df_ai():
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame(rng.normal(size=(1000, 4)), columns=['a', 'b', 'c', 'd'])
+    df.iloc[:10] += 8
+    return df
+
+
+@pytest.mark.parametrize('contamination', [0.01, 0.05, 0.2])
+def test_threshold_matches_fit_predict(df_ai, contamination):
+    model, scores = fit_anomaly_model(df_ai)
+    predictions, thresholded = threshold_anomalies(model, scores, contamination)
+    
+    reference = IsolationForest(
+        n_estimators=ISOLATION_N_ESTIMATORS, max_samples=resolve_max_samples(len(df_ai)),
+        contamination=contamination, random_state=42
+    ).fit_predict(df_ai)
+    
+    np.testing.assert_array_equal(predictions, reference)
+    np.testing.assert_array_equal(thresholded.predict(df_ai), predictions)
+
+
+def test_threshold_leaves_the_fitted_model_alone(df_ai):
+    model, scores = fit_anomaly_model(df_ai)
+    offset = model.offset_
+    
+    _, thresholded = threshold_anomalies(model, scores, 0.1)
+    
+    assert model.offset_ == offset and model.contamination == 'auto'
+    assert thresholded.contamination == 0.1
+    assert thresholded.estimators_ is model.estimators_
+
+
+def test_higher_contamination_flags_more_rows(df_ai):
+    model, scores = fit_anomaly_model(df_ai)
+    counts = [(threshold_anomalies(model, scores, c)[0] == -1).sum() for c in (0.01, 0.05, 0.2)]
+    
+    assert counts[0] < counts[1] < counts[2]
+    assert set(np.flatnonzero(threshold_anomalies(model, scores, 0.01)[0] == -1)) <= set(range(10))
+
+
+def test_resolve_max_samples():
+    assert resolve_max_samples(10) == 10
+    assert resolve_max_samples(10 ** 6) == 256
+    assert resolve_max_samples(0) == 1
+    assert resolve_max_samples(1000, max_samples=64) == 64
+
+
+def test_chunked_scores_match_score_samples(df_ai):
+    model, scores = fit_anomaly_model(df_ai)
+    
+    np.testing.assert_allclose(score_in_chunks(model, df_ai, chunk_rows=77), model.score_samples(df_ai))
+    np.testing.assert_allclose(score_in_chunks(model, df_ai, chunk_rows=300), scores)
+
+
+def test_fit_subsamples_but_scores_every_row(df_ai, monkeypatch):
+    monkeypatch.setattr(anomaly, 'ISOLATION_FIT_MAX_ROWS', 100)
+    
+    model, scores = fit_anomaly_model(df_ai)
+    
+    assert model.max_samples_ <= 100
+    assert len(scores) == len(df_ai)
+
+
+def test_fit_is_deterministic(df_ai):
+    _, first = fit_anomaly_model(df_ai, random_state=7)
+    _, second = fit_anomaly_model(df_ai, random_state=7)
+    
+    np.testing.assert_array_equal(first, second)
@@ -0,0 +1,221 @@
+"""
+Tests for the HTTP API
+Status codes of every route, backpressure and upload limits, against a live server on a free port
+"""
+import http.client
+import json
+import socketserver
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import api.server as server_module
+from api.server import HealthCheckServer, HealthCheckService
+
+
+@pytest.fixture
+def data_root(tmp_path):
+    rng = np.random.default_rng(12)
+    df = pd.DataFrame({'a': rng.normal(size=80).round(1), 'b': rng.integers(0, 4, 80), 'c': ['p', 'q'] * 40})
+    df.to_csv(tmp_path / 'data.csv', index=False)
+    return tmp_path
+
+
+@pytest.fixture
+def api(data_root):
+    service = HealthCheckService(max_workers=1, queue_size=0, data_root=str(data_root))
+    server = HealthCheckServer(('127.0.0.1', 0), service, max_connections=4)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    service.executor._pool.shutdown(wait=True, cancel_futures=True)
+
+
+def request(server, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=30)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), json.loads(response.read() or b'null')
+    finally:
+        conn.close()
+
+
+def post_json(server, payload, query=''):
+    return request(server, 'POST', f'/analyze{query}', json.dumps(payload), {'Content-Type': 'application/json'})
+
+
+def block_worker(server):
+    """Occupy the only job slot until the returned event is set"""
+    gate = threading.Event()
+    server.service.executor.submit('blocker', lambda job: gate.wait(10))
+    return gate
+
+
+def test_health(api):
+    status, _, payload = request(api, 'GET', '/health')
+    
+    assert status == 200
+    assert payload['status'] == 'ok' and payload['max_pending'] == 1
+
+
+def test_upload_is_analyzed(api, data_root):
+    body = (data_root / 'data.csv').read_bytes()
+    
+    status, headers, payload = request(api, 'POST', '/analyze?filename=data.csv', body)
+    
+    assert status == 200
+    assert payload['status'] == 'done' and payload['summary']['total_rows'] == 80
+    assert headers['Location'] == f"/jobs/{payload['job_id']}"
+
+
+def test_path_request_with_wait_zero_returns_202_then_200(api):
+    gate = block_worker(api)
+    api.service.executor.max_pending = 2
+    status, headers, payload = post_json(api, {'path': 'data.csv'}, '?wait=0')
+    gate.set()
+    
+    assert status == 202 and payload['status'] in ('queued', 'running')
+    job = api.service.executor.get(payload['job_id'])
+    server_module.wait_for_job(job, poll_interval=0.05, timeout=30)
+    status, _, payload = request(api, 'GET', headers['Location'])
+    assert status == 200 and payload['summary']['total_rows'] == 80
+
+
+def test_queue_full_is_429(api, data_root):
+    gate = block_worker(api)
+    try:
+        status, headers, payload = request(api, 'POST', '/analyze?filename=data.csv',
+                                           (data_root / 'data.csv').read_bytes())
+    finally:
+        gate.set()
+    
+    assert status == 429
+    assert headers['Retry-After'] == '5' and 'queue is full' in payload['error']
+
+
+def test_queue_full_is_429_before_the_body_is_read(api):
+    gate = block_worker(api)
+    conn = http.client.HTTPConnection(*api.server_address, timeout=5)
+    try:
+        # The body is announced but never sent; waiting for it would time out
+        conn.putrequest('POST', '/analyze?filename=data.csv')
+        conn.putheader('Content-Length', '1000')
+        conn.endheaders()
+        response = conn.getresponse()
+        assert response.status == 429
+        assert response.getheader('Connection') == 'close'
+    finally:
+        conn.close()
+        gate.set()
+
+
+def test_oversized_body_is_413(api, monkeypatch):
+    monkeypatch.setattr(server_module, 'API_MAX_UPLOAD_MB', 1 / 1024)
+    
+    status, headers, _ = request(api, 'POST', '/analyze?filename=big.csv', b'x' * 4096)
+    
+    assert status == 413
+    assert headers.get('Connection') == 'close'
+
+
+def test_missing_content_length_is_411(api):
+    conn = http.client.HTTPConnection(*api.server_address, timeout=30)
+    try:
+        conn.putrequest('POST', '/analyze?filename=data.csv')
+        conn.endheaders()
+        response = conn.getresponse()
+        assert response.status == 411
+        assert response.getheader('Connection') == 'close'
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize('length', ['abc', '1.5', '-5'])
+def test_invalid_content_length_is_400(api, length):
+    conn = http.client.HTTPConnection(*api.server_address, timeout=30)
+    try:
+        conn.putrequest('POST', '/analyze?filename=data.csv')
+        conn.putheader('Content-Length', length)
+        conn.endheaders()
+        response = conn.getresponse()
+        assert response.status == 400
+        assert 'Content-Length' in json.loads(response.read())['error']
+    finally:
+        conn.close()
+
+
+def test_failed_dispatch_releases_the_connection_slot(data_root, monkeypatch):
+    def no_thread(self, request, client_address):
+        raise RuntimeError("can't start new thread")
+    
+    monkeypatch.setattr(socketserver.ThreadingMixIn, 'process_request', no_thread)
+    server = HealthCheckServer(('127.0.0.1', 0), HealthCheckService(data_root=str(data_root)), max_connections=2)
+    try:
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                server.process_request(None, ('127.0.0.1', 0))
+        assert server._slots.acquire(blocking=False) and server._slots.acquire(blocking=False)
+    finally:
+        server.server_close()
+        server.service.executor._pool.shutdown(wait=True)
+
+
+@pytest.mark.parametrize('path', ['../outside.csv', '/etc/passwd'])
+def test_paths_outside_the_root_are_403(api, path):
+    status, _, payload = post_json(api, {'path': path})
+    
+    assert status == 403 and 'outside' in payload['error']
+
+
+def test_path_requests_need_a_data_root(api):
+    api.service.data_root = None
+    
+    status, _, _ = post_json(api, {'path': 'data.csv'})
+    
+    assert status == 403
+
+
+@pytest.mark.parametrize('method, path', [
+    ('GET', '/jobs/unknown'), ('DELETE', '/jobs/unknown'), ('GET', '/nope')
+])
+def test_unknown_routes_and_jobs_are_404(api, method, path):
+    assert request(api, method, path)[0] == 404
+
+
+def test_missing_file_is_404(api):
+    assert post_json(api, {'path': 'absent.csv'})[0] == 404
+
+
+def test_unreadable_data_is_422(api):
+    status, _, payload = request(api, 'POST', '/analyze?filename=empty.csv', b'\n\n')
+    
+    assert status == 422
+    assert payload['status'] == 'failed' and payload['error'].startswith('DataSourceError')
+
+
+@pytest.mark.parametrize('query', ['?sensitivity=2', '?sensitivity=abc', '?imputation=median',
+                                   '?streaming=sometimes', '?wait=soon'])
+def test_invalid_options_are_400(api, data_root, query):
+    status, _, _ = request(api, 'POST', f'/analyze?filename=data.csv&{query[1:]}',
+                           (data_root / 'data.csv').read_bytes())
+    
+    assert status == 400
+
+
+def test_delete_cancels_a_queued_job(api):
+    gate = block_worker(api)
+    api.service.executor.max_pending = 2
+    try:
+        _, headers, payload = post_json(api, {'path': 'data.csv'}, '?wait=0')
+        status, _, _ = request(api, 'DELETE', headers['Location'])
+    finally:
+        gate.set()
+    
+    assert status == 202
+    job = api.service.executor.get(payload['job_id'])
+    assert server_module.wait_for_job(job, poll_interval=0.05, timeout=30).status == 'cancelled'
@@ -0,0 +1,88 @@
+"""
+Tests for one-pass batch repair
+Every gap is filled by a single joint imputation and reported per column
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import features.imputation as imputation
+from features.imputation import batch_smart_imputation
+
+
+@pytest.fixture
+def messy():
+    rng = np.random.default_rng(4)
+    df = pd.DataFrame({
+        'height': rng.normal(170, 10, 300),
+        'weight': rng.normal(70, 8, 300),
+        'age': rng.integers(18, 80, 300).astype('float64'),
+        'city': rng.choice(['Paris', 'Oslo', 'Rome'], 300, p=[0.6, 0.2, 0.2])
+    })
+    df.loc[[1, 5, 9], 'height'] = np.nan
+    df.loc[[2, 6], 'age'] = np.nan
+    df.loc[[3, 7, 11, 13], 'city'] = None
+    return df
+
+
+def test_fills_everything_and_reports_counts(messy):
+    repaired, changes = batch_smart_imputation(messy)
+    
+    assert not repaired.isna().any().any()
+    assert changes == {'height': 3, 'age': 2, 'city': 4}
+
+
+def test_input_is_not_modified(messy):
+    before = messy.copy()
+    
+    batch_smart_imputation(messy)
+    
+    pd.testing.assert_frame_equal(messy, before)
+
+
+def test_whole_number_columns_stay_integers(messy):
+    repaired, _ = batch_smart_imputation(messy)
+    
+    assert str(repaired['age'].dtype) == 'Int64'
+    assert repaired['height'].dtype == 'float64'
+
+
+def test_categoricals_get_the_mode(messy):
+    repaired, _ = batch_smart_imputation(messy)
+    
+    assert (repaired.loc[[3, 7, 11, 13], 'city'] == messy['city'].mode()[0]).all()
+
+
+def test_complete_frame_is_returned_unchanged(messy):
+    complete = messy.dropna()
+    
+    repaired, changes = batch_smart_imputation(complete)
+    
+    assert changes == {}
+    pd.testing.assert_frame_equal(repaired, complete)
+
+
+def test_large_frames_use_fast_mice(messy, monkeypatch):
+    calls = []
+    fast = imputation.fast_mice_imputation
+    
+    def counted(df_numeric, **kwargs):
+        calls.append(df_numeric.shape)
+        return fast(df_numeric, **kwargs)
+    
+    monkeypatch.setattr(imputation, 'fast_mice_imputation', counted)
+    monkeypatch.setattr(imputation, 'MICE_FIT_ROWS', 100)
+    
+    repaired, _ = batch_smart_imputation(messy)
+    
+    assert calls == [(300, 3)]
+    assert not repaired.isna().any().any()
+
+
+def test_single_numeric_column_falls_back_to_mean():
+    df = pd.DataFrame({'v': [1.5, np.nan, 2.5]})
+    
+    repaired, changes = batch_smart_imputation(df)
+    
+    assert repaired['v'].tolist() == [1.5, 2.0, 2.5]
+    assert changes == {'v': 1}
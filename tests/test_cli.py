@@ -0,0 +1,117 @@
+"""
+Tests for the command-line health checker
+File discovery, exit codes and summary output
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import cli
+from core.pipeline import IMPUTATION_METHODS, STREAMING_CHOICES
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    rng = np.random.default_rng(9)
+    df = pd.DataFrame({'a': rng.normal(size=60).round(1), 'b': rng.integers(0, 5, 60), 'c': ['x', 'y', 'z'] * 20})
+    df.to_csv(tmp_path / 'good.csv', index=False)
+    df.to_parquet(tmp_path / 'good.parquet')
+    (tmp_path / 'notes.txt').write_text('not data')
+    nested = tmp_path / 'nested'
+    nested.mkdir()
+    df.to_csv(nested / 'inner.csv', index=False)
+    return tmp_path
+
+
+def names(paths):
+    return sorted(os.path.relpath(path) for path in paths)
+
+
+def test_collect_files_filters_and_recurses(data_dir, monkeypatch):
+    monkeypatch.chdir(data_dir)
+    
+    assert names(cli.collect_files(['.'])) == ['good.csv', 'good.parquet']
+    assert names(cli.collect_files(['.'], recursive=True)) == ['good.csv', 'good.parquet', 'nested/inner.csv']
+    assert names(cli.collect_files(['*.csv', 'good.csv', 'notes.txt'])) == ['good.csv']
+    assert cli.collect_files(['missing*.csv']) == []
+
+
+def test_exit_zero_when_everything_passes(data_dir, capsys):
+    status = cli.main([str(data_dir), '-j', '1'])
+    
+    assert status == 0
+    out = capsys.readouterr().out
+    assert 'good.csv' in out and 'Checked 2 files' in out
+
+
+def test_exit_one_below_fail_under(data_dir):
+    assert cli.main([str(data_dir / 'good.csv'), '-j', '1', '--fail-under', '101']) == 1
+
+
+def test_exit_one_when_a_file_fails(data_dir, capsys):
+    (data_dir / 'broken.csv').write_text('')
+    
+    status = cli.main([str(data_dir), '-j', '1'])
+    
+    assert status == 1
+    assert 'ERROR' in capsys.readouterr().out
+
+
+def test_exit_two_without_files(tmp_path, capsys):
+    assert cli.main([str(tmp_path / 'nothing*.csv')]) == 2
+    assert 'No supported files found' in capsys.readouterr().err
+
+
+def test_worker_processes_keep_file_order(data_dir):
+    files = cli.collect_files([str(data_dir)], recursive=True)
+    seen = []
+    
+    summaries = cli.run_checks(files, 2, {'max_workers': 1},
+                               on_result=lambda summary: seen.append(summary['file']))
+    
+    assert [summary['file'] for summary in summaries] == files
+    assert sorted(seen) == files
+    assert all(summary['status'] == 'ok' for summary in summaries)
+
+
+def test_parser_uses_the_pipeline_options():
+    parser = cli.build_parser()
+    
+    assert parser.parse_args(['x.csv', '--imputation', 'mice_fast']).imputation == 'mice_fast'
+    with pytest.raises(SystemExit):
+        parser.parse_args(['x.csv', '--imputation', 'median'])
+    actions = {action.dest: action for action in parser._actions}
+    assert tuple(actions['imputation'].choices) == IMPUTATION_METHODS
+    assert list(actions['streaming'].choices) == list(STREAMING_CHOICES)
+
+
+def test_json_output(data_dir):
+    output = data_dir / 'report.json'
+    
+    cli.main([str(data_dir / 'good.csv'), '-j', '1', '-o', str(output)])
+    
+    report = json.loads(output.read_text())
+    assert 'generated_at' in report
+    assert [summary['status'] for summary in report['files']] == ['ok']
+    assert report['files'][0]['total_rows'] == 60
+
+
+def test_parquet_output_flattens_nested_fields(tmp_path):
+    summaries = [
+        {'file': 'a.csv', 'status': 'ok', 'health_score': 90.0, 'quality_dimensions': {'completeness': 100},
+         'issues_summary': {'High': 0, 'Medium': 1, 'Low': 2}, 'issues': [{'type': 'Skew'}],
+         'recommendations': ['fix'], 'column_types': {'numeric': ['a']}, 'notices': []},
+        {'file': 'b.csv', 'status': 'error', 'error': 'EmptyDataError: no columns'}
+    ]
+    output = str(tmp_path / 'report.parquet')
+    
+    cli.write_summaries(summaries, output)
+    
+    table = pd.read_parquet(output)
+    assert list(table['file']) == ['a.csv', 'b.csv']
+    assert table.loc[0, 'dim_completeness'] == 100 and table.loc[0, 'issues_low'] == 2
+    assert json.loads(table.loc[0, 'issues']) == [{'type': 'Skew'}]
+    assert 'column_types' not in table.columns
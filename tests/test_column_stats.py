@@ -0,0 +1,83 @@
+"""
+Tests for the vectorized numeric column statistics kernel
+Every statistic must agree with pandas column by column
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.column_stats import STATS_COLUMNS, compute_numeric_stats
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'normal': rng.normal(50, 5, 2000),
+        'skewed': rng.lognormal(0, 1, 2000),
+        'ints': rng.integers(0, 10, 2000),
+        'sparse': rng.normal(size=2000)
+    })
+    df.loc[rng.choice(2000, 1500, replace=False), 'sparse'] = np.nan
+    df.loc[::50, 'normal'] = np.nan
+    return df
+
+
+def test_statistics_match_pandas(frame):
+    stats, _ = compute_numeric_stats(frame, list(frame.columns))
+    
+    assert stats.columns.tolist() == STATS_COLUMNS
+    for col in frame.columns:
+        s = frame[col]
+        row = stats.loc[col]
+        assert row['count'] == s.count()
+        assert row['nulls'] == s.isna().sum()
+        assert row['min'] == pytest.approx(s.min())
+        assert row['max'] == pytest.approx(s.max())
+        assert row['q1'] == pytest.approx(s.quantile(0.25))
+        assert row['median'] == pytest.approx(s.median())
+        assert row['q3'] == pytest.approx(s.quantile(0.75))
+        assert row['mean'] == pytest.approx(s.mean())
+        assert row['var'] == pytest.approx(s.var())
+        assert row['skew'] == pytest.approx(s.skew())
+        assert row['kurtosis'] == pytest.approx(s.kurt())
+
+
+def test_outliers_match_iqr_rule(frame):
+    stats, any_outlier = compute_numeric_stats(frame, list(frame.columns))
+    
+    expected_rows = np.zeros(len(frame), dtype=bool)
+    for col in frame.columns:
+        s = frame[col]
+        q1, q3 = s.quantile(0.25), s.quantile(0.75)
+        mask = (s < q1 - 1.5 * (q3 - q1)) | (s > q3 + 1.5 * (q3 - q1))
+        assert stats.loc[col, 'outliers'] == mask.sum()
+        expected_rows |= mask.to_numpy()
+    np.testing.assert_array_equal(any_outlier, expected_rows)
+
+
+def test_constant_and_tiny_columns():
+    df = pd.DataFrame({'const': [3.0] * 10, 'tiny': [1.0, 2.0] + [np.nan] * 8, 'empty': [np.nan] * 10})
+    stats, any_outlier = compute_numeric_stats(df, ['const', 'tiny', 'empty'])
+    
+    assert stats.loc['const', 'skew'] == 0.0
+    assert stats.loc['const', 'outliers'] == 0
+    assert np.isnan(stats.loc['tiny', 'skew'])
+    assert stats.loc['empty', 'count'] == 0
+    assert np.isnan(stats.loc['empty', 'mean'])
+    assert not any_outlier.any()
+
+
+def test_quartile_override_moves_the_fences(frame):
+    stats, _ = compute_numeric_stats(frame, ['normal'], quartiles={'normal': (0.0, 1.0)})
+    
+    assert stats.loc['normal', 'lower_bound'] == -1.5
+    assert stats.loc['normal', 'upper_bound'] == 2.5
+    assert stats.loc['normal', 'outliers'] == frame['normal'].count()
+
+
+def test_no_columns():
+    stats, any_outlier = compute_numeric_stats(pd.DataFrame({'x': [1, 2]}), [])
+    
+    assert stats.empty
+    assert len(any_outlier) == 2
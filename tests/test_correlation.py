@@ -0,0 +1,94 @@
+"""
+Tests for the co-moment correlation engine
+Chunked and merged accumulators must reproduce DataFrame.corr(), missing values included
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.correlation import (
+    CorrelationAccumulator, compute_correlation, compute_spearman, high_correlation_pairs
+)
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(6)
+    base = rng.normal(size=3000)
+    df = pd.DataFrame({
+        'x': base * 1e6 + 1e9,          # large offset: naive sums would cancel
+        'y': 3 * base + rng.normal(size=3000),
+        'z': rng.normal(size=3000),
+        'w': -base + 0.5 * rng.normal(size=3000)
+    })
+    df = df.mask(rng.random(df.shape) < 0.15)
+    return df
+
+
+@pytest.mark.parametrize('chunk_rows', [3000, 700, 1])
+def test_chunked_matches_pandas(frame, chunk_rows):
+    result = compute_correlation(frame, list(frame.columns), chunk_rows=chunk_rows)
+    
+    pd.testing.assert_frame_equal(result, frame.corr(), atol=1e-10, rtol=0)
+
+
+def test_merge_matches_single_pass(frame):
+    parts = [frame.iloc[:1000], frame.iloc[1000:1200], frame.iloc[1200:]]
+    merged = CorrelationAccumulator(frame.columns)
+    for part in parts:
+        piece = CorrelationAccumulator(frame.columns)
+        piece.update(part)
+        merged.merge(piece)
+    
+    pd.testing.assert_frame_equal(merged.correlation(), frame.corr(), atol=1e-10, rtol=0)
+    assert merged.count[0, 1] == frame[['x', 'y']].dropna().shape[0]
+
+
+def test_degenerate_pairs_are_nan():
+    df = pd.DataFrame({
+        'const': [1.0, 1.0, 1.0, 1.0],
+        'a': [1.0, 2.0, 3.0, 4.0],
+        'sparse': [np.nan, np.nan, np.nan, 5.0]
+    })
+    
+    result = compute_correlation(df, list(df.columns))
+    
+    pd.testing.assert_frame_equal(result, df.corr())
+    assert np.isnan(result.loc['const', 'const']) and np.isnan(result.loc['sparse', 'a'])
+
+
+def test_text_chunks_are_coerced():
+    chunk = pd.DataFrame({'a': ['1', '2', 'oops', '4'], 'b': [2.0, 4.0, 6.0, 8.1]})
+    accumulator = CorrelationAccumulator(['a', 'b'])
+    
+    accumulator.update(chunk)
+    
+    expected = pd.DataFrame({'a': [1.0, 2.0, np.nan, 4.0], 'b': chunk['b']}).corr()
+    pd.testing.assert_frame_equal(accumulator.correlation(), expected)
+
+
+def test_spearman_matches_pandas_without_missing(frame):
+    complete = frame.dropna()
+    
+    result = compute_spearman(complete, list(complete.columns))
+    
+    pd.testing.assert_frame_equal(result, complete.corr(method='spearman'), atol=1e-10, rtol=0)
+
+
+def test_high_correlation_pairs(frame):
+    corr = frame.corr()
+    
+    pairs = high_correlation_pairs(corr, 0.7)
+    
+    assert [(a, b) for a, b, _ in pairs] == [('x', 'y'), ('x', 'w'), ('y', 'w')]
+    assert pairs[0][2] == pytest.approx(corr.loc['x', 'y'])
+
+
+def test_to_dict_is_json_safe(frame):
+    accumulator = CorrelationAccumulator(frame.columns)
+    accumulator.update(frame)
+    
+    state = accumulator.to_dict()
+    
+    assert state['columns'] == ['x', 'y', 'z', 'w']
+    assert all(isinstance(value, float) for row in state['matrix'] for value in row)
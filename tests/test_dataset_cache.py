@@ -0,0 +1,140 @@
+"""
+Tests for the content-addressed parsed-dataset cache
+Entries are found by content and load options and evicted least recently used first
+"""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import core.analysis as analysis
+from core.analysis import analyze_csv_with_ai
+from core.dataset_cache import DatasetCache, hash_upload_bytes
+from core.streaming import profile_dataframe
+from core.type_detection import detect_column_types
+from utils.cache import MemoryBoundedCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DatasetCache(cache_dir=str(tmp_path / 'datasets'), max_bytes=10 * 1024 ** 2)
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({'x': np.arange(1000), 'y': np.linspace(0, 1, 1000), 'z': ['a', 'b'] * 500})
+
+
+def test_hash_depends_only_on_content():
+    assert hash_upload_bytes(b'a,b\n1,2\n') == hash_upload_bytes(bytearray(b'a,b\n1,2\n'))
+    assert hash_upload_bytes(b'a,b\n1,2\n') != hash_upload_bytes(b'a,b\n1,3\n')
+
+
+def test_key_includes_load_options():
+    content = hash_upload_bytes(b'data')
+    
+    assert DatasetCache.make_key(content, {'engine': 'c', 'columns': None}) == \
+        DatasetCache.make_key(content, {'columns': None, 'engine': 'c'})
+    assert DatasetCache.make_key(content, {'engine': 'c'}) != DatasetCache.make_key(content, {'engine': 'pyarrow'})
+
+
+def test_round_trip(cache, frame):
+    key = DatasetCache.make_key(hash_upload_bytes(b'data'), {})
+    
+    assert cache.get(key) is None
+    assert cache.put(key, frame, {'types': {'numeric': ['x', 'y']}})
+    df, meta = cache.get(key)
+    
+    pd.testing.assert_frame_equal(df, frame)
+    assert meta['types'] == {'numeric': ['x', 'y']}
+    assert not [name for name in os.listdir(cache.cache_dir) if '.tmp' in name]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, frame):
+    cache = DatasetCache(cache_dir=str(tmp_path), max_bytes=10 ** 9)
+    for key in ('old', 'used', 'new'):
+        cache.put(key, frame, {})
+        time.sleep(0.05)
+    cache.get('used')
+    
+    entry_size = sum(os.path.getsize(os.path.join(tmp_path, f'new{ext}')) for ext in ('.parquet', '.pkl'))
+    cache.max_bytes = 2 * entry_size
+    cache._evict()
+    
+    assert cache.get('old') is None
+    assert cache.get('used') is not None
+    assert cache.get('new') is not None
+
+
+def test_unwritable_frames_are_skipped(cache):
+    df = pd.DataFrame({'mixed': [1, 'a', 2.5]})
+    
+    assert not cache.put('mixed', df, {})
+    assert cache.get('mixed') is None
+
+
+@pytest.mark.skipif(not hasattr(os, 'getuid'), reason='POSIX permissions')
+def test_entries_are_private_to_the_user(cache, frame):
+    cache.put('private', frame, {})
+    
+    assert os.stat(cache.cache_dir).st_mode & 0o777 == 0o700
+    for name in os.listdir(cache.cache_dir):
+        assert os.stat(os.path.join(cache.cache_dir, name)).st_mode & 0o777 == 0o600
+
+
+@pytest.mark.skipif(not hasattr(os, 'getuid'), reason='POSIX ownership')
+def test_directory_owned_by_another_user_is_not_used(tmp_path, frame, monkeypatch):
+    shared = tmp_path / 'shared'
+    shared.mkdir()
+    monkeypatch.setattr(os, 'getuid', lambda: os.stat(shared).st_uid + 1)
+    
+    cache = DatasetCache(cache_dir=str(shared))
+    
+    assert not cache.enabled
+    assert not cache.put('key', frame, {})
+    assert cache.get('key') is None
+    assert os.listdir(shared) == []
+
+
+def test_expired_entries_are_missed_and_removed(cache, frame):
+    cache.put('stale', frame, {})
+    cache.put('fresh', frame, {})
+    old = time.time() - cache.ttl - 1
+    for path in cache._paths('stale'):
+        os.utime(path, (old, old))
+    
+    assert cache.get('stale') is None
+    assert not any(os.path.exists(path) for path in cache._paths('stale'))
+    
+    for path in cache._paths('fresh'):
+        os.utime(path, (old, old))
+    cache._evict()
+    assert not any(os.path.exists(path) for path in cache._paths('fresh'))
+
+
+def test_cache_hit_gives_the_same_analysis_as_a_miss(cache, monkeypatch):
+    monkeypatch.setattr(analysis, '_stage_cache', MemoryBoundedCache(64 * 1024 ** 2, 64 * 1024 ** 2))
+    rng = np.random.default_rng(5)
+    base = rng.normal(size=2000).round(1)
+    # Integer column labels, as from a header-less file
+    full = pd.DataFrame({0: base, 1: (base + rng.normal(scale=0.3, size=2000)).round(1),
+                         2: rng.normal(size=2000).round(1)})
+    profile = profile_dataframe(full)
+    sample = full.iloc[::4].reset_index(drop=True)
+    profile.update(retained_rows=len(sample), truncated=True)
+    types, sample = detect_column_types(sample)
+    
+    cache.put('ints', sample, {'col_types': types, 'source_profile': profile})
+    cached_df, meta = cache.get('ints')
+    
+    assert meta['source_profile'] == profile
+    miss = analyze_csv_with_ai(sample, types, source_profile=profile, checks=['correlation'])
+    hit = analyze_csv_with_ai(cached_df, meta['col_types'], source_profile=meta['source_profile'],
+                              checks=['correlation'])
+    assert hit['health_score'] == miss['health_score']
+    # Both read the whole-file matrix from the profile, not the sample's
+    expected = full.corr()
+    pd.testing.assert_frame_equal(hit['visualizations']['correlation'], expected, check_exact=False)
+    pd.testing.assert_frame_equal(miss['visualizations']['correlation'], expected, check_exact=False)
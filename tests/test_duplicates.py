@@ -0,0 +1,93 @@
+"""
+Tests for the hash-based duplicate index
+Results must equal pandas' duplicated() and drop_duplicates()
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import features.duplicates as duplicates
+from features.duplicates import DuplicateIndex, count_duplicates, get_duplicate_index
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'a': rng.integers(0, 5, 3000),
+        'b': rng.choice(['x', 'y', None], 3000),
+        'c': rng.choice([1.5, np.nan], 3000)
+    })
+    return df.set_index(pd.Index(rng.permutation(3000) * 3))
+
+
+def test_masks_match_pandas(frame):
+    index = DuplicateIndex(frame)
+    
+    np.testing.assert_array_equal(index.duplicated_mask, frame.duplicated().to_numpy())
+    assert index.duplicate_count == frame.duplicated().sum()
+    pd.testing.assert_frame_equal(index.drop_duplicates(frame), frame.drop_duplicates())
+
+
+def test_groups_hold_identical_rows_largest_first(frame):
+    groups = DuplicateIndex(frame).groups()
+    
+    sizes = [len(group) for group in groups]
+    assert sizes == sorted(sizes, reverse=True)
+    assert sum(sizes) == frame.duplicated(keep=False).sum()
+    for group in groups[:5]:
+        assert len(frame.loc[group].drop_duplicates()) == 1
+    assert len(DuplicateIndex(frame).groups(max_groups=3)) == 3
+
+
+def test_unhashable_cells():
+    df = pd.DataFrame({'lists': [[1, 2], [1, 2], [3]], 'n': [1, 1, 1]})
+    
+    assert DuplicateIndex(df).duplicate_count == 1
+
+
+def test_no_duplicates_and_empty_frames():
+    assert DuplicateIndex(pd.DataFrame({'a': range(10)})).duplicate_count == 0
+    assert DuplicateIndex(pd.DataFrame({'a': []})).duplicate_count == 0
+
+
+def test_hash_collisions_do_not_merge_rows(frame, monkeypatch):
+    # Every row gets the same fingerprint; the exact comparison must still separate them
+    monkeypatch.setattr(duplicates, 'compute_row_hashes', lambda df: np.zeros(len(df), dtype='uint64'))
+    
+    index = DuplicateIndex(frame)
+    
+    np.testing.assert_array_equal(index.duplicated_mask, frame.duplicated().to_numpy())
+    assert index.duplicate_count == frame.duplicated().sum()
+
+
+def test_signed_zeros_are_duplicates():
+    df = pd.DataFrame({'x': [0.0, -0.0, 1.0], 'y': ['a', 'a', 'a']})
+    
+    assert DuplicateIndex(df).duplicate_count == df.duplicated().sum() == 1
+
+
+def test_index_is_shared_by_content():
+    frame = pd.DataFrame({'a': [1, 1, 2, 3, 3, 3]})
+    first = get_duplicate_index(frame)
+    
+    assert get_duplicate_index(frame) is first
+    assert get_duplicate_index(frame.copy()) is first
+    assert count_duplicates(frame) == frame.duplicated().sum()
+
+
+def test_in_place_edits_get_a_fresh_index():
+    frame = pd.DataFrame({'a': [1, 1, 2, 3, 3, 3]})
+    assert count_duplicates(frame) == 3
+    
+    frame.loc[1, 'a'] = 7
+    
+    assert count_duplicates(frame) == frame.duplicated().sum() == 2
+
+
+def test_cached_indexes_are_bounded(monkeypatch):
+    monkeypatch.setattr(duplicates, 'DUPLICATE_INDEX_CACHE_ENTRIES', 2)
+    for i in range(5):
+        get_duplicate_index(pd.DataFrame({'a': [i, i]}))
+    
+    assert len(duplicates._indexes) <= 2
@@ -0,0 +1,95 @@
+"""
+Tests for Parquet, Feather/Arrow IPC and compressed CSV uploads
+Every format must load into the same DataFrame as the plain CSV
+"""
+import bz2
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from core.readers import detect_file_format, open_csv_stream, read_column_names, read_file
+from core.streaming import stream_csv
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'a': np.arange(100, dtype='int64'),
+        'b': np.linspace(0, 1, 100),
+        'c': [f'v{i % 5}' for i in range(100)]
+    })
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('data.csv', ('csv', None)),
+    ('DATA.CSV.GZ', ('csv', 'gzip')),
+    ('data.csv.zst', ('csv', 'zstd')),
+    ('data.csv.bz2', ('csv', 'bz2')),
+    ('data.parquet', ('parquet', None)),
+    ('data.feather', ('ipc', None)),
+    ('data.arrow', ('ipc', None))
+])
+def test_detect_file_format(name, expected):
+    assert detect_file_format(name) == expected
+
+
+def test_unsupported_extension():
+    with pytest.raises(ValueError, match='Unsupported'):
+        detect_file_format('data.xlsx')
+
+
+def _write(frame, path):
+    name = path.name
+    if name.endswith('.parquet'):
+        frame.to_parquet(path)
+    elif name.endswith('.feather'):
+        frame.to_feather(path)
+    else:
+        data = frame.to_csv(index=False).encode()
+        if name.endswith('.zst'):
+            with pa.CompressedOutputStream(str(path), 'zstd') as out:
+                out.write(data)
+            return path
+        if name.endswith('.gz'):
+            data = gzip.compress(data)
+        elif name.endswith('.bz2'):
+            data = bz2.compress(data)
+        path.write_bytes(data)
+    return path
+
+
+@pytest.mark.parametrize('name', ['d.csv', 'd.csv.gz', 'd.csv.zst', 'd.csv.bz2', 'd.parquet', 'd.feather'])
+@pytest.mark.parametrize('engine', ['pyarrow', 'c'])
+def test_formats_load_identically(tmp_path, frame, name, engine):
+    path = _write(frame, tmp_path / name)
+    
+    from_path = read_file(str(path), engine=engine)
+    with open(path, 'rb') as f:
+        from_buffer = read_file(io.BytesIO(f.read()), filename=name, engine=engine)
+    
+    pd.testing.assert_frame_equal(from_path, frame)
+    pd.testing.assert_frame_equal(from_buffer, frame)
+
+
+@pytest.mark.parametrize('name', ['d.csv', 'd.csv.gz', 'd.parquet', 'd.feather'])
+def test_column_names_and_projection(tmp_path, frame, name):
+    path = _write(frame, tmp_path / name)
+    file_format, compression = detect_file_format(name)
+    
+    assert read_column_names(str(path), file_format, compression) == ['a', 'b', 'c']
+    df = read_file(str(path), columns=['c', 'a'])
+    assert sorted(df.columns) == ['a', 'c']
+    assert len(df) == len(frame)
+
+
+def test_compressed_csv_streams(tmp_path, frame):
+    path = _write(frame, tmp_path / 'd.csv.gz')
+    
+    df, profile = stream_csv(open_csv_stream(str(path), 'gzip'), chunk_rows=30)
+    
+    assert profile['total_rows'] == 100
+    pd.testing.assert_frame_equal(df, frame)
@@ -0,0 +1,164 @@
+"""
+Tests for the background job executor
+Backpressure, cancellation, failures and history pruning, with no Streamlit context in the workers
+"""
+import logging
+import threading
+
+import pandas as pd
+import pytest
+
+import utils.cache as cache_module
+from utils.cache import MemoryBoundedCache, SharedAnalysisCache, cached_analysis
+from utils.jobs import (
+    JOB_CANCELLED, JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JobExecutor, JobQueueFull, wait_for_job
+)
+
+
+@pytest.fixture
+def executor():
+    executor = JobExecutor(max_workers=1, history=3, max_pending=2)
+    yield executor
+    executor._pool.shutdown(wait=True, cancel_futures=True)
+
+
+def blocking(gate, result='done'):
+    def run(job):
+        gate.wait(5)
+        return result
+    return run
+
+
+def finish(job):
+    return wait_for_job(job, poll_interval=0.01, timeout=5)
+
+
+def test_result_and_timing(executor):
+    job = finish(executor.submit('square', lambda job: 7 * 7, key='k'))
+    
+    assert job.status == JOB_DONE and job.result == 49 and job.key == 'k'
+    assert job.started_at >= job.submitted_at and job.finished_at >= job.started_at
+
+
+def test_backpressure_refuses_beyond_max_pending(executor):
+    gate = threading.Event()
+    first = executor.submit('a', blocking(gate))
+    second = executor.submit('b', blocking(gate))
+    
+    with pytest.raises(JobQueueFull):
+        executor.submit('c', blocking(gate))
+    assert executor.counts()[JOB_QUEUED] + executor.counts()[JOB_RUNNING] == 2
+    
+    gate.set()
+    finish(first), finish(second)
+    assert finish(executor.submit('d', lambda job: 1)).status == JOB_DONE
+
+
+def test_queued_job_cancelled_before_it_starts(executor):
+    gate = threading.Event()
+    running = executor.submit('running', blocking(gate))
+    started = []
+    queued = executor.submit('queued', lambda job: started.append(True))
+    
+    assert executor.cancel(queued.id)
+    gate.set()
+    
+    assert finish(queued).status == JOB_CANCELLED
+    assert finish(running).status == JOB_DONE
+    assert started == [] and queued.started_at is None
+
+
+def test_running_job_stops_at_its_next_report(executor):
+    reported = threading.Event()
+    
+    def loop(job):
+        while True:
+            job.report({'fraction': 0.5})
+            reported.set()
+    
+    job = executor.submit('loop', loop)
+    assert reported.wait(5)
+    
+    assert executor.cancel(job.id)
+    assert finish(job).status == JOB_CANCELLED
+    assert not executor.cancel(job.id)
+
+
+def test_failure_is_recorded(executor):
+    def boom(job):
+        raise ValueError('bad input')
+    
+    job = finish(executor.submit('boom', boom))
+    
+    assert job.status == JOB_FAILED
+    assert isinstance(job.error, ValueError) and job.result is None
+
+
+def test_history_keeps_the_newest_finished_jobs(executor):
+    jobs = [finish(executor.submit(f'job{i}', lambda job, i=i: i)) for i in range(5)]
+    executor.submit('last', lambda job: None)
+    
+    assert [executor.get(job.id) for job in jobs[:3]] == [None, None, None]
+    assert executor.get(jobs[4].id) is jobs[4]
+    assert executor.get('unknown') is None
+
+
+def test_session_values_are_passed_explicitly(executor):
+    session = {'session_id': 'abc', 'stats': {'hits': 0, 'misses': 0, 'last_hit': False}}
+    
+    job = finish(executor.submit('read', lambda job: job.session['session_id'], session=session))
+    
+    assert job.result == 'abc'
+
+
+def test_cached_analysis_in_a_job_charges_the_passed_session(executor, monkeypatch):
+    cache = SharedAnalysisCache(MemoryBoundedCache(10 * 1024 ** 2, 10 * 1024 ** 2))
+    monkeypatch.setattr(cache_module, '_analysis_cache', cache)
+    run = cached_analysis(lambda df: len(df))
+    session = {'session_id': 'abc', 'stats': {'hits': 0, 'misses': 0, 'last_hit': False}}
+    df = pd.DataFrame({'a': range(10)})
+    
+    for _ in range(2):
+        job = finish(executor.submit('cached', lambda job: run(df, session=job.session), session=session))
+        assert job.result == 10
+    
+    assert session['stats'] == {'hits': 1, 'misses': 1, 'last_hit': True}
+    assert cache.memory.stats()['sessions'] == 1
+
+
+def test_headless_jobs_log_no_script_context_warnings(executor):
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    streamlit_logger = logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context')
+    streamlit_logger.addHandler(handler)
+    try:
+        finish(executor.submit('headless', lambda job: job.report({'fraction': 1.0})))
+    finally:
+        streamlit_logger.removeHandler(handler)
+    
+    assert not [record for record in records if 'ScriptRunContext' in record.getMessage()]
+
+
+def test_pdf_reports_render_concurrently_in_jobs(monkeypatch):
+    import matplotlib.pyplot as plt
+    from export.pdf_generator import generate_pdf
+    
+    def pyplot_figure(*args, **kwargs):
+        raise AssertionError("pyplot's global figure state is not thread-safe")
+    
+    monkeypatch.setattr(plt, 'figure', pyplot_figure)
+    corr = pd.DataFrame([[1.0, 0.5], [0.5, 1.0]], index=['a', 'b'], columns=['a', 'b'])
+    results = {
+        'health_score': 87,
+        'issues': [{'severity': 'High', 'message': f'Issue {i}'} for i in range(5)],
+        'visualizations': {'correlation': corr}
+    }
+    executor = JobExecutor(max_workers=4)
+    jobs = [executor.submit('pdf_report', lambda job: generate_pdf(None, results).getvalue()) for _ in range(8)]
+    jobs = [finish(job) for job in jobs]
+    executor._pool.shutdown(wait=True)
+    
+    assert all(job.status == JOB_DONE for job in jobs)
+    # Full two-page documents, built without pyplot
+    assert all(job.result.startswith(b'%PDF') and job.result.count(b'/Type /Page ') == 2 for job in jobs)
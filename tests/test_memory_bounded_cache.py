@@ -0,0 +1,79 @@
+"""
+Tests for the memory-bounded analysis cache
+Sessions and the process stay within their byte budgets, evicting least recently used entries
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import MemoryBoundedCache
+from utils.memory import estimate_object_size
+
+
+def test_session_budget_evicts_own_lru_entries():
+    cache = MemoryBoundedCache(session_max_bytes=300, global_max_bytes=10_000)
+    cache.set('other', 'x', 'session-b', size=200)
+    for key in ('k1', 'k2', 'k3'):
+        cache.set(key, key, 'session-a', size=100)
+    cache.get('k1')
+    cache.set('k4', 'k4', 'session-a', size=100)
+    
+    assert cache.get('k2') is None
+    assert [cache.get(k) for k in ('k1', 'k3', 'k4')] == ['k1', 'k3', 'k4']
+    # Another session's entries are untouched by this session's budget
+    assert cache.get('other') == 'x'
+
+
+def test_global_budget_evicts_across_sessions():
+    cache = MemoryBoundedCache(session_max_bytes=1000, global_max_bytes=250)
+    cache.set('a', 1, 's1', size=100)
+    cache.set('b', 2, 's2', size=100)
+    cache.set('c', 3, 's3', size=100)
+    
+    assert cache.get('a') is None
+    assert cache.stats()['total_mb'] * 1024 ** 2 <= 250
+
+
+def test_oversized_values_are_refused():
+    cache = MemoryBoundedCache(session_max_bytes=100, global_max_bytes=1000)
+    
+    assert not cache.set('big', 'v', 's', size=101)
+    assert cache.get('big') is None
+
+
+def test_entries_expire():
+    cache = MemoryBoundedCache(1000, 1000, ttl=0.05)
+    cache.set('k', 'v', 's', size=10)
+    time.sleep(0.1)
+    
+    assert cache.get('k') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_clear_session_releases_its_bytes():
+    cache = MemoryBoundedCache(1000, 1000)
+    cache.set('a', 1, 's1', size=100)
+    cache.set('b', 2, 's2', size=100)
+    cache.clear_session('s1')
+    
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+    assert cache.stats()['sessions'] == 1
+
+
+def test_replacing_a_key_does_not_double_count():
+    cache = MemoryBoundedCache(1000, 1000)
+    cache.set('k', 1, 's', size=400)
+    cache.set('k', 2, 's', size=400)
+    
+    assert cache.stats()['total_mb'] * 1024 ** 2 == 400
+
+
+def test_object_size_tracks_nested_frames():
+    df = pd.DataFrame({'x': np.zeros(100_000)})
+    results = {'stats': {'frame': df, 'values': [df['x'].to_numpy()]}, 'score': 90.0}
+    
+    size = estimate_object_size(results)
+    
+    assert 800_000 <= size < 2_000_000
@@ -0,0 +1,127 @@
+"""
+Tests for pooled multiple imputation
+Draws run in clean (non-forked) worker processes and pool to the same result as in-process draws
+"""
+import multiprocessing
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import core.analysis as analysis
+import features.imputation as imputation
+from core.analysis import analyze_csv_with_ai
+from core.type_detection import detect_column_types
+from features.imputation import _posterior_imputation, _process_context, advanced_mice_imputation
+from utils.cache import MemoryBoundedCache
+
+
+@pytest.fixture
+def holes():
+    rng = np.random.default_rng(8)
+    base = rng.normal(size=200)
+    df = pd.DataFrame({'a': base, 'b': base + 0.2 * rng.normal(size=200), 'label': ['u', 'v'] * 100})
+    df.loc[[3, 40, 77], 'b'] = np.nan
+    df.loc[[5, 6], 'label'] = None
+    return df
+
+
+def test_pool_never_forks():
+    assert _process_context().get_start_method() in ('forkserver', 'spawn')
+
+
+def test_worker_and_arguments_pickle(holes):
+    X = holes[['a', 'b']].to_numpy(dtype='float64')
+    
+    worker = pickle.loads(pickle.dumps(_posterior_imputation))
+    
+    assert worker is _posterior_imputation
+    np.testing.assert_array_equal(pickle.loads(pickle.dumps(X)), X)
+
+
+def test_process_pool_matches_sequential_draws(holes):
+    sequential, seq_uncertainty = advanced_mice_imputation(holes, n_imputations=3, max_iter=5, n_jobs=1)
+    pooled, pool_uncertainty = advanced_mice_imputation(holes, n_imputations=3, max_iter=5, n_jobs=2)
+    
+    pd.testing.assert_frame_equal(pooled, sequential, check_exact=False)
+    assert pool_uncertainty['b']['total_variance'] == pytest.approx(seq_uncertainty['b']['total_variance'])
+
+
+def test_pool_receives_the_start_method(holes, monkeypatch):
+    contexts = []
+    
+    class RecordingPool(imputation.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            contexts.append(kwargs.get('mp_context'))
+            super().__init__(*args, **kwargs)
+    
+    monkeypatch.setattr(imputation, 'ProcessPoolExecutor', RecordingPool)
+    
+    advanced_mice_imputation(holes, n_imputations=2, max_iter=3, n_jobs=2)
+    
+    assert len(contexts) == 1
+    assert contexts[0].get_start_method() in ('forkserver', 'spawn')
+
+
+def test_rubin_variances_and_categorical_fill(holes):
+    pooled, uncertainty = advanced_mice_imputation(holes, n_imputations=4, max_iter=5, n_jobs=1)
+    
+    assert not pooled.isna().any().any()
+    assert pooled.loc[[5, 6], 'label'].tolist() == [holes['label'].mode()[0]] * 2
+    b = uncertainty['b']
+    assert b['between_variance'] > 0
+    assert b['total_variance'] == pytest.approx(b['within_variance'] + 1.25 * b['between_variance'])
+    # Columns without missing values never vary between draws
+    assert uncertainty['a']['total_variance'] == pytest.approx(0.0)
+
+
+def _dies_in_a_worker(X, max_iter, seed):
+    # Simulates a worker killed mid-draw (e.g. by the OOM killer)
+    if multiprocessing.parent_process() is not None:
+        os._exit(1)
+    return _posterior_imputation(X, max_iter, seed)
+
+
+def test_draws_lost_to_a_dead_worker_are_rerun_here(holes, monkeypatch):
+    sequential, seq_uncertainty = advanced_mice_imputation(holes, n_imputations=3, max_iter=5, n_jobs=1)
+    monkeypatch.setattr(imputation, '_posterior_imputation', _dies_in_a_worker)
+    
+    pooled, uncertainty = advanced_mice_imputation(holes, n_imputations=3, max_iter=5, n_jobs=2)
+    
+    assert uncertainty['b']['draws'] == 3
+    pd.testing.assert_frame_equal(pooled, sequential, check_exact=False)
+    assert uncertainty['b']['total_variance'] == pytest.approx(seq_uncertainty['b']['total_variance'])
+
+
+def test_failed_draws_are_reported(holes, monkeypatch):
+    def fails_once(X, max_iter, seed):
+        if seed == 43:
+            raise ValueError('singular matrix')
+        return _posterior_imputation(X, max_iter, seed)
+    
+    monkeypatch.setattr(imputation, '_posterior_imputation', fails_once)
+    
+    _, uncertainty = advanced_mice_imputation(holes, n_imputations=3, max_iter=5, n_jobs=1)
+    
+    assert uncertainty['b']['draws'] == 2
+
+
+def test_analysis_flags_a_reduced_number_of_draws(monkeypatch):
+    rng = np.random.default_rng(4)
+    base = rng.normal(size=300).round(1)
+    df = pd.DataFrame({'a': base, 'b': (base + rng.normal(scale=0.5, size=300)).round(1),
+                       'c': rng.normal(size=300).round(1)})
+    df.loc[::10, 'b'] = np.nan
+    types, df = detect_column_types(df)
+    monkeypatch.setattr(analysis, '_stage_cache', MemoryBoundedCache(64 * 1024 ** 2, 64 * 1024 ** 2))
+    monkeypatch.setattr(analysis, 'advanced_mice_imputation',
+                        lambda df_numeric, n_imputations: advanced_mice_imputation(
+                            df_numeric, n_imputations=n_imputations - 2, max_iter=3, n_jobs=1))
+    
+    results = analyze_csv_with_ai(df, types, imputation_method='mice_multiple', checks=['anomalies'])
+    
+    messages = [issue['message'] for issue in results['issues'] if issue['type'] == 'Imputation']
+    assert messages == [f"⚠️ Only {imputation.MICE_N_IMPUTATIONS - 2} of {imputation.MICE_N_IMPUTATIONS} "
+                        "MICE draws succeeded; pooled uncertainty is less reliable"]
@@ -0,0 +1,93 @@
+"""
+Tests for MinHash/LSH near-duplicate detection
+Trivial variants cluster together while distinct rows and exact repeats are left out
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from features.near_duplicates import _lsh_similar_pairs, choose_lsh_bands, find_near_duplicates
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 2000
+    df = pd.DataFrame({
+        'name': [f'customer {i}' for i in range(n)],
+        'city': rng.choice(['Paris', 'Oslo', 'Lima', 'Rome'], n),
+        'amount': rng.normal(100, 30, n).round(2),
+        'age': rng.integers(18, 90, n),
+        'plan': rng.choice(['basic', 'pro', 'team'], n),
+        'score': rng.random(n)
+    })
+    # Variants of row 10: case, whitespace and float noise only
+    variants = df.loc[[10, 10, 10]].copy()
+    variants['name'] = ['CUSTOMER 10', '  customer   10 ', 'Customer 10']
+    variants['amount'] = variants['amount'] + 1e-9
+    variants.index = [5000, 5001, 5002]
+    return pd.concat([df, variants])
+
+
+def test_variants_form_one_cluster(frame):
+    result = find_near_duplicates(frame, threshold=0.8)
+    
+    assert [10, 5000, 5001, 5002] in [sorted(cluster) for cluster in result['clusters']]
+    assert result['duplicate_rows'] >= 3
+
+
+def test_distinct_rows_are_not_clustered(frame):
+    result = find_near_duplicates(frame.loc[:1999], threshold=0.8)
+    
+    assert result['cluster_count'] == 0
+
+
+def test_exact_repeats_are_left_to_the_exact_check(frame):
+    repeated = pd.concat([frame.loc[:1999], frame.loc[[7, 7]]], ignore_index=True)
+    
+    assert find_near_duplicates(repeated, threshold=0.8)['cluster_count'] == 0
+
+
+def test_excluded_id_columns_reveal_duplicates():
+    df = pd.DataFrame({'id': range(6), 'a': ['x', 'x', 'y', 'z', 'w', 'v'], 'b': [1, 1, 2, 3, 4, 5],
+                       'c': ['k', 'K ', 'l', 'm', 'n', 'o']})
+    
+    # The unique id keeps rows 0 and 1 below the threshold until it is ignored
+    assert find_near_duplicates(df, threshold=0.9)['cluster_count'] == 0
+    assert find_near_duplicates(df, exclude_columns=['id'], threshold=0.9)['clusters'] == [[0, 1]]
+
+
+def test_large_inputs_are_sampled(frame):
+    result = find_near_duplicates(frame, max_rows=500)
+    
+    assert result['sampled']
+    assert result['rows_scanned'] == 500
+
+
+@pytest.mark.parametrize('threshold', [0.5, 0.7, 0.8, 0.9])
+def test_lsh_bands_favour_recall(threshold):
+    bands, rows = choose_lsh_bands(128, threshold)
+    
+    assert bands * rows <= 128
+    assert (1 / bands) ** (1 / rows) < threshold
+
+
+def test_rows_similar_to_each_other_but_not_to_the_bucket_head_are_paired():
+    # All three share the first band; rows 1 and 2 agree on 3 of 4 permutations,
+    # row 0 agrees with either on only 2
+    signatures = np.array([[1, 1, 2, 3], [1, 1, 8, 8], [1, 1, 8, 9]], dtype=np.uint64)
+    
+    left, right = _lsh_similar_pairs(signatures, bands=2, rows_per_band=2, threshold=0.7)
+    
+    assert list(zip(left, right)) == [(1, 2)]
+
+
+def test_large_buckets_are_verified_within_a_window():
+    signatures = np.ones((100, 4), dtype=np.uint64)
+    
+    left, right = _lsh_similar_pairs(signatures, bands=1, rows_per_band=4, threshold=0.9, window=5)
+    
+    # Overlapping windows still chain the whole bucket, with bounded pairs
+    assert len(left) == sum(100 - offset for offset in range(1, 6))
+    assert set(left) | set(right) == set(range(100))
+    assert np.all(left < right)
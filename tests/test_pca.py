@@ -0,0 +1,99 @@
+"""
+Tests for the PCA service
+Every solver must agree with a plain standardized PCA, and plot samples keep anomalies
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.decomposition import PCA
+from sklearn.preprocessing import StandardScaler
+
+import core.pca as pca_module
+from core.pca import PCAService, fit_pca, plot_sample_positions
+
+
+def correlated_frame(n_rows, n_features, seed=0):
+    rng = np.random.default_rng(seed)
+    latent = rng.normal(size=(n_rows, 3))
+    mixing = rng.normal(size=(3, n_features))
+    data = latent @ mixing + 0.1 * rng.normal(size=(n_rows, n_features))
+    return pd.DataFrame(data, columns=[f'f{i}' for i in range(n_features)])
+
+
+def reference_pca(df, n_components):
+    return PCA(n_components=n_components).fit(StandardScaler().fit_transform(df))
+
+
+def test_default_solver_matches_sklearn():
+    df = correlated_frame(2000, 6)
+    
+    service = fit_pca(df)
+    
+    assert service.solver == 'auto'
+    assert service.n_components == 6
+    np.testing.assert_allclose(service.explained_variance_ratio,
+                               reference_pca(df, 6).explained_variance_ratio_, atol=1e-8)
+
+
+def test_incremental_solver_for_tall_data(monkeypatch):
+    monkeypatch.setattr(pca_module, 'PCA_INCREMENTAL_MIN_ROWS', 1000)
+    monkeypatch.setattr(pca_module, 'PCA_BATCH_ROWS', 500)
+    df = correlated_frame(3000, 6)
+    
+    service = fit_pca(df, max_components=3)
+    
+    assert service.solver == 'incremental'
+    np.testing.assert_allclose(service.explained_variance_ratio[:3],
+                               reference_pca(df, 6).explained_variance_ratio_[:3], rtol=1e-3)
+
+
+def test_randomized_solver_for_wide_data():
+    df = correlated_frame(200, 60)
+    
+    service = fit_pca(df, max_components=5)
+    
+    assert service.solver == 'randomized'
+    np.testing.assert_allclose(service.explained_variance_ratio,
+                               reference_pca(df, 5).explained_variance_ratio_, rtol=1e-2)
+
+
+def test_transform_matches_sklearn_up_to_sign(monkeypatch):
+    monkeypatch.setattr(pca_module, 'PCA_BATCH_ROWS', 128)
+    df = correlated_frame(1000, 5)
+    
+    projected = fit_pca(df, max_components=2).transform(df)
+    expected = reference_pca(df, 2).transform(StandardScaler().fit_transform(df))
+    
+    assert projected.dtype == np.float32 and projected.shape == (1000, 2)
+    for k in range(2):
+        sign = np.sign(projected[:, k] @ expected[:, k])
+        np.testing.assert_allclose(sign * projected[:, k], expected[:, k], atol=1e-4)
+
+
+def test_components_are_capped_by_the_data():
+    df = correlated_frame(4, 8)
+    
+    assert fit_pca(df).n_components == 4
+    assert fit_pca(correlated_frame(100, 3)).n_components == 3
+
+
+def test_transform_uses_the_fitted_column_order():
+    df = correlated_frame(300, 4)
+    service = PCAService(2).fit(df)
+    
+    np.testing.assert_array_equal(service.transform(df[df.columns[::-1]]), service.transform(df))
+
+
+def test_plot_sample_keeps_every_anomaly():
+    anomalies = np.array([3, 50_000, 99_999])
+    
+    positions = plot_sample_positions(100_000, anomalies, max_rows=1000)
+    
+    assert len(positions) == 1000
+    assert set(anomalies) <= set(positions)
+    assert (np.diff(positions) > 0).all()
+
+
+@pytest.mark.parametrize('n_rows', [0, 10, 1000])
+def test_small_inputs_are_plotted_whole(n_rows):
+    np.testing.assert_array_equal(plot_sample_positions(n_rows, max_rows=1000), np.arange(n_rows))
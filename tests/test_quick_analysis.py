@@ -0,0 +1,103 @@
+"""
+Tests for the time-budgeted preliminary analysis
+The deadline skips only unstarted checks; the sample size and check set bound the work
+"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import core.analysis as analysis
+from core.analysis import QUICK_CHECKS, analyze_csv_with_ai, quick_analysis
+from core.task_graph import run_task_graph
+from core.type_detection import detect_column_types
+from utils.cache import MemoryBoundedCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_stage_cache(monkeypatch):
+    monkeypatch.setattr(analysis, '_stage_cache', MemoryBoundedCache(64 * 1024 ** 2, 64 * 1024 ** 2))
+
+
+def numeric_frame(n_rows, n_cols, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.normal(size=(n_rows, n_cols)).round(1), columns=[f'c{i}' for i in range(n_cols)])
+
+
+def test_deadline_skips_only_unstarted_tasks():
+    release = threading.Event()
+    started = []
+    
+    def slow(deps):
+        started.append('slow')
+        release.wait(5)
+        return 'slow'
+    
+    tasks = {
+        'slow': (slow, []),
+        'queued': (lambda deps: 'queued', []),
+        'after': (lambda deps: 'after', ['slow'])
+    }
+    timer = threading.Timer(0.2, release.set)
+    timer.start()
+    outputs = run_task_graph(tasks, max_workers=1, deadline=time.monotonic() + 0.05)
+    timer.cancel()
+    
+    # Started tasks (even queued behind the single worker) are awaited; only
+    # the task still waiting on a dependency is dropped
+    assert outputs['slow'] == 'slow' and outputs['queued'] == 'queued'
+    assert outputs['after'] is None
+    assert started == ['slow']
+
+
+def test_deadline_in_the_past_skips_everything():
+    outputs = run_task_graph({'a': (lambda deps: 1, [])}, deadline=time.monotonic() - 1)
+    
+    assert outputs == {'a': None}
+
+
+def test_quick_analysis_samples_and_keeps_total_rows():
+    df = numeric_frame(5000, 4)
+    types, _ = detect_column_types(df)
+    
+    results = quick_analysis(df, types, max_rows=1000)
+    
+    assert results['preliminary'] and results['sampled']
+    assert results['sample_rows'] == 1000
+    assert results['total_rows'] == 5000
+    assert results['skipped_checks'] == []
+
+
+def test_wide_files_get_fewer_rows():
+    df = numeric_frame(2000, 50)
+    types, _ = detect_column_types(df)
+    
+    results = quick_analysis(df, types, max_rows=1000, max_cells=10_000)
+    
+    assert results['sample_rows'] == 200
+
+
+def test_correlation_is_dropped_when_too_expensive(monkeypatch):
+    df = numeric_frame(1000, 10)
+    types, _ = detect_column_types(df)
+    monkeypatch.setattr(analysis, 'QUICK_CORRELATION_MAX_WORK', 1000 * 10 ** 2 - 1)
+    ran = []
+    monkeypatch.setattr(analysis, '_check_correlation', lambda ctx: ran.append(True))
+    
+    results = quick_analysis(df, types)
+    
+    assert results['skipped_checks'] == ['correlation']
+    assert ran == []
+
+
+def test_quick_checks_match_the_full_analysis_on_small_data():
+    df = numeric_frame(800, 3)
+    types, _ = detect_column_types(df)
+    
+    quick = quick_analysis(df, types)
+    full = analyze_csv_with_ai(df, types, checks=QUICK_CHECKS)
+    
+    assert not quick['sampled']
+    assert quick['health_score'] == full['health_score']
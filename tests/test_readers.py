@@ -0,0 +1,76 @@
+"""
+Tests for the PyArrow CSV parse path
+Both engines must produce frames the downstream checks understand
+"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.readers import read_csv_arrow, read_file, sniff_csv_types
+from features.duplicates import compute_row_hashes
+from features.pii_detection import detect_column_pii
+from utils.export import generate_validation_rules
+from utils.memory import optimize_dtypes, prepare_df_for_display
+
+
+@pytest.fixture
+def csv_bytes():
+    rows = [f"{i},user{i}@example.com,{i * 0.5},{'ab'[i % 2]}" for i in range(200)]
+    return ("id,field_a,score,kind\n" + "\n".join(rows) + "\n").encode()
+
+
+def test_default_pyarrow_dtypes_match_c_engine(csv_bytes):
+    arrow = read_file(io.BytesIO(csv_bytes), filename='data.csv', engine='pyarrow')
+    c = read_file(io.BytesIO(csv_bytes), filename='data.csv', engine='c')
+    
+    assert arrow.dtypes.astype(str).tolist() == c.dtypes.astype(str).tolist()
+    pd.testing.assert_frame_equal(arrow, c)
+
+
+@pytest.mark.parametrize('arrow_dtypes', [False, True])
+def test_pii_data_patterns_found_for_text_columns(csv_bytes, arrow_dtypes):
+    df = read_csv_arrow(io.BytesIO(csv_bytes), arrow_dtypes=arrow_dtypes)
+    
+    result = detect_column_pii(df, 'field_a')
+    
+    assert result['is_pii']
+
+
+@pytest.mark.filterwarnings('ignore:Could not infer format')
+@pytest.mark.parametrize('arrow_dtypes', [False, True])
+def test_text_checks_accept_arrow_strings(csv_bytes, arrow_dtypes):
+    df = read_csv_arrow(io.BytesIO(csv_bytes), arrow_dtypes=arrow_dtypes)
+    
+    assert "- Allowed Values: ['a', 'b']" in generate_validation_rules(df)
+    optimized, report = optimize_dtypes(df)
+    assert isinstance(optimized['kind'].dtype, pd.CategoricalDtype)
+    assert prepare_df_for_display(df)['kind'].tolist() == df['kind'].astype(str).tolist()
+    assert len(compute_row_hashes(df)) == len(df)
+
+
+def test_sniffed_types_pin_the_head(csv_bytes):
+    types = sniff_csv_types(csv_bytes)
+    
+    assert str(types['id']) == 'int64'
+    assert str(types['score']) == 'double'
+    assert str(types['field_a']) == 'string'
+
+
+def test_rejected_sniff_falls_back_to_inference():
+    # The sniffed head says int64, a later row does not fit
+    head = "\n".join(str(i) for i in range(300000))
+    data = f"value\n{head}\nnot-a-number\n".encode()
+    
+    df = read_csv_arrow(io.BytesIO(data))
+    
+    assert len(df) == 300001
+    assert df['value'].iloc[-1] == 'not-a-number'
+
+
+def test_column_projection(csv_bytes):
+    df = read_csv_arrow(io.BytesIO(csv_bytes), columns=['id', 'score'])
+    
+    assert df.columns.tolist() == ['id', 'score']
+    assert np.allclose(df['score'], np.arange(200) * 0.5)
@@ -0,0 +1,134 @@
+"""
+Tests for reservoir sampling during reads
+Samples must be uniform, in file order and bounded in memory
+"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import core.pipeline as pipeline
+from core.streaming import stream_csv
+from utils.memory import ReservoirSampler, StratifiedReservoirSampler
+
+
+def _feed(sampler, df, chunk_rows):
+    for start in range(0, len(df), chunk_rows):
+        sampler.update(df.iloc[start:start + chunk_rows])
+    return sampler.result()
+
+
+def test_reservoir_keeps_capacity_rows_in_file_order():
+    df = pd.DataFrame({'row': np.arange(10000)})
+    sample = _feed(ReservoirSampler(500, random_state=1), df, 777)
+    
+    assert len(sample) == 500
+    assert sample['row'].is_monotonic_increasing
+    assert sample['row'].is_unique
+
+
+def test_reservoir_keeps_everything_below_capacity():
+    df = pd.DataFrame({'row': np.arange(300)})
+    sample = _feed(ReservoirSampler(500), df, 100)
+    
+    pd.testing.assert_frame_equal(sample, df)
+
+
+def test_reservoir_inclusion_is_uniform():
+    # Every row should be kept with probability capacity / n, whatever its position
+    n, capacity, trials = 200, 20, 400
+    df = pd.DataFrame({'row': np.arange(n)})
+    hits = np.zeros(n)
+    for seed in range(trials):
+        hits[_feed(ReservoirSampler(capacity, random_state=seed), df, 37)['row']] += 1
+    
+    expected = trials * capacity / n
+    # Early (fill phase) and late rows must be equally likely
+    assert abs(hits[:50].mean() - expected) < 0.15 * expected
+    assert abs(hits[-50:].mean() - expected) < 0.15 * expected
+
+
+@pytest.fixture
+def skewed():
+    rng = np.random.default_rng(3)
+    levels = [f'level_{i}' for i in range(50)]
+    weights = np.linspace(1, 20, 50)
+    return pd.DataFrame({
+        'group': rng.choice(levels, 50000, p=weights / weights.sum()),
+        'value': rng.normal(size=50000)
+    })
+
+
+def test_stratified_memory_is_bounded_by_capacity(skewed):
+    sampler = StratifiedReservoirSampler(1000, 'group')
+    peak = 0
+    for start in range(0, len(skewed), 2500):
+        sampler.update(skewed.iloc[start:start + 2500])
+        peak = max(peak, sampler.held_rows)
+    
+    assert peak <= 1000 + (sampler.max_strata + 1) * sampler.min_rows
+
+
+def test_stratified_sample_is_proportional_and_capped(skewed):
+    sampler = StratifiedReservoirSampler(1000, 'group')
+    sample = _feed(sampler, skewed, 2500)
+    
+    assert len(sample) == 1000
+    assert sum(sampler.allocate().values()) == 1000
+    assert set(sample['group']) == set(skewed['group'])
+    expected = skewed['group'].value_counts(normalize=True) * 1000
+    observed = sample['group'].value_counts()
+    # Within the binomial noise of the shared draw
+    assert ((observed - expected[observed.index]).abs() <= 3 * np.sqrt(expected[observed.index]) + 1).all()
+    assert sample.columns.tolist() == ['group', 'value']
+
+
+def test_stratified_keeps_rare_levels():
+    df = pd.DataFrame({'group': ['common'] * 9990 + ['rare'] * 10, 'value': np.arange(10000)})
+    sample = _feed(StratifiedReservoirSampler(100, 'group'), df, 1000)
+    
+    assert len(sample) == 100
+    assert (sample['group'] == 'rare').sum() >= 1
+    assert sample['value'].is_monotonic_increasing
+
+
+def test_stratified_shares_never_exceed_capacity_with_many_levels():
+    df = pd.DataFrame({'group': np.arange(5000) % 40, 'value': np.arange(5000)})
+    sampler = StratifiedReservoirSampler(10, 'group')
+    sample = _feed(sampler, df, 500)
+    
+    assert len(sample) == 10
+    assert sum(sampler.allocate().values()) == 10
+
+
+def test_stratified_overflow_stratum():
+    df = pd.DataFrame({'group': np.arange(3000) % 100, 'value': np.arange(3000)})
+    sampler = StratifiedReservoirSampler(200, 'group', max_strata=10)
+    _feed(sampler, df, 300)
+    
+    assert len(sampler.stratum_counts) == 11
+    assert sampler.stratum_counts[StratifiedReservoirSampler.OVERFLOW_STRATUM] == 2700
+
+
+def test_stream_csv_stratified_sample(skewed):
+    df, profile = stream_csv(io.StringIO(skewed.to_csv(index=False)), sample_rows=500,
+                             stratify_by='group', chunk_rows=4000)
+    
+    assert profile['total_rows'] == len(skewed)
+    assert len(df) == 500
+    assert set(df['group']) == set(skewed['group'])
+
+
+@pytest.mark.parametrize('column, wording', [('group', 'stratified'), ('missing', 'uniform')])
+def test_load_source_notice_names_the_sample_drawn(skewed, tmp_path, monkeypatch, column, wording):
+    path = tmp_path / 'skewed.csv'
+    skewed.to_csv(path, index=False)
+    monkeypatch.setattr(pipeline, 'STREAM_SAMPLE_ROWS', 500)
+    
+    _, profile, notices = pipeline.load_source(str(path), streaming=True, stratify_by=column)
+    
+    messages = [notice['message'] for notice in notices]
+    assert profile['stratified_by'] == (column if wording == 'stratified' else None)
+    assert f"analyzing a {wording} sample of 500 rows" in messages[0]
+    assert any('not found' in message for message in messages) == (wording == 'uniform')
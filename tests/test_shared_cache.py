@@ -0,0 +1,168 @@
+"""
+Tests for the process-wide shared analysis cache
+Disk entries must be private and signed, and concurrent callers must share one computation
+"""
+import os
+import pickle
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from utils.cache import DiskCache, MemoryBoundedCache, SharedAnalysisCache, ensure_private_dir
+
+posix_only = pytest.mark.skipif(not hasattr(os, 'getuid'), reason='POSIX permissions')
+
+
+def _memory():
+    return MemoryBoundedCache(10 * 1024 ** 2, 10 * 1024 ** 2)
+
+
+@pytest.fixture
+def disk(tmp_path):
+    return DiskCache(str(tmp_path / 'analysis'), 10 * 1024 ** 2)
+
+
+def test_disk_round_trip(disk):
+    assert disk.set('k', {'score': 91.5, 'issues': ['a']})
+    
+    assert disk.get('k') == {'score': 91.5, 'issues': ['a']}
+    assert DiskCache(disk.cache_dir, disk.max_bytes).get('k') == {'score': 91.5, 'issues': ['a']}
+
+
+@posix_only
+def test_disk_directory_and_files_are_private(disk):
+    disk.set('k', 1)
+    
+    assert os.stat(disk.cache_dir).st_mode & 0o777 == 0o700
+    assert os.stat(os.path.join(disk.cache_dir, 'k.pkl')).st_mode & 0o077 == 0
+
+
+class _Exploit:
+    def __reduce__(self):
+        return (sys.exit, ('planted pickle executed',))
+
+
+def test_planted_pickles_are_never_loaded(disk):
+    with open(os.path.join(disk.cache_dir, 'k.pkl'), 'wb') as f:
+        f.write(b'\0' * DiskCache.DIGEST_SIZE + pickle.dumps(_Exploit()))
+    
+    assert disk.get('k') is None
+
+
+def test_entries_cannot_be_moved_between_keys(disk):
+    disk.set('a', 'value of a')
+    os.replace(os.path.join(disk.cache_dir, 'a.pkl'), os.path.join(disk.cache_dir, 'b.pkl'))
+    
+    assert disk.get('b') is None
+
+
+@posix_only
+def test_loose_permissions_are_tightened(tmp_path):
+    path = tmp_path / 'shared'
+    path.mkdir(mode=0o777)
+    os.chmod(path, 0o777)
+    
+    assert ensure_private_dir(str(path))
+    assert os.stat(path).st_mode & 0o777 == 0o700
+
+
+@posix_only
+def test_symlinked_directory_disables_the_tier(tmp_path):
+    target = tmp_path / 'elsewhere'
+    target.mkdir()
+    link = tmp_path / 'analysis'
+    link.symlink_to(target)
+    
+    disk = DiskCache(str(link), 1024)
+    
+    assert not disk.enabled
+    assert not disk.set('k', 1)
+    assert disk.get('k') is None
+
+
+def test_expired_disk_entries_are_dropped(tmp_path):
+    disk = DiskCache(str(tmp_path / 'analysis'), 1024 ** 2, ttl=0.05)
+    disk.set('k', 1)
+    time.sleep(0.1)
+    
+    assert disk.get('k') is None
+
+
+def test_disk_hits_are_promoted_to_memory(disk):
+    SharedAnalysisCache(_memory(), disk).set('k', 'v', 's1')
+    fresh = SharedAnalysisCache(_memory(), disk)
+    
+    assert fresh.get('k') == 'v'
+    assert fresh.memory.get('k') == 'v'
+
+
+def test_concurrent_callers_share_one_computation():
+    cache = SharedAnalysisCache(_memory())
+    calls = []
+    
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'result'
+    
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', compute, 's')))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(calls) == 1
+    assert sorted(hit for _, hit in results) == [False, True, True, True, True]
+
+
+def test_failed_leader_lets_a_waiter_take_over():
+    cache = SharedAnalysisCache(_memory())
+    started = threading.Event()
+    
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError('boom')
+    
+    leader = threading.Thread(target=lambda: pytest.raises(RuntimeError, cache.get_or_compute, 'k', failing, 's'))
+    leader.start()
+    started.wait()
+    value, hit = cache.get_or_compute('k', lambda: 'recovered', 's')
+    leader.join()
+    
+    assert (value, hit) == ('recovered', False)
+
+
+def test_waiters_stop_waiting_for_a_stuck_leader():
+    cache = SharedAnalysisCache(_memory(), wait_timeout=0.1)
+    # A leader whose thread died without signalling
+    cache._inflight['k'] = threading.Event()
+    
+    start = time.monotonic()
+    value, hit = cache.get_or_compute('k', lambda: 'computed', 's')
+    
+    assert (value, hit) == ('computed', False)
+    assert time.monotonic() - start < 5
+    assert cache.get('k') == 'computed'
+
+
+def test_importing_creates_no_cache_directories(tmp_path):
+    root = tmp_path / 'cache'
+    script = (
+        "import utils, core.cli, api.server\n"
+        "import os, sys\n"
+        "assert not os.path.exists(sys.argv[1]), 'created on import'\n"
+        "utils.get_analysis_cache()\n"
+        "assert os.path.isdir(os.path.join(sys.argv[1], 'analysis'))\n"
+    )
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    
+    result = subprocess.run([sys.executable, '-c', script, str(root)], cwd=repo, capture_output=True,
+                            text=True, env=dict(os.environ, CSV_HEALTH_CACHE_DIR=str(root)))
+    
+    assert result.returncode == 0, result.stderr
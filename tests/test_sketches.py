@@ -0,0 +1,124 @@
+"""
+Tests for the mergeable streaming sketches
+Accuracy within the advertised error, chunked/merged equals one pass, and JSON round trips
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.sketches import HyperLogLog, KLLSketch, SpaceSaving, sketch_from_dict
+
+QS = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def rank_error(values, estimates, qs):
+    ordered = np.sort(values)
+    ranks = np.searchsorted(ordered, estimates) / len(ordered)
+    return np.max(np.abs(ranks - np.asarray(qs)))
+
+
+def test_kll_is_exact_before_compaction():
+    values = np.random.default_rng(0).normal(size=150)
+    sketch = KLLSketch(k=200)
+    sketch.update(values)
+    
+    np.testing.assert_allclose(sketch.quantiles(QS), pd.Series(values).quantile(QS).to_numpy())
+
+
+def test_kll_rank_error_is_bounded():
+    values = np.random.default_rng(1).lognormal(size=200_000)
+    sketch = KLLSketch(k=200)
+    for chunk in np.array_split(values, 40):
+        sketch.update(chunk)
+    
+    assert sketch.n == len(values)
+    assert rank_error(values, sketch.quantiles(QS), QS) < 0.02
+    assert sum(len(items) for items in sketch.levels) < 2000
+    assert sketch.quantile(0.0) == values.min() and sketch.quantile(1.0) == values.max()
+
+
+def test_kll_merge_matches_single_stream():
+    rng = np.random.default_rng(2)
+    parts = [rng.normal(loc, size=30_000) for loc in (0, 5, 10)]
+    merged = KLLSketch()
+    for part in parts:
+        piece = KLLSketch()
+        piece.update(part)
+        merged.merge(piece)
+    
+    everything = np.concatenate(parts)
+    assert merged.n == len(everything)
+    assert rank_error(everything, merged.quantiles(QS), QS) < 0.02
+
+
+def test_kll_ignores_missing_and_handles_empty():
+    sketch = KLLSketch()
+    assert np.isnan(sketch.quantile(0.5))
+    
+    sketch.update([np.nan, 3.0, np.nan])
+    assert sketch.n == 1 and sketch.quantile(0.9) == 3.0
+
+
+@pytest.mark.parametrize('distinct', [50, 5_000, 200_000])
+def test_hll_estimate_within_error(distinct):
+    sketch = HyperLogLog(precision=12)
+    values = np.arange(distinct)
+    sketch.update(np.concatenate([values, values[: distinct // 2]]))
+    
+    assert sketch.estimate() == pytest.approx(distinct, rel=0.05)
+
+
+def test_hll_merge_is_union_and_types_agree():
+    left, right = HyperLogLog(), HyperLogLog()
+    left.update(pd.Series(range(0, 30_000)))
+    right.update(pd.Series(range(20_000, 50_000), dtype='float64'))
+    
+    assert left.merge(right).estimate() == pytest.approx(50_000, rel=0.05)
+    
+    ints, floats = HyperLogLog(), HyperLogLog()
+    ints.update(pd.Series([1, 2, 3]))
+    floats.update(pd.Series([1.0, 2.0, np.nan, 3.0]))
+    np.testing.assert_array_equal(ints.registers, floats.registers)
+
+
+def test_space_saving_is_exact_for_few_values():
+    values = pd.Series(['a'] * 50 + ['b'] * 30 + ['c'] * 5 + [None] * 7)
+    sketch = SpaceSaving(capacity=10)
+    sketch.update(values)
+    
+    assert sketch.top(3) == [('a', 50, 0), ('b', 30, 0), ('c', 5, 0)]
+    assert sketch.n == 85 and sketch.absent_bound == 0
+
+
+def test_space_saving_keeps_heavy_hitters_across_chunks():
+    rng = np.random.default_rng(3)
+    noise = rng.integers(1000, 100_000, 60_000)
+    values = np.concatenate([noise, np.full(3000, 7), np.full(2000, 11)])
+    rng.shuffle(values)
+    sketch = SpaceSaving(capacity=50)
+    for chunk in np.array_split(values, 20):
+        sketch.update(chunk)
+    
+    top = sketch.top(2)
+    assert [value for value, _, _ in top] == [7, 11]
+    for value, count, error in top:
+        true = int((values == value).sum())
+        assert count - error <= true <= count
+
+
+@pytest.mark.parametrize('sketch', [KLLSketch(k=50), HyperLogLog(precision=8), SpaceSaving(capacity=5)])
+def test_state_round_trips_through_json(sketch):
+    rng = np.random.default_rng(4)
+    sketch.update(rng.integers(0, 40, 5000))
+    
+    restored = sketch_from_dict(json.loads(json.dumps(sketch.to_dict())))
+    
+    assert type(restored) is type(sketch)
+    if isinstance(sketch, KLLSketch):
+        np.testing.assert_array_equal(restored.quantiles(QS), sketch.quantiles(QS))
+    elif isinstance(sketch, HyperLogLog):
+        assert restored.estimate() == sketch.estimate()
+    else:
+        assert restored.top(5) == sketch.top(5) and restored.absent_bound == sketch.absent_bound
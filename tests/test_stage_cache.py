@@ -0,0 +1,147 @@
+"""
+Tests for the per-stage analysis cache
+Settings changes rerun only the stages that read them, and the data is hashed once
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import core.analysis as analysis
+import utils.cache as cache_module
+from core.analysis import analyze_csv_with_ai
+from core.streaming import profile_dataframe
+from core.type_detection import detect_column_types
+from utils.cache import (
+    MemoryBoundedCache, SharedAnalysisCache, cached_analysis, compute_dataframe_hash, compute_params_hash
+)
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(3)
+    # Rounded so the columns are numeric rather than unique ids
+    df = pd.DataFrame({
+        'a': rng.normal(size=400).round(1),
+        'b': rng.normal(size=400).round(1),
+        'c': rng.normal(size=400).round(1)
+    })
+    df.loc[:4, 'a'] = 25.0
+    return df
+
+
+@pytest.fixture(autouse=True)
+def fresh_stage_cache(monkeypatch):
+    cache = MemoryBoundedCache(64 * 1024 ** 2, 64 * 1024 ** 2)
+    monkeypatch.setattr(analysis, '_stage_cache', cache)
+    return cache
+
+
+@pytest.fixture
+def fit_calls(monkeypatch):
+    calls = {'forest': 0, 'pca': 0}
+    fit_forest, fit_pca = analysis.fit_anomaly_model, analysis.fit_pca
+    
+    def counted_forest(df_ai):
+        calls['forest'] += 1
+        return fit_forest(df_ai)
+    
+    def counted_pca(df_ai):
+        calls['pca'] += 1
+        return fit_pca(df_ai)
+    
+    monkeypatch.setattr(analysis, 'fit_anomaly_model', counted_forest)
+    monkeypatch.setattr(analysis, 'fit_pca', counted_pca)
+    return calls
+
+
+def test_sensitivity_change_reuses_both_fits(frame, fit_calls):
+    types, _ = detect_column_types(frame)
+    
+    low = analyze_csv_with_ai(frame, types, contamination=0.02, max_workers=1)
+    high = analyze_csv_with_ai(frame, types, contamination=0.2, max_workers=1)
+    
+    assert fit_calls == {'forest': 1, 'pca': 1}
+    assert len(high['stats']['ai_anomalies']['indices']) > len(low['stats']['ai_anomalies']['indices'])
+
+
+def test_imputation_change_refits(frame, fit_calls):
+    types, _ = detect_column_types(frame)
+    frame.loc[10:20, 'b'] = np.nan
+    
+    analyze_csv_with_ai(frame, types, imputation_method='drop', max_workers=1)
+    analyze_csv_with_ai(frame, types, imputation_method='mean', max_workers=1)
+    
+    assert fit_calls == {'forest': 2, 'pca': 2}
+
+
+def test_reused_stages_match_a_fresh_run(frame, monkeypatch):
+    types, _ = detect_column_types(frame)
+    analyze_csv_with_ai(frame, types, contamination=0.05, max_workers=1)
+    reused = analyze_csv_with_ai(frame, types, contamination=0.1, max_workers=1)
+    
+    monkeypatch.setattr(analysis, '_stage_cache', MemoryBoundedCache(64 * 1024 ** 2, 64 * 1024 ** 2))
+    fresh = analyze_csv_with_ai(frame, types, contamination=0.1, max_workers=1)
+    
+    assert reused['health_score'] == fresh['health_score']
+    assert reused['stats']['ai_anomalies']['indices'] == fresh['stats']['ai_anomalies']['indices']
+    np.testing.assert_allclose(reused['stats']['pca']['explained'], fresh['stats']['pca']['explained'])
+
+
+def test_cached_analysis_hashes_the_frame_once(frame, monkeypatch):
+    monkeypatch.setattr(cache_module, '_analysis_cache',
+                        SharedAnalysisCache(MemoryBoundedCache(64 * 1024 ** 2, 64 * 1024 ** 2)))
+    hashed = []
+    
+    def counted_hash(df):
+        hashed.append(len(df))
+        return compute_dataframe_hash(df)
+    
+    monkeypatch.setattr(cache_module, 'compute_dataframe_hash', counted_hash)
+    monkeypatch.setattr(analysis, 'compute_dataframe_hash', counted_hash)
+    run = cached_analysis(analyze_csv_with_ai)
+    types, _ = detect_column_types(frame)
+    
+    run(frame, types, 0.1, 'drop', max_workers=1)
+    assert len(hashed) == 1
+    
+    # A caller that already has the hash (app.py) does not hash again
+    run(frame, types, 0.2, 'drop', max_workers=1, df_hash=compute_dataframe_hash(frame))
+    assert len(hashed) == 1
+
+
+def test_df_hash_keys_the_stages(frame, fit_calls):
+    types, _ = detect_column_types(frame)
+    
+    analyze_csv_with_ai(frame, types, max_workers=1, df_hash='one')
+    analyze_csv_with_ai(frame, types, max_workers=1, df_hash='one')
+    analyze_csv_with_ai(frame, types, max_workers=1, df_hash='two')
+    
+    assert fit_calls['forest'] == 2
+
+
+def test_callers_cannot_change_cached_findings(frame):
+    frame.loc[:50, 'b'] = np.nan
+    types, _ = detect_column_types(frame)
+    first = analyze_csv_with_ai(frame, types, max_workers=1)
+    expected_message = first['issues'][0]['message']
+    
+    first['issues'][0]['message'] = 'edited'
+    first['stats']['missing_info'].loc[:, 'Missing'] = -1
+    first['visualizations']['correlation'].iloc[:, :] = 0.0
+    second = analyze_csv_with_ai(frame, types, max_workers=1)
+    
+    assert second['issues'][0]['message'] == expected_message
+    assert (second['stats']['missing_info']['Missing'] > 0).all()
+    assert second['visualizations']['correlation'].iloc[0, 0] == 1.0
+
+
+def test_profiles_are_hashed_by_their_digest(frame):
+    profile = profile_dataframe(frame)
+    
+    # The nested summaries are represented by the digest, not re-serialized
+    same_digest = dict(profile, sketches={}, columns={})
+    assert compute_params_hash((same_digest,), {}) == compute_params_hash((profile,), {})
+    # Flat entries updated after the profile was built still count
+    resampled = dict(profile, retained_rows=10, truncated=True)
+    assert compute_params_hash((resampled,), {}) != compute_params_hash((profile,), {})
+    assert profile_dataframe(frame.iloc[1:])['digest'] != profile['digest']
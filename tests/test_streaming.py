@@ -0,0 +1,116 @@
+"""
+Tests for streaming CSV ingestion
+Chunked profiles must match a single in-memory pass over the same rows
+"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.streaming import ColumnAccumulator, stream_csv, profile_dataframe
+
+
+def _csv(df):
+    return io.StringIO(df.to_csv(index=False))
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'x': rng.normal(10, 3, 5000),
+        'y': rng.integers(0, 100, 5000),
+        'label': rng.choice(['a', 'b', 'c'], 5000)
+    })
+    df.loc[::7, 'x'] = np.nan
+    return df
+
+
+def test_chunked_profile_matches_full_pass(frame):
+    _, profile = stream_csv(_csv(frame), chunk_rows=333)
+    
+    assert profile['total_rows'] == len(frame)
+    assert profile['chunks'] == -(-len(frame) // 333)
+    x = profile['columns']['x']
+    assert x['nulls'] == int(frame['x'].isna().sum())
+    assert x['count'] == int(frame['x'].notna().sum())
+    assert x['mean'] == pytest.approx(frame['x'].mean())
+    assert x['std'] == pytest.approx(frame['x'].std())
+    assert x['min'] == pytest.approx(frame['x'].min())
+    assert x['max'] == pytest.approx(frame['x'].max())
+    assert not profile['columns']['label']['is_numeric']
+
+
+def test_whole_file_is_kept_when_it_fits(frame):
+    df, profile = stream_csv(_csv(frame), chunk_rows=1000)
+    
+    assert not profile['truncated']
+    assert len(df) == len(frame)
+    pd.testing.assert_series_equal(df['y'], frame['y'])
+
+
+def test_sample_is_bounded_and_profile_stays_exact(frame):
+    df, profile = stream_csv(_csv(frame), chunk_rows=500, sample_rows=300)
+    
+    assert len(df) == 300
+    assert profile['truncated']
+    assert profile['retained_rows'] == 300
+    assert profile['columns']['y']['mean'] == pytest.approx(frame['y'].mean())
+
+
+def test_memory_budget_limits_retained_rows(frame):
+    big = pd.concat([frame] * 20, ignore_index=True)
+    df, profile = stream_csv(_csv(big), memory_budget_mb=1)
+    
+    assert profile['total_rows'] == len(big)
+    assert 0 < len(df) < len(big)
+    assert df.memory_usage(deep=True).sum() <= 1024 ** 2
+
+
+def test_accumulator_merge_equals_single_pass(frame):
+    whole = ColumnAccumulator('x')
+    whole.update(frame['x'])
+    left, right = ColumnAccumulator('x'), ColumnAccumulator('x')
+    left.update(frame['x'].iloc[:1234])
+    right.update(frame['x'].iloc[1234:])
+    merged = left.merge(right).to_dict()
+    
+    for key in ('count', 'nulls', 'mean', 'std', 'min', 'max'):
+        assert merged[key] == pytest.approx(whole.to_dict()[key])
+
+
+def test_profile_dataframe_matches_stream(frame):
+    _, streamed = stream_csv(_csv(frame), chunk_rows=700)
+    in_memory = profile_dataframe(pd.read_csv(_csv(frame)))
+    
+    assert in_memory['total_rows'] == streamed['total_rows']
+    assert in_memory['columns']['x']['mean'] == pytest.approx(streamed['columns']['x']['mean'])
+    assert in_memory['columns']['y']['std'] == pytest.approx(streamed['columns']['y']['std'])
+
+
+def test_column_null_in_the_first_chunks_is_still_profiled(frame):
+    frame = frame.assign(late=frame['y'] * 2.0 + frame['x'].fillna(0))
+    frame.loc[:999, 'late'] = np.nan
+    
+    # Arrow-backed chunks type an all-null column as null, not float
+    _, profile = stream_csv(_csv(frame), chunk_rows=500, dtype_backend='pyarrow')
+    
+    late = profile['columns']['late']
+    assert late['is_numeric'] and late['count'] == int(frame['late'].notna().sum())
+    assert late['mean'] == pytest.approx(frame['late'].mean())
+    corr = profile['correlation']
+    assert corr['columns'] == ['x', 'y', 'late']
+    expected = frame[['x', 'y', 'late']].corr().to_numpy()
+    np.testing.assert_allclose(corr['matrix'], expected, rtol=1e-9)
+
+
+def test_column_with_text_in_a_later_chunk_is_not_numeric(frame):
+    frame = frame.assign(mixed=frame['y'].astype(object))
+    frame.loc[4000, 'mixed'] = 'unknown'
+    
+    _, profile = stream_csv(_csv(frame), chunk_rows=500)
+    
+    assert not profile['columns']['mixed']['is_numeric']
+    assert 'mean' not in profile['columns']['mixed']
+    assert profile['correlation']['columns'] == ['x', 'y']
@@ -0,0 +1,97 @@
+"""
+Tests for the dependency-graph task runner
+Dependencies are respected, independent tasks overlap, callbacks stay on the calling thread
+"""
+import threading
+import time
+
+import pytest
+
+from core.task_graph import run_task_graph
+
+
+def test_dependencies_see_their_inputs():
+    tasks = {
+        'a': (lambda deps: 2, []),
+        'b': (lambda deps: deps['a'] * 10, ['a']),
+        'c': (lambda deps: deps['a'] + deps['b'], ['a', 'b'])
+    }
+    
+    assert run_task_graph(tasks, max_workers=4) == {'a': 2, 'b': 20, 'c': 22}
+
+
+def test_independent_tasks_overlap():
+    barrier = threading.Barrier(3, timeout=5)
+    
+    def meet(deps):
+        # Only passes if all three run at the same time
+        barrier.wait()
+        return True
+    
+    outputs = run_task_graph({name: (meet, []) for name in 'xyz'}, max_workers=3)
+    
+    assert outputs == {'x': True, 'y': True, 'z': True}
+
+
+def test_dependent_starts_only_after_its_inputs():
+    order = []
+    lock = threading.Lock()
+    
+    def record(name, delay=0.0):
+        def run(deps):
+            time.sleep(delay)
+            with lock:
+                order.append(name)
+            return name
+        return run
+    
+    tasks = {
+        'slow': (record('slow', 0.1), []),
+        'fast': (record('fast'), []),
+        'after': (record('after'), ['slow', 'fast'])
+    }
+    run_task_graph(tasks, max_workers=2)
+    
+    assert order[-1] == 'after'
+
+
+def test_on_complete_runs_in_the_calling_thread():
+    threads, calls = set(), []
+    
+    def on_complete(name, output, completed, total):
+        threads.add(threading.get_ident())
+        calls.append((name, completed, total))
+    
+    tasks = {'a': (lambda deps: 1, []), 'b': (lambda deps: 2, []), 'c': (lambda deps: 3, ['a'])}
+    run_task_graph(tasks, max_workers=3, on_complete=on_complete)
+    
+    assert threads == {threading.get_ident()}
+    assert sorted(name for name, _, _ in calls) == ['a', 'b', 'c']
+    assert [completed for _, completed, _ in calls] == [1, 2, 3]
+    assert {total for _, _, total in calls} == {3}
+
+
+def test_failing_task_yields_none_and_dependents_still_run():
+    def boom(deps):
+        raise RuntimeError('broken check')
+    
+    tasks = {
+        'bad': (boom, []),
+        'after': (lambda deps: deps['bad'] is None, ['bad']),
+        'other': (lambda deps: 'ok', [])
+    }
+    
+    assert run_task_graph(tasks, max_workers=2) == {'bad': None, 'after': True, 'other': 'ok'}
+
+
+def test_unknown_dependency_and_cycle_are_rejected():
+    with pytest.raises(ValueError, match='unknown'):
+        run_task_graph({'a': (lambda deps: 1, ['missing'])})
+    with pytest.raises(ValueError, match='cycle'):
+        run_task_graph({'a': (lambda deps: 1, ['b']), 'b': (lambda deps: 2, ['a'])})
+
+
+def test_sequential_mode_runs_everything():
+    tasks = {str(i): (lambda deps, i=i: i, []) for i in range(10)}
+    
+    assert run_task_graph(tasks, max_workers=1) == {str(i): i for i in range(10)}
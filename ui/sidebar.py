@@ -4,6 +4,11 @@ Settings and configuration options
 """
 import streamlit as st
 
+from config.constants import (
+    STREAMING_THRESHOLD_MB, STREAM_MEMORY_BUDGET_MB, DEFAULT_CSV_ENGINE, QUICK_ANALYSIS_BUDGET_S,
+    QUICK_ANALYSIS_ROWS
+)
+
 
 def render_sidebar():
     """
@@ -39,7 +44,7 @@ def render_sidebar():
         st.markdown("### 🔧 Imputation Method")
         imputation_display = st.selectbox(
             "Missing Value Imputation",
-            options=['MICE (Recommended)', 'Mean/Mode', 'Drop Rows'],
+            options=['MICE (Recommended)', 'MICE Fast (Large Files)', 'MICE Multiple (Pooled)', 'Mean/Mode', 'Drop Rows'],
             index=0,
             help="MICE (Multivariate Imputation by Chained Equations) is recommended for best results"
         )
@@ -47,13 +52,26 @@ def render_sidebar():
         # Map display name to internal name
         imputation_map = {
             'MICE (Recommended)': 'mice',
+            'MICE Fast (Large Files)': 'mice_fast',
+            'MICE Multiple (Pooled)': 'mice_multiple',
             'Mean/Mode': 'mean',
             'Drop Rows': 'drop'
         }
         imputation_method = imputation_map[imputation_display]
         
         # Show info about MICE
-        if 'MICE' in imputation_display:
+        if imputation_method == 'mice_fast':
+            st.info("""
+            **MICE Fast** fits each column's model on a 20k-row sample, predicts all rows in parallel 
+            and stops as soon as values converge. Meant for large files, where fitting on every row is 
+            slow; on small files the sample covers every row and the two give similar results.
+            """)
+        elif imputation_method == 'mice_multiple':
+            st.info("""
+            **MICE Multiple** draws 5 independent imputations in parallel worker processes and pools them 
+            with Rubin's rules, reporting how uncertain each column's imputed values are. Slower than MICE.
+            """)
+        elif 'MICE' in imputation_display:
             st.info("""
             **MICE** uses multiple iterations to model each feature with missing values as a function of other features. 
             It's more sophisticated than simple mean/median imputation.
@@ -71,6 +89,64 @@ def render_sidebar():
         
         st.markdown("---")
         
+        # Performance options
+        st.markdown("### ⚡ Performance")
+        parser_display = st.selectbox(
+            "CSV Parser",
+            options=['PyArrow (multi-threaded)', 'Pandas (C engine)'],
+            index=0 if DEFAULT_CSV_ENGINE == 'pyarrow' else 1,
+            help="PyArrow parses on all cores and pins column types from a first pass over the file head"
+        )
+        parser_map = {
+            'PyArrow (multi-threaded)': 'pyarrow',
+            'Pandas (C engine)': 'c'
+        }
+        
+        arrow_dtypes = st.checkbox(
+            "Arrow-backed Columns",
+            value=False,
+            disabled=parser_map[parser_display] != 'pyarrow',
+            help="Keep strings and nullable integers as Arrow arrays (less memory, no int -> float upcasting)"
+        )
+        
+        streaming_display = st.selectbox(
+            "Streaming Ingestion",
+            options=['Auto', 'Always', 'Never'],
+            index=0,
+            help=f"Read large files in bounded chunks instead of loading them whole (Auto: files > {STREAMING_THRESHOLD_MB} MB)"
+        )
+        streaming_map = {
+            'Auto': None,
+            'Always': True,
+            'Never': False
+        }
+        
+        memory_budget_mb = st.number_input(
+            "Memory Budget (MB)",
+            min_value=64,
+            max_value=8192,
+            value=STREAM_MEMORY_BUDGET_MB,
+            step=64,
+            help="Maximum memory used to hold rows while streaming a file"
+        )
+        
+        stratify_by = st.text_input(
+            "Stratify Sample By (optional)",
+            value="",
+            help="Column whose values must all be represented when a streamed file is sampled"
+        ).strip()
+        
+        progressive = st.checkbox(
+            "Progressive Analysis",
+            value=True,
+            help=(f"For files over {QUICK_ANALYSIS_ROWS:,} rows, show a preliminary score from quick checks "
+                  f"on a sample sized to finish in about {QUICK_ANALYSIS_BUDGET_S:g}s (fewer rows for wide "
+                  f"files, correlation skipped when there are very many numeric columns) and refine it "
+                  f"as the full analysis runs")
+        )
+        
+        st.markdown("---")
+        
         # Export options
         st.markdown("### 📦 Export Options")
         include_code = st.checkbox(
@@ -144,8 +220,14 @@ def render_sidebar():
         return {
             # Core settings (required by app.py and analysis.py)
             'ai_sensitivity': ai_sensitivity,           # Float: 0.02, 0.05, or 0.10
-            'imputation_method': imputation_method,     # String: 'mice', 'mean', or 'drop'
+            'imputation_method': imputation_method,     # String: 'mice', 'mice_fast', 'mice_multiple', 'mean', or 'drop'
             'show_3d_pca': show_3d_pca,                 # Boolean
+            'streaming': streaming_map[streaming_display],  # None (auto), True or False
+            'memory_budget_mb': memory_budget_mb,
+            'stratify_by': stratify_by or None,
+            'csv_engine': parser_map[parser_display],   # String: 'pyarrow' or 'c'
+            'arrow_dtypes': arrow_dtypes,
+            'progressive': progressive,                 # Boolean: preliminary score first
             
             # Additional settings
             'sensitivity_label': sensitivity,           # String: 'low', 'medium', 'high'
@@ -2,14 +2,40 @@
 from utils.logger import get_logger
 from utils.cache import (
     compute_dataframe_hash,
+    compute_params_hash,
+    get_cache_stats,
+    get_analysis_cache,
+    MemoryBoundedCache,
+    DiskCache,
+    SharedAnalysisCache,
     get_cached_analysis,
     set_cached_analysis,
     cached_analysis,
+    cache_session,
     clear_analysis_cache,
     clear_session_state_for_new_file
 )
 from utils.memory import (
     optimize_dtypes,
     get_memory_usage,
-    sample_large_dataset
+    sample_large_dataset,
+    estimate_object_size
+)
+from utils.sketches import (
+    KLLSketch,
+    HyperLogLog,
+    SpaceSaving,
+    sketch_from_dict
+)
+from utils.jobs import (
+    Job,
+    JobCancelled,
+    JobQueueFull,
+    JobExecutor,
+    get_job_executor,
+    start_session_job,
+    get_session_job,
+    cancel_session_job,
+    wait_for_job,
+    track_job
 )
\ No newline at end of file
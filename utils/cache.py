@@ -3,16 +3,46 @@ Caching utilities for Smart CSV Health Checker
 """
 import streamlit as st
 import pandas as pd
+import numpy as np
 import hashlib
+import hmac
+import inspect
+import json
+import os
+import pickle
+import stat
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from typing import Any, Optional, Callable
 from functools import wraps
 
-from config.constants import CACHE_TTL, ENABLE_CACHING
+from config.constants import (
+    CACHE_TTL, ENABLE_CACHING, ANALYSIS_CACHE_SESSION_MAX_MB, ANALYSIS_CACHE_GLOBAL_MAX_MB,
+    ANALYSIS_DISK_CACHE_DIR, ANALYSIS_DISK_CACHE_MAX_MB, ANALYSIS_SINGLEFLIGHT_WAIT_S
+)
+from utils.logger import get_logger
+from utils.memory import estimate_object_size
+
+logger = get_logger()
+
+
+def _hash_series(series: pd.Series) -> np.ndarray:
+    """Vectorized per-row hashes of a column (values only)"""
+    try:
+        return pd.util.hash_pandas_object(series, index=False).to_numpy()
+    except TypeError:
+        # Unhashable cells (lists, dicts) are hashed through their text form
+        return pd.util.hash_pandas_object(series.astype(str), index=False).to_numpy()
 
 
 def compute_dataframe_hash(df: pd.DataFrame) -> str:
     """
-    Compute a hash of a DataFrame for cache key purposes
+    Compute a hash of the full contents of a DataFrame for cache key purposes
+    
+    Every cell, the index, the column names and the dtypes contribute, so two
+    frames only share a hash when they hold the same data.
     
     Args:
         df: DataFrame to hash
@@ -20,23 +50,435 @@ def compute_dataframe_hash(df: pd.DataFrame) -> str:
     Returns:
         String hash of the DataFrame
     """
-    # Use shape + column names + sample of data for hash
-    hash_components = [
-        str(df.shape),
-        str(list(df.columns)),
-        str(df.dtypes.tolist()),
-    ]
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(str(df.shape).encode())
+    hasher.update(pd.util.hash_pandas_object(df.index).to_numpy().tobytes())
+    
+    for col in df.columns:
+        hasher.update(f"{col!r}:{df[col].dtype}".encode())
+        hasher.update(_hash_series(df[col]).tobytes())
+    
+    return hasher.hexdigest()
+
+
+def _digested(value: Any) -> Any:
+    # A dict that carries a precomputed 'digest' of its nested contents (a
+    # source profile, see core.streaming) is hashed by its flat entries only
+    if isinstance(value, dict) and isinstance(value.get('digest'), str):
+        return {key: item for key, item in value.items() if not isinstance(item, (dict, list, tuple))}
+    return value
+
+
+def compute_params_hash(args: tuple, kwargs: dict) -> str:
+    """
+    Hash the non-DataFrame arguments of an analysis call
+    
+    Arguments that are dicts with a 'digest' entry stand for their nested
+    contents by that digest, so large profiles are not serialized per call.
+    
+    Args:
+        args: Positional arguments
+        kwargs: Keyword arguments
+    
+    Returns:
+        Short string hash, stable across reruns and dict orderings
+    """
+    params = json.dumps({
+        'args': [_digested(value) for value in args],
+        'kwargs': {name: _digested(value) for name, value in kwargs.items()}
+    }, sort_keys=True, default=str)
+    return hashlib.blake2b(params.encode(), digest_size=8).hexdigest()
+
+
+def get_cache_stats() -> dict:
+    """
+    Get analysis cache hit/miss counters for this session
+    
+    Returns:
+        Dictionary with hits, misses and whether the last call was a hit
+    """
+    return st.session_state.setdefault(
+        'cache_stats', {'hits': 0, 'misses': 0, 'last_hit': False}
+    )
+
+
+def _record_cache_lookup(hit: bool, stats: Optional[dict] = None):
+    stats = get_cache_stats() if stats is None else stats
+    stats['hits' if hit else 'misses'] += 1
+    stats['last_hit'] = hit
+    logger.info(f"Analysis cache {'hit' if hit else 'miss'} (hits={stats['hits']}, misses={stats['misses']})")
+
+
+class MemoryBoundedCache:
+    """
+    Thread-safe LRU cache with per-session and global byte budgets
+    
+    Entries are visible to every session; each one is charged to the session
+    that stored it. Entries expire after `ttl` seconds. When a session exceeds
+    its budget its own least recently used entries are evicted first; when the
+    process exceeds the global budget the least recently used entries go.
+    """
+    
+    def __init__(self, session_max_bytes: int, global_max_bytes: int, ttl: float = CACHE_TTL):
+        self.session_max_bytes = session_max_bytes
+        self.global_max_bytes = global_max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, size, expires_at, owner session)
+        self._session_bytes = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return a live entry and mark it most recently used, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+    
+    def set(self, key: str, value: Any, session_id: str, size: Optional[int] = None) -> bool:
+        """
+        Store an entry, evicting older ones to stay within budget
+        
+        Returns:
+            False if the value alone is larger than the session budget
+        """
+        if size is None:
+            size = estimate_object_size(value)
+        if size > min(self.session_max_bytes, self.global_max_bytes):
+            logger.info(f"Analysis result too large to cache in memory ({size / 1024**2:.1f} MB)")
+            return False
+        
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl, session_id)
+            self._session_bytes[session_id] = self._session_bytes.get(session_id, 0) + size
+            self._total_bytes += size
+            self._evict(session_id)
+        return True
+    
+    def clear_session(self, session_id: str):
+        """Drop every entry stored by one session"""
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if entry[3] == session_id]:
+                self._remove(key)
+    
+    def stats(self) -> dict:
+        """Current entry count and memory use"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'total_mb': self._total_bytes / 1024**2,
+                'sessions': len(self._session_bytes)
+            }
+    
+    def _remove(self, key: str):
+        _, size, _, session_id = self._entries.pop(key)
+        self._session_bytes[session_id] -= size
+        if self._session_bytes[session_id] <= 0:
+            del self._session_bytes[session_id]
+        self._total_bytes -= size
+    
+    def _evict(self, session_id: str):
+        # Expired entries go first, wherever they are
+        now = time.monotonic()
+        for key in [k for k, entry in self._entries.items() if entry[2] < now]:
+            self._remove(key)
+        
+        # Then this session's least recently used entries
+        for key in [k for k, entry in self._entries.items() if entry[3] == session_id]:
+            if self._session_bytes.get(session_id, 0) <= self.session_max_bytes:
+                break
+            self._remove(key)
+            logger.info(f"Analysis cache evicted {key} (session budget)")
+        
+        # Then the least recently used entries of any session
+        while self._total_bytes > self.global_max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+            logger.info(f"Analysis cache evicted {key} (global budget)")
+
+
+def ensure_private_dir(path: str) -> bool:
+    """
+    Create a directory only the current user can use, or vet an existing one
     
-    # Add sample data hash for small datasets
-    if len(df) <= 1000:
-        hash_components.append(str(df.values.tobytes()))
-    else:
-        # For large datasets, sample
-        sample = df.sample(n=min(1000, len(df)), random_state=42)
-        hash_components.append(str(sample.values.tobytes()))
+    Args:
+        path: Directory path
     
-    combined = '|'.join(hash_components)
-    return hashlib.md5(combined.encode()).hexdigest()
+    Returns:
+        True if the directory is a real directory owned by this user that no
+        one else can write to (permissions are tightened when needed)
+    """
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        info = os.lstat(path)
+    except OSError as e:
+        logger.log_error_with_context(e, f"Cache directory {path}")
+        return False
+    
+    if not stat.S_ISDIR(info.st_mode):
+        logger.warning(f"Cache directory {path} is not a directory (symlink?); not using it")
+        return False
+    if hasattr(os, 'getuid'):
+        if info.st_uid != os.getuid():
+            logger.warning(f"Cache directory {path} belongs to another user; not using it")
+            return False
+        if info.st_mode & 0o077:
+            os.chmod(path, 0o700)
+    return True
+
+
+class DiskCache:
+    """
+    Pickled results on disk, shared by every session and server restart
+    
+    Writes are atomic; entries older than `ttl` are ignored and the least
+    recently used files are deleted once the directory exceeds its budget.
+    The directory must be private to the current user (otherwise the tier is
+    disabled), and every entry carries an HMAC of its key and bytes made with
+    a secret kept in that directory, so only entries this cache wrote are
+    ever unpickled.
+    """
+    
+    DIGEST_SIZE = hashlib.sha256().digest_size
+    
+    def __init__(self, cache_dir: str, max_bytes: int, ttl: float = CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.enabled = ensure_private_dir(cache_dir)
+        self._secret = None
+        if self.enabled:
+            try:
+                self._secret = self._load_secret()
+            except OSError as e:
+                logger.log_error_with_context(e, "Analysis disk cache key")
+                self.enabled = False
+    
+    def _load_secret(self) -> bytes:
+        path = os.path.join(self.cache_dir, 'hmac.key')
+        if not os.path.exists(path):
+            tmp_path = f"{path}.tmp{os.getpid()}_{threading.get_ident()}"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(os.urandom(32))
+            # Linking is atomic and never overwrites: the first process to publish wins
+            try:
+                os.link(tmp_path, path)
+            except FileExistsError:
+                pass
+            finally:
+                os.remove(tmp_path)
+        with open(path, 'rb') as f:
+            return f.read()
+    
+    def _sign(self, key: str, payload: bytes) -> bytes:
+        return hmac.new(self._secret, key.encode() + b'\0' + payload, hashlib.sha256).digest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Load a live, verified entry and bump its recency, or None"""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, 'rb') as f:
+                data = f.read()
+            digest, payload = data[:self.DIGEST_SIZE], data[self.DIGEST_SIZE:]
+            if not hmac.compare_digest(digest, self._sign(key, payload)):
+                logger.warning(f"Analysis disk cache entry {key} failed verification; ignored")
+                return None
+            value = pickle.loads(payload)
+            os.utime(path)
+            return value
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+    
+    def set(self, key: str, value: Any) -> bool:
+        """Write a signed entry; returns False when the value cannot be pickled"""
+        if not self.enabled:
+            return False
+        path = self._path(key)
+        tmp_path = f"{path}.tmp{os.getpid()}_{threading.get_ident()}"
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self._sign(key, payload))
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+            logger.log_error_with_context(e, "Analysis disk cache write")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        
+        self._evict()
+        return True
+    
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.pkl'):
+                    continue
+                try:
+                    info = os.stat(os.path.join(self.cache_dir, name))
+                except OSError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, name))
+            
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+                total -= size
+
+
+class SharedAnalysisCache:
+    """
+    Server-level result cache: memory tier, disk tier and singleflight
+    
+    Keys are content hash + settings, so any session analyzing the same bytes
+    with the same settings reuses one result. Concurrent requests for a key
+    that is still being computed wait for that computation instead of
+    starting their own; a waiter that hears nothing for `wait_timeout`
+    seconds computes the value itself. Cached results are shared objects and
+    must be treated as read-only.
+    """
+    
+    def __init__(self, memory: MemoryBoundedCache, disk: Optional[DiskCache] = None,
+                 wait_timeout: float = ANALYSIS_SINGLEFLIGHT_WAIT_S):
+        self.memory = memory
+        self.disk = disk
+        self.wait_timeout = wait_timeout
+        self._inflight = {}  # key -> threading.Event set when the leader finishes
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Look a key up in memory, then on disk (promoting disk hits)"""
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return value
+        
+        value = self.disk.get(key)
+        if value is not None:
+            self.memory.set(key, value, session_id='disk')
+            logger.info(f"Analysis cache disk hit: {key}")
+        return value
+    
+    def set(self, key: str, value: Any, session_id: str):
+        """Store a value in both tiers"""
+        self.memory.set(key, value, session_id)
+        if self.disk is not None:
+            self.disk.set(key, value)
+    
+    def get_or_compute(self, key: str, compute: Callable[[], Any], session_id: str):
+        """
+        Return the cached value for key, computing it at most once at a time
+        
+        Args:
+            key: Cache key
+            compute: Zero-argument function producing the value
+            session_id: Session charged for the stored value
+        
+        Returns:
+            Tuple of (value, hit) where hit is False only for the caller
+            that ran compute
+        """
+        while True:
+            value = self.get(key)
+            if value is not None:
+                return value, True
+            
+            with self._lock:
+                event = self._inflight.get(key)
+                leader = event is None
+                if leader:
+                    event = self._inflight[key] = threading.Event()
+            
+            if not leader:
+                # Another session is computing this key; wait, then re-check
+                # (if the leader failed, the next loop elects a new one)
+                if event.wait(self.wait_timeout):
+                    continue
+                # The leader never finished (e.g. its thread died); don't wait forever
+                logger.warning(f"Gave up waiting {self.wait_timeout:.0f}s for {key}; computing it here")
+                value = compute()
+                self.set(key, value, session_id)
+                return value, False
+            
+            try:
+                value = compute()
+                self.set(key, value, session_id)
+                return value, False
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+                event.set()
+    
+    def clear_session(self, session_id: str):
+        """Drop the in-memory entries stored by one session"""
+        self.memory.clear_session(session_id)
+
+
+_analysis_cache = None
+_analysis_cache_lock = threading.Lock()
+
+
+def get_analysis_cache() -> SharedAnalysisCache:
+    """
+    Get the process-wide analysis result cache
+    
+    Created on first use, so importing this module never touches the disk
+    """
+    global _analysis_cache
+    with _analysis_cache_lock:
+        if _analysis_cache is None:
+            _analysis_cache = SharedAnalysisCache(
+                MemoryBoundedCache(
+                    session_max_bytes=ANALYSIS_CACHE_SESSION_MAX_MB * 1024**2,
+                    global_max_bytes=ANALYSIS_CACHE_GLOBAL_MAX_MB * 1024**2
+                ),
+                DiskCache(ANALYSIS_DISK_CACHE_DIR, ANALYSIS_DISK_CACHE_MAX_MB * 1024**2)
+            )
+        return _analysis_cache
+
+
+def _session_id() -> str:
+    """Stable identifier of the current browser session"""
+    return st.session_state.setdefault('cache_session_id', uuid.uuid4().hex)
+
+
+def cache_session() -> dict:
+    """
+    This session's cache accounting, captured on the script thread
+    
+    Work running in a background thread has no access to st.session_state;
+    it receives these values explicitly (see utils.jobs) and passes them to
+    a cached_analysis function as session=...
+    
+    Returns:
+        Dict with session_id (charged for stored results) and stats (the
+        session's hit/miss counters, updated in place)
+    """
+    return {'session_id': _session_id(), 'stats': get_cache_stats()}
 
 
 def get_cached_analysis(df_hash: str) -> Optional[dict]:
@@ -52,17 +494,12 @@ def get_cached_analysis(df_hash: str) -> Optional[dict]:
     if not ENABLE_CACHING:
         return None
     
-    cache_key = f"analysis_{df_hash}"
-    
-    if cache_key in st.session_state:
-        return st.session_state[cache_key]
-    
-    return None
+    return get_analysis_cache().get(f"analysis_{df_hash}")
 
 
 def set_cached_analysis(df_hash: str, results: dict):
     """
-    Cache analysis results
+    Cache analysis results for every session (memory and disk tiers)
     
     Args:
         df_hash: Hash of the DataFrame
@@ -71,50 +508,70 @@ def set_cached_analysis(df_hash: str, results: dict):
     if not ENABLE_CACHING:
         return
     
-    cache_key = f"analysis_{df_hash}"
-    st.session_state[cache_key] = results
+    get_analysis_cache().set(f"analysis_{df_hash}", results, _session_id())
 
 
 def cached_analysis(func: Callable) -> Callable:
     """
-    Decorator for caching analysis functions
+    Decorator for caching analysis functions across all sessions
+    
+    The wrapper takes an optional df_hash (from compute_dataframe_hash) so
+    callers that already hashed the DataFrame do not hash it again; it is
+    passed on to func when func accepts a df_hash parameter. Calls made
+    outside the script thread pass session=cache_session() captured there.
     
     Usage:
         @cached_analysis
         def analyze_csv_with_ai(df, types, contamination, imputation_method):
             ...
     """
+    takes_hash = 'df_hash' in inspect.signature(func).parameters
+    
+    def make_key(df_hash: str, args: tuple, kwargs: dict) -> str:
+        # Key on the full data and every parameter (contamination, imputation, ...);
+        # callables such as progress callbacks do not affect the result
+        params = {name: value for name, value in kwargs.items() if not callable(value)}
+        return f"analysis_{func.__name__}_{df_hash}_{compute_params_hash(args, params)}"
+    
     @wraps(func)
-    def wrapper(df: pd.DataFrame, *args, **kwargs):
+    def wrapper(df: pd.DataFrame, *args, df_hash: Optional[str] = None, session: Optional[dict] = None,
+                **kwargs):
+        if ENABLE_CACHING or takes_hash:
+            df_hash = compute_dataframe_hash(df) if df_hash is None else df_hash
+        call_kwargs = dict(kwargs, df_hash=df_hash) if takes_hash else kwargs
         if not ENABLE_CACHING:
-            return func(df, *args, **kwargs)
-        
-        # Compute hash
-        df_hash = compute_dataframe_hash(df)
+            return func(df, *args, **call_kwargs)
         
-        # Create cache key with all parameters
-        param_hash = hashlib.md5(str(args).encode() + str(kwargs).encode()).hexdigest()[:8]
-        full_hash = f"{df_hash}_{param_hash}"
-        
-        # Check cache
-        cached = get_cached_analysis(full_hash)
-        if cached is not None:
-            return cached
-        
-        # Compute and cache
-        result = func(df, *args, **kwargs)
-        set_cached_analysis(full_hash, result)
+        session = cache_session() if session is None else session
+        # Concurrent uploads of the same file trigger a single computation
+        result, hit = get_analysis_cache().get_or_compute(
+            make_key(df_hash, args, kwargs), lambda: func(df, *args, **call_kwargs), session['session_id']
+        )
+        _record_cache_lookup(hit, session['stats'])
         
         return result
     
+    def cache_key(df_hash: str, *args, **kwargs) -> str:
+        """Key of a call whose DataFrame hashes to df_hash (see compute_dataframe_hash)"""
+        return make_key(df_hash, args, kwargs)
+    
+    def lookup(key: str) -> Optional[Any]:
+        """Cached result for a cache_key(), or None (never computes)"""
+        if not ENABLE_CACHING:
+            return None
+        result = get_analysis_cache().get(key)
+        if result is not None:
+            _record_cache_lookup(True)
+        return result
+    
+    wrapper.cache_key = cache_key
+    wrapper.lookup = lookup
     return wrapper
 
 
 def clear_analysis_cache():
-    """Clear all cached analysis results"""
-    keys_to_delete = [k for k in st.session_state.keys() if k.startswith('analysis_')]
-    for key in keys_to_delete:
-        del st.session_state[key]
+    """Clear the in-memory analysis results stored by the current session"""
+    get_analysis_cache().clear_session(_session_id())
 
 
 def clear_session_state_for_new_file(uploaded_file):
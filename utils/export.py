@@ -6,6 +6,7 @@ import io
 from typing import Optional
 import json
 
+from features.duplicates import count_duplicates
 from utils.logger import get_logger
 
 logger = get_logger()
@@ -162,7 +163,7 @@ def generate_validation_rules(df: pd.DataFrame) -> str:
             col_rules.append(f"- Range: [{min_val}, {max_val}]")
         
         # Categorical/Enum
-        elif df[col].dtype == 'object':
+        elif pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col]):
             unique_vals = df[col].dropna().unique()
             if len(unique_vals) <= 20:
                 vals_str = ', '.join([f"'{v}'" for v in unique_vals[:10]])
@@ -261,7 +262,7 @@ def export_html_report(df: pd.DataFrame, results: dict,
                     <div class="metric-label">Missing Values</div>
                 </div>
                 <div class="metric-card">
-                    <div class="metric-value">{df.duplicated().sum()}</div>
+                    <div class="metric-value">{count_duplicates(df)}</div>
                     <div class="metric-label">Duplicates</div>
                 </div>
             </div>
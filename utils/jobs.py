@@ -0,0 +1,331 @@
+"""
+Background job executor for Smart CSV Health Checker
+Runs heavy work off the Streamlit script thread so reruns poll it instead of restarting it
+"""
+import streamlit as st
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from config.constants import JOB_MAX_WORKERS, JOB_HISTORY_MAX, JOB_POLL_INTERVAL_S
+from utils.cache import cache_session
+from utils.logger import get_logger
+
+logger = get_logger()
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when it reports progress after being cancelled"""
+
+
+class JobQueueFull(Exception):
+    """Raised by JobExecutor.submit when max_pending jobs are already unfinished"""
+
+
+class Job:
+    """
+    One unit of background work
+    
+    The job function receives the Job itself and may call `report(progress)`
+    to publish progress; that call is also where cancellation takes effect,
+    so a running job stops at its next report (a queued job never starts).
+    
+    Jobs run without a Streamlit script context, so they must not touch
+    st.session_state or draw elements; session-scoped values they need are
+    handed over in `session` when the job is submitted.
+    """
+    
+    def __init__(self, name: str, key: Any = None, session: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.key = key
+        self.session = session
+        self.status = JOB_QUEUED
+        self.progress: Any = None
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cancel_event = threading.Event()
+    
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED_STATES
+    
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+    
+    def report(self, progress: Any):
+        """Publish progress (any value; the UI decides how to show it)"""
+        if self._cancel_event.is_set():
+            raise JobCancelled(self.id)
+        self.progress = progress
+    
+    def elapsed(self) -> float:
+        """Seconds since submission (until completion once finished)"""
+        return (self.finished_at or time.time()) - self.submitted_at
+
+
+class JobExecutor:
+    """
+    Bounded thread pool running Jobs, shared by every session of the process
+    
+    Threads (not processes) are used because job results hold models and
+    DataFrames that are costly to pickle, and the heavy NumPy/scikit-learn
+    loops release the GIL. Finished jobs are kept for retrieval until more
+    than `history` have accumulated; the oldest finished ones are then dropped.
+    With `max_pending` set, at most that many jobs may be queued or running;
+    further submissions are refused (backpressure) rather than queued.
+    """
+    
+    def __init__(self, max_workers: int = JOB_MAX_WORKERS, history: int = JOB_HISTORY_MAX,
+                 max_pending: Optional[int] = None):
+        self.max_workers = max(1, max_workers)
+        self.history = history
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+        self._jobs = OrderedDict()  # id -> Job, in submission order
+        self._lock = threading.Lock()
+    
+    def submit(self, name: str, function: Callable[[Job], Any], key: Any = None,
+               session: Optional[Dict[str, Any]] = None) -> Job:
+        """
+        Queue function(job) for execution
+        
+        Args:
+            name: Label of the job (e.g. 'analysis')
+            function: Called with the Job; its return value becomes job.result
+            key: Identifies the inputs, so callers can tell whether a job is
+                still current
+            session: Session-scoped values the job reads as job.session
+                (e.g. utils.cache.cache_session())
+        
+        Returns:
+            The queued Job
+        
+        Raises:
+            JobQueueFull: max_pending jobs are already queued or running
+        """
+        job = Job(name, key, session)
+        with self._lock:
+            if self._is_full():
+                raise JobQueueFull(f"{self.max_pending} jobs already pending")
+            self._jobs[job.id] = job
+            self._prune()
+        self._pool.submit(self._run, job, function)
+        return job
+    
+    def _run(self, job: Job, function: Callable[[Job], Any]):
+        if job.cancel_requested:
+            job.status, job.finished_at = JOB_CANCELLED, time.time()
+            return
+        
+        job.status, job.started_at = JOB_RUNNING, time.time()
+        try:
+            job.result = function(job)
+            job.status = JOB_DONE
+        except JobCancelled:
+            job.status = JOB_CANCELLED
+            logger.info(f"Job '{job.name}' cancelled after {time.time() - job.started_at:.1f}s")
+        except Exception as e:
+            job.error = e
+            job.status = JOB_FAILED
+            logger.log_error_with_context(e, f"Job '{job.name}'")
+        finally:
+            job.finished_at = time.time()
+    
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        """Job by id, or None if unknown or already dropped from history"""
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def cancel(self, job_id: Optional[str]) -> bool:
+        """
+        Request cancellation of a job
+        
+        Returns:
+            True if the job was queued or running
+        """
+        job = self.get(job_id)
+        if job is None or job.done:
+            return False
+        job._cancel_event.set()
+        return True
+    
+    def _count_pending(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.done)
+    
+    def _is_full(self) -> bool:
+        return self.max_pending is not None and self._count_pending() >= self.max_pending
+    
+    def is_full(self) -> bool:
+        """True if a submission right now would raise JobQueueFull"""
+        with self._lock:
+            return self._is_full()
+    
+    def counts(self) -> Dict[str, int]:
+        """Number of known jobs per status"""
+        with self._lock:
+            counts = dict.fromkeys((JOB_QUEUED, JOB_RUNNING) + FINISHED_STATES, 0)
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+    
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(self._jobs) - self.history)]:
+            del self._jobs[job_id]
+
+
+_job_executor = JobExecutor()
+
+
+def get_job_executor() -> JobExecutor:
+    """Process-wide job executor"""
+    return _job_executor
+
+
+# =================================================================
+# SESSION HELPERS
+# =================================================================
+# A session remembers one job id per name in st.session_state, so a rerun
+# (any widget click) finds the running job and polls it instead of
+# starting the work again.
+
+def _session_jobs() -> Dict[str, str]:
+    return st.session_state.setdefault('jobs', {})
+
+
+def get_session_job(name: str, key: Any = None) -> Optional[Job]:
+    """
+    This session's job for name, or None (also when its key differs)
+    
+    Args:
+        name: Job label
+        key: Current inputs; pass None to accept any key
+    """
+    job = _job_executor.get(_session_jobs().get(name))
+    if job is None or (key is not None and job.key != key):
+        return None
+    return job
+
+
+def start_session_job(name: str, key: Any, function: Callable[[Job], Any], restart: bool = False) -> Job:
+    """
+    Return this session's job for name and key, submitting it if needed
+    
+    A previous job with a different key (stale inputs) is cancelled. A job
+    with the same key is reused unless it failed or restart is True, so a
+    cancelled job stays cancelled across reruns until explicitly restarted.
+    
+    The job receives this session's cache accounting as job.session (see
+    utils.cache.cache_session), since it cannot read st.session_state.
+    
+    Args:
+        name: Job label
+        key: Identifies the inputs
+        function: Called with the Job in a worker thread
+        restart: Submit a new job even if a matching one exists
+    
+    Returns:
+        The Job
+    """
+    jobs = _session_jobs()
+    previous = _job_executor.get(jobs.get(name))
+    if previous is not None:
+        if previous.key == key and not restart and previous.status != JOB_FAILED:
+            return previous
+        _job_executor.cancel(previous.id)
+    
+    job = _job_executor.submit(name, function, key, session=cache_session())
+    jobs[name] = job.id
+    return job
+
+
+def cancel_session_job(name: str) -> bool:
+    """Cancel this session's job for name; True if it was still active"""
+    return _job_executor.cancel(_session_jobs().get(name))
+
+
+def wait_for_job(job: Job, on_poll: Optional[Callable[[Job], None]] = None,
+                 poll_interval: float = JOB_POLL_INTERVAL_S, timeout: Optional[float] = None) -> Job:
+    """
+    Poll a job from the script thread until it finishes
+    
+    on_poll runs on every poll (and once at the end), so it may update
+    progress elements; if a rerun interrupts the wait, the job keeps running
+    and the next run picks it up again. The calling script run is blocked
+    meanwhile; use track_job where the rest of the page should stay usable.
+    
+    Args:
+        job: Job to wait for
+        on_poll: Optional callback(job)
+        poll_interval: Seconds between polls
+        timeout: Give up after this many seconds (the job may still be running)
+    
+    Returns:
+        The Job (finished unless the timeout expired)
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while not job.done and (deadline is None or time.monotonic() < deadline):
+        if on_poll is not None:
+            on_poll(job)
+        time.sleep(poll_interval)
+    if on_poll is not None:
+        on_poll(job)
+    return job
+
+
+# Fragments (Streamlit >= 1.33) rerun on a timer without rerunning the page
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+
+
+def track_job(job: Job, label: str, poll_interval: float = JOB_POLL_INTERVAL_S * 4,
+              render: Optional[Callable[[Job], None]] = None):
+    """
+    Show a running job's progress without holding up the rest of the page
+    
+    Progress reported as {'fraction': float, 'text': str} drives a progress
+    bar; jobs reporting something else pass their own render. With fragment
+    support a small fragment refreshes itself and reruns the page once the
+    job finishes. Older Streamlit versions get the current status and a
+    refresh button instead, since waiting would block the page.
+    
+    Args:
+        job: Running job
+        label: Text shown until the job reports progress
+        poll_interval: Seconds between refreshes
+        render: Optional callback(job) drawing the progress with st calls
+            (instead of the progress bar); it runs on every refresh
+    """
+    def show_progress(job):
+        progress = job.progress if isinstance(job.progress, dict) else {}
+        text = f"{progress.get('text', label)} ({job.elapsed():.0f}s)"
+        st.progress(min(1.0, progress.get('fraction', 0.0)), text=text)
+    
+    render = render or show_progress
+    
+    if _fragment is None:
+        render(job)
+        st.button("🔄 Refresh status", key=f"refresh_{job.id}")
+        return
+    
+    @_fragment(run_every=poll_interval)
+    def poll():
+        if job.done:
+            st.rerun()
+        render(job)
+    
+    poll()
@@ -1,9 +1,12 @@
 """
 Memory optimization utilities for Smart CSV Health Checker
 """
+import pickle
+import sys
+
 import pandas as pd
 import numpy as np
-from typing import Tuple
+from typing import Any, Dict, Optional, Tuple
 
 from utils.logger import get_logger
 
@@ -71,13 +74,13 @@ def optimize_dtypes(df: pd.DataFrame, verbose: bool = False) -> Tuple[pd.DataFra
                         report['changes'].append(f"{col}: float64 -> {df_optimized[col].dtype}")
             
             # Optimize objects to category if low cardinality
-            elif col_type == 'object':
+            elif pd.api.types.is_object_dtype(df_optimized[col]) or pd.api.types.is_string_dtype(df_optimized[col]):
                 num_unique = df_optimized[col].nunique()
                 num_total = len(df_optimized[col])
                 
                 if num_total > 0 and num_unique / num_total < 0.5:
                     df_optimized[col] = df_optimized[col].astype('category')
-                    report['changes'].append(f"{col}: object -> category ({num_unique} unique)")
+                    report['changes'].append(f"{col}: {col_type} -> category ({num_unique} unique)")
         
         except Exception:
             continue
@@ -138,11 +141,246 @@ def prepare_df_for_display(df: pd.DataFrame) -> pd.DataFrame:
         if pd.api.types.is_datetime64_any_dtype(df_display[col]):
             df_display[col] = df_display[col].astype(str)
         # Handle mixed object types
-        elif df_display[col].dtype == 'object':
+        elif pd.api.types.is_object_dtype(df_display[col]) or pd.api.types.is_string_dtype(df_display[col]):
             try:
                 # Try to convert to datetime if it looks like dates
                 df_display[col] = pd.to_datetime(df_display[col]).astype(str)
             except:
                 df_display[col] = df_display[col].astype(str)
     
-    return df_display
\ No newline at end of file
+    return df_display
+
+class ReservoirSampler:
+    """
+    Uniform fixed-size sample over a stream of DataFrame chunks (Algorithm R)
+    
+    Each chunk is processed with vectorized draws. Replacements that land on
+    the same slot resolve to the last item, exactly as the sequential
+    algorithm would, so memory stays at O(capacity) rows.
+    """
+    
+    def __init__(self, capacity: int, random_state: int = 42):
+        self.capacity = capacity
+        self.seen = 0
+        self._rng = np.random.default_rng(random_state)
+        self._sample = None
+        self._positions = np.empty(0, dtype=np.int64)
+    
+    def update(self, chunk: pd.DataFrame):
+        """Offer every row of a chunk to the reservoir"""
+        n = len(chunk)
+        if n == 0:
+            return
+        
+        positions = np.arange(self.seen, self.seen + n, dtype=np.int64)
+        self.seen += n
+        
+        # Fill phase: the first `capacity` rows are always kept
+        n_fill = max(0, min(n, self.capacity - len(self._positions)))
+        if n_fill > 0:
+            self._append(chunk.iloc[:n_fill], positions[:n_fill])
+        
+        if n_fill == n:
+            return
+        
+        # Replacement phase: row t replaces slot j ~ U[0, t] when j < capacity
+        rest = positions[n_fill:]
+        slots = (self._rng.random(len(rest)) * (rest + 1)).astype(np.int64)
+        accepted = np.flatnonzero(slots < self.capacity)
+        if len(accepted) == 0:
+            return
+        
+        # Last writer wins for repeated slots
+        rev_slots = slots[accepted][::-1]
+        _, first_rev = np.unique(rev_slots, return_index=True)
+        winners = accepted[::-1][first_rev]
+        
+        keep = np.ones(self.capacity, dtype=bool)
+        keep[slots[winners]] = False
+        self._sample = pd.concat(
+            [self._sample.iloc[keep], chunk.iloc[winners + n_fill]],
+            ignore_index=True
+        )
+        self._positions = np.concatenate([self._positions[keep], rest[winners]])
+    
+    def _append(self, rows: pd.DataFrame, positions: np.ndarray):
+        if self._sample is None:
+            self._sample = rows.reset_index(drop=True)
+        else:
+            self._sample = pd.concat([self._sample, rows], ignore_index=True)
+        self._positions = np.concatenate([self._positions, positions])
+    
+    def result(self) -> pd.DataFrame:
+        """Return the sample in original file order"""
+        if self._sample is None:
+            return pd.DataFrame()
+        order = np.argsort(self._positions, kind='stable')
+        return self._sample.iloc[order].reset_index(drop=True)
+
+
+class StratifiedReservoirSampler:
+    """
+    Reservoir sample that keeps every level of a column represented
+    
+    One uniform reservoir of `capacity` rows is shared by all strata, and each
+    stratum also keeps a reservoir of `min_rows` rows of its own (levels beyond
+    `max_strata` share an overflow stratum), so at most
+    capacity + (max_strata + 1) * min_rows rows are held whatever the number
+    of levels. The final sample allocates `capacity` rows proportionally to
+    the exact stratum counts, with at least `min_rows` for every stratum that
+    was seen (as far as capacity allows); strata the shared draw left short are
+    made up with surplus rows of the others, so shares match the allocation up
+    to the sampling noise of the shared reservoir.
+    """
+    
+    OVERFLOW_STRATUM = '__other__'
+    
+    def __init__(self, capacity: int, column: str, max_strata: int = 50, min_rows: int = 1,
+                 random_state: int = 42):
+        self.capacity = capacity
+        self.column = column
+        self.max_strata = max_strata
+        self.min_rows = max(1, min_rows)
+        self.random_state = random_state
+        self.seen = 0
+        self.stratum_counts = {}
+        self._shared = ReservoirSampler(capacity, random_state)
+        self._minimums = {}
+    
+    @property
+    def held_rows(self) -> int:
+        """Rows currently held in memory"""
+        return len(self._shared._positions) + sum(len(r._positions) for r in self._minimums.values())
+    
+    def update(self, chunk: pd.DataFrame):
+        """Offer each row of a chunk to the shared reservoir and its stratum reservoir"""
+        if len(chunk) == 0:
+            return
+        
+        keys = chunk[self.column].astype(str).where(chunk[self.column].notna(), 'NaN')
+        known = set(self._minimums)
+        for key in pd.unique(keys):
+            if key not in known and len(known) >= self.max_strata:
+                keys = keys.where(keys != key, self.OVERFLOW_STRATUM)
+            else:
+                known.add(key)
+        
+        # Row offsets keep the merged sample in file order
+        chunk = chunk.assign(
+            _row_position=np.arange(self.seen, self.seen + len(chunk)),
+            _stratum=keys.to_numpy()
+        )
+        self.seen += len(chunk)
+        self._shared.update(chunk)
+        
+        for key, part in chunk.groupby('_stratum', sort=False):
+            if key not in self._minimums:
+                self._minimums[key] = ReservoirSampler(
+                    self.min_rows, self.random_state + 1 + len(self._minimums)
+                )
+            self._minimums[key].update(part)
+            self.stratum_counts[key] = self.stratum_counts.get(key, 0) + len(part)
+    
+    def allocate(self) -> Dict[str, int]:
+        """
+        Rows per stratum in the final sample
+        
+        Every stratum first gets min(count, min_rows); the rest of the capacity
+        is split proportionally to the remaining counts (largest remainder), so
+        the shares never sum to more than `capacity`.
+        """
+        total = min(self.capacity, self.seen)
+        keys = sorted(self.stratum_counts, key=self.stratum_counts.get, reverse=True)
+        shares = {key: min(self.stratum_counts[key], self.min_rows) for key in keys}
+        
+        if sum(shares.values()) >= total:
+            # Too many strata for the minimums; the largest keep theirs
+            budget = total
+            for key in keys:
+                shares[key] = min(shares[key], budget)
+                budget -= shares[key]
+            return shares
+        
+        remaining = total - sum(shares.values())
+        rest = np.array([self.stratum_counts[key] - shares[key] for key in keys], dtype=float)
+        exact = remaining * rest / rest.sum()
+        extra = np.floor(exact).astype(int)
+        for i in np.argsort(-(exact - extra), kind='stable')[:remaining - extra.sum()]:
+            extra[i] += 1
+        for key, n in zip(keys, extra):
+            shares[key] += int(n)
+        return shares
+    
+    def result(self) -> pd.DataFrame:
+        """Return the proportionally allocated sample in original file order"""
+        if not self._minimums:
+            return pd.DataFrame()
+        
+        rng = np.random.default_rng(self.random_state)
+        pool = self._shared.result()
+        parts, spare = [], []
+        for key, share in self.allocate().items():
+            rows = pool[pool['_stratum'] == key]
+            if len(rows) < share:
+                # Small strata can be missed by the shared draw; top up from their own reservoir
+                own = self._minimums[key].result()
+                own = own[~own['_row_position'].isin(rows['_row_position'])]
+                rows = pd.concat([rows, own.iloc[:share - len(rows)]])
+            elif len(rows) > share:
+                order = rng.permutation(len(rows))
+                spare.append(rows.iloc[order[share:]])
+                rows = rows.iloc[order[:share]]
+            parts.append(rows)
+        
+        # Strata whose draw fell short are made up with surplus rows of the others
+        missing = min(self.capacity, self.seen) - sum(len(part) for part in parts)
+        if missing > 0 and spare:
+            spare = pd.concat(spare)
+            parts.append(spare.iloc[rng.permutation(len(spare))[:missing]])
+        
+        combined = pd.concat(parts, ignore_index=True)
+        combined = combined.sort_values('_row_position', kind='stable')
+        return combined.drop(columns=['_row_position', '_stratum']).reset_index(drop=True)
+
+
+def estimate_object_size(obj: Any, _seen: Optional[set] = None) -> int:
+    """
+    Estimate the memory held by a (possibly nested) object in bytes
+    
+    DataFrames, Series and arrays report their buffers; containers are walked
+    recursively; other objects (fitted models, etc.) are measured by their
+    pickled size, which tracks the arrays they hold.
+    
+    Args:
+        obj: Object to measure
+    
+    Returns:
+        Estimated size in bytes
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            return sys.getsizeof(obj) + sum(estimate_object_size(item, _seen) for item in obj.ravel())
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            estimate_object_size(k, _seen) + estimate_object_size(v, _seen) for k, v in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_object_size(item, _seen) for item in obj)
+    if isinstance(obj, (str, bytes, int, float, bool, type(None), np.generic)):
+        return sys.getsizeof(obj)
+    
+    try:
+        return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(obj)
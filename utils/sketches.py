@@ -0,0 +1,315 @@
+"""
+Mergeable Streaming Sketches
+Quantiles (KLL), distinct counts (HyperLogLog) and top-k (Space-Saving) in bounded memory
+"""
+import base64
+
+import pandas as pd
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.constants import SKETCH_KLL_K, SKETCH_HLL_PRECISION, SKETCH_TOPK_CAPACITY
+
+
+def _non_null_values(values: Any) -> pd.Series:
+    """
+    Non-missing values as a Series, with numbers as float64 so that a chunk
+    parsed as int64 and one parsed as float64 (because it had NaNs) agree
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if series.hasnans:
+        series = series.dropna()
+    if (pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+            and series.dtype != 'float64'):
+        series = series.astype('float64')
+    return series
+
+
+def _to_builtin(value: Any) -> Any:
+    """numpy scalars -> plain Python values so states serialize cleanly"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+# =================================================================
+# QUANTILES: KLL
+# =================================================================
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang & Liberty, 2016)
+    
+    Values live in a stack of compactors; an item at level h stands for 2^h
+    input values. When a level overflows it is sorted and every other item
+    (random offset) moves up one level, so the sketch keeps O(k) values and
+    rank error is about 1.7 / k of n. Until the first compaction every value
+    is kept and quantiles match pandas' linear interpolation exactly.
+    """
+    
+    def __init__(self, k: int = SKETCH_KLL_K, random_state: int = 42):
+        self.k = k
+        self.n = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.levels: List[np.ndarray] = [np.empty(0, dtype='float64')]
+        self._rng = np.random.default_rng(random_state)
+    
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2.0 / 3.0) ** depth)))
+    
+    def update(self, values: Any):
+        """Add a batch of values (NaNs are ignored)"""
+        values = np.asarray(values, dtype='float64').ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        
+        self.n += len(values)
+        self.min = float(values.min()) if self.min is None else min(self.min, float(values.min()))
+        self.max = float(values.max()) if self.max is None else max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+    
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        """Fold another sketch into this one"""
+        if other.n == 0:
+            return self
+        self.n += other.n
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype='float64'))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+        return self
+    
+    def _compress(self):
+        while True:
+            overflowing = [h for h in range(len(self.levels)) if len(self.levels[h]) > self._capacity(h)]
+            if not overflowing:
+                return
+            level = overflowing[0]
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0, dtype='float64'))
+            
+            items = np.sort(self.levels[level])
+            # An odd item out stays behind so total weight is preserved
+            leftover = items[len(items) - len(items) % 2:]
+            paired = items[:len(items) - len(items) % 2]
+            promoted = paired[int(self._rng.integers(2))::2]
+            
+            self.levels[level] = leftover
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+    
+    def quantiles(self, qs: Any) -> np.ndarray:
+        """
+        Estimate quantiles
+        
+        Args:
+            qs: Quantile levels in [0, 1]
+        
+        Returns:
+            Array of estimates (NaN when the sketch is empty)
+        """
+        qs = np.atleast_1d(np.asarray(qs, dtype='float64'))
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        if self.n == 1:
+            return np.full(len(qs), self.min)
+        
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        values, weights = values[order], weights[order]
+        
+        # Each item sits at the centre of the ranks it represents; with unit
+        # weights this is pandas' position q * (n - 1)
+        cum = np.cumsum(weights)
+        positions = (cum - weights + (weights - 1) / 2) / (self.n - 1)
+        positions = np.concatenate([[0.0], positions, [1.0]])
+        values = np.concatenate([[self.min], values, [self.max]])
+        return np.interp(qs, positions, values)
+    
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles([q])[0])
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'type': 'kll',
+            'k': self.k,
+            'n': self.n,
+            'min': self.min,
+            'max': self.max,
+            'levels': [items.tolist() for items in self.levels]
+        }
+    
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'KLLSketch':
+        sketch = cls(k=state['k'])
+        sketch.n = state['n']
+        sketch.min, sketch.max = state['min'], state['max']
+        sketch.levels = [np.asarray(items, dtype='float64') for items in state['levels']]
+        return sketch
+
+
+# =================================================================
+# DISTINCT COUNTS: HYPERLOGLOG
+# =================================================================
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-count sketch (Flajolet et al., 2007)
+    
+    2^precision one-byte registers; relative error about 1.04 / sqrt(2^precision)
+    (1.6% at the default 12). Values are hashed with pandas' 64-bit hash, so
+    every column type is supported, and registers merge by element-wise max.
+    """
+    
+    def __init__(self, precision: int = SKETCH_HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+    
+    def update(self, values: Any):
+        """Add a batch of values (missing values are ignored)"""
+        series = _non_null_values(values)
+        if len(series) == 0:
+            return
+        
+        hashes = pd.util.hash_pandas_object(series, index=False).to_numpy()
+        p = self.precision
+        buckets = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        rest = hashes << np.uint64(p)
+        
+        # Rank = leading zeros of the remaining bits + 1, via the exact bit length
+        _, bit_length = np.frexp(rest.astype('float64'))
+        bit_length = np.minimum(bit_length, 64)
+        rounded_up = (rest >> np.maximum(bit_length - 1, 0).astype(np.uint64)) == 0
+        bit_length = np.where(rounded_up & (rest > 0), bit_length - 1, bit_length)
+        ranks = np.minimum(64 - bit_length + 1, 64 - p + 1).astype(np.uint8)
+        
+        np.maximum.at(self.registers, buckets, ranks)
+    
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+    
+    def estimate(self) -> int:
+        """Estimated number of distinct values"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros > 0:
+            # Linear counting is more accurate for small cardinalities
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'type': 'hll',
+            'precision': self.precision,
+            'registers': base64.b64encode(self.registers.tobytes()).decode('ascii')
+        }
+    
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'HyperLogLog':
+        sketch = cls(precision=state['precision'])
+        sketch.registers = np.frombuffer(base64.b64decode(state['registers']), dtype=np.uint8).copy()
+        return sketch
+
+
+# =================================================================
+# TOP-K: SPACE-SAVING
+# =================================================================
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitters summary (Metwally et al., 2005), mergeable form
+    
+    Keeps at most `capacity` values with an over-estimated count and its
+    maximum error. A value not in the summary occurred at most `absent_bound`
+    times, so any value with true frequency above n / capacity is retained.
+    Counts are exact while a column has no more than `capacity` distinct values.
+    """
+    
+    def __init__(self, capacity: int = SKETCH_TOPK_CAPACITY):
+        self.capacity = capacity
+        self.n = 0
+        self.absent_bound = 0
+        self.counts: Dict[Any, int] = {}
+        self.errors: Dict[Any, int] = {}
+    
+    def update(self, values: Any):
+        """Add a batch of values (missing values are ignored)"""
+        counts = _non_null_values(values).value_counts()
+        if len(counts) == 0:
+            return
+        
+        # An exact count table truncated to `capacity` is itself a summary
+        # whose absent values occurred at most as often as the first one dropped
+        bound = int(counts.iloc[self.capacity]) if len(counts) > self.capacity else 0
+        chunk = SpaceSaving(self.capacity)
+        chunk.n = int(counts.sum())
+        chunk.absent_bound = bound
+        chunk.counts = {_to_builtin(value): int(count) for value, count in counts.iloc[:self.capacity].items()}
+        chunk.errors = dict.fromkeys(chunk.counts, 0)
+        self.merge(chunk)
+    
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        """Fold another summary into this one"""
+        combined_counts, combined_errors = {}, {}
+        for value in self.counts.keys() | other.counts.keys():
+            combined_counts[value] = (self.counts.get(value, self.absent_bound)
+                                      + other.counts.get(value, other.absent_bound))
+            combined_errors[value] = (self.errors.get(value, self.absent_bound)
+                                      + other.errors.get(value, other.absent_bound))
+        
+        bound = self.absent_bound + other.absent_bound
+        ranked = sorted(combined_counts, key=combined_counts.get, reverse=True)
+        if len(ranked) > self.capacity:
+            bound = max(bound, combined_counts[ranked[self.capacity]])
+            ranked = ranked[:self.capacity]
+        
+        self.n += other.n
+        self.absent_bound = bound
+        self.counts = {value: combined_counts[value] for value in ranked}
+        self.errors = {value: combined_errors[value] for value in ranked}
+        return self
+    
+    def top(self, n: int = 10) -> List[Tuple[Any, int, int]]:
+        """
+        Most frequent values
+        
+        Returns:
+            List of (value, estimated count, max over-estimate), most frequent first
+        """
+        ranked = sorted(self.counts, key=self.counts.get, reverse=True)[:n]
+        return [(value, self.counts[value], self.errors[value]) for value in ranked]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'type': 'space_saving',
+            'capacity': self.capacity,
+            'n': self.n,
+            'absent_bound': self.absent_bound,
+            'items': [[value, count, error] for value, count, error in self.top(self.capacity)]
+        }
+    
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'SpaceSaving':
+        sketch = cls(capacity=state['capacity'])
+        sketch.n = state['n']
+        sketch.absent_bound = state['absent_bound']
+        sketch.counts = {value: count for value, count, _ in state['items']}
+        sketch.errors = {value: error for value, _, error in state['items']}
+        return sketch
+
+
+_SKETCH_TYPES = {'kll': KLLSketch, 'hll': HyperLogLog, 'space_saving': SpaceSaving}
+
+
+def sketch_from_dict(state: Dict[str, Any]) -> Any:
+    """Rebuild any sketch from its to_dict() state"""
+    return _SKETCH_TYPES[state['type']].from_dict(state)
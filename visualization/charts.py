@@ -5,16 +5,35 @@ Reusable visualization functions for metrics and charts
 import streamlit as st
 from config.constants import COLORS
 from features.statistics import get_health_grade
+from features.duplicates import count_duplicates
 
 
-def render_dataset_overview_cards(df):
-    """Render dataset overview metric cards"""
+def render_dataset_overview_cards(df, source_profile=None):
+    """
+    Render dataset overview metric cards
+    
+    Args:
+        df: Loaded (possibly sampled) DataFrame
+        source_profile: Full-file profile; row and missing counts then cover
+            the whole file instead of the sample
+    """
     st.markdown('<h2 class="gradient-header">📊 Dataset Overview</h2>', unsafe_allow_html=True)
     
     o1, o2, o3, o4, o5 = st.columns(5)
     
+    if source_profile is not None and source_profile['truncated']:
+        total_rows = source_profile['total_rows']
+        missing = sum(c['nulls'] for c in source_profile['columns'].values())
+        rows_label = f"Rows ({len(df):,} sampled)"
+        dup_label = "Duplicates (sample)"
+    else:
+        total_rows = len(df)
+        missing = df.isna().sum().sum()
+        rows_label = "Rows"
+        dup_label = "Duplicates"
+    
     render_overview_card(
-        o1, f"{len(df):,}", "Rows", "🔢", COLORS['primary']
+        o1, f"{total_rows:,}", rows_label, "🔢", COLORS['primary']
     )
     render_overview_card(
         o2, len(df.columns), "Columns", "🗂️", COLORS['secondary']
@@ -23,10 +42,10 @@ def render_dataset_overview_cards(df):
         o3, f"{df.memory_usage().sum()/1024**2:.1f} MB", "Memory", "💾", COLORS['success']
     )
     render_overview_card(
-        o4, f"{df.isna().sum().sum():,}", "Missing", "❌", COLORS['danger']
+        o4, f"{missing:,}", "Missing", "❌", COLORS['danger']
     )
     render_overview_card(
-        o5, df.duplicated().sum(), "Duplicates", "♊", COLORS['warning']
+        o5, count_duplicates(df), dup_label, "♊", COLORS['warning']
     )
 
 
@@ -110,4 +129,17 @@ def render_overview_metrics(df, results, col_types):
             f'<div class="metric-label">Numeric Cols</div>'
             f'</div>',
             unsafe_allow_html=True
-        )
\ No newline at end of file
+        )
+
+def render_preliminary_score(results, caption):
+    """Render a provisional health score and its issues while the analysis is refined"""
+    score = results['health_score']
+    c1, c2 = st.columns([1, 3])
+    with c1:
+        st.metric("Preliminary Health Score", score, help="Updates as each analysis stage completes")
+    with c2:
+        st.caption(caption)
+        for issue in results['issues'][:5]:
+            st.markdown(f"- **{issue['severity']}** · {issue['type']}: {issue['message']}")
+        if len(results['issues']) > 5:
+            st.caption(f"… and {len(results['issues']) - 5} more issues")